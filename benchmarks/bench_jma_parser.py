@@ -0,0 +1,93 @@
+"""Per-document parse time of ``parse_jma_xml`` on the files in ``samples/``.
+
+Compares the current parser against the previous implementation, which evaluated XPath
+strings (recompiled on every call) for the head and for each item field.
+
+Usage:
+    python -m benchmarks.bench_jma_parser [--repeat N] [FILE ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import timeit
+from pathlib import Path
+
+import lxml.etree as ET  # type: ignore[reportMissingImports]
+
+from src.jma_parser import _build_alert, _parse_issued_at, parse_jma_xml
+
+SAMPLES_DIR = Path(__file__).resolve().parents[1] / "samples"
+
+
+def _text(node, xpath: str) -> str | None:
+    res = node.xpath(xpath)
+    if not res:
+        return None
+    first = res[0]
+    if hasattr(first, "text"):
+        return getattr(first, "text")
+    return str(first)
+
+
+def legacy_parse(xml_bytes: bytes) -> list:
+    """The string-XPath parser (namespace-unaware, so jmx documents yield no items)."""
+    root = ET.fromstring(xml_bytes)
+    title = _text(root, "//Head/Title/text()") or _text(
+        root, "//Report/Head/Headline/Text/text()"
+    )
+    info_type = _text(root, "//Head/InfoType/text()") or _text(
+        root, "//Report/Head/InfoType/text()"
+    )
+    issued_at = _parse_issued_at(
+        _text(root, "//Head/ReportDateTime/text()")
+        or _text(root, "//Report/Head/ReportDateTime/text()")
+    )
+    items = root.xpath("//Body//Warning//Item | //Body//Area//Item | //Report/Body//Item")
+    return [
+        _build_alert(
+            title=title,
+            info_type=info_type,
+            issued_at=issued_at,
+            area_name=_text(node, "./Area/Name/text()") or _text(node, "./Area/text()") or "Unknown",
+            area_code=_text(node, "./Area/Code/text()"),
+            category=_text(node, "./Kind/Name/text()") or _text(node, "./Kind/text()") or "Unknown",
+            severity=_text(node, "./Kind/Status/text()")
+            or _text(node, "./Status/text()")
+            or "Unknown",
+        )
+        for node in items
+    ]
+
+
+def _per_call_us(func, data: bytes, repeat: int) -> float:
+    number = max(1, repeat)
+    best = min(timeit.repeat(lambda: func(data), number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    # The parser logs every document (and warns when ReportDateTime is missing)
+    logging.disable(logging.WARNING)
+
+    files = args.files or sorted(SAMPLES_DIR.glob("*.xml"))
+    print(f"{'file':<36} {'items':>9} {'legacy us':>10} {'current us':>11} {'speedup':>8}")
+    for path in files:
+        data = path.read_bytes()
+        legacy = _per_call_us(legacy_parse, data, args.repeat)
+        current = _per_call_us(parse_jma_xml, data, args.repeat)
+        items = f"{len(legacy_parse(data))}/{len(parse_jma_xml(data))}"
+        print(
+            f"{path.name:<36} {items:>9} {legacy:>10.1f} {current:>11.1f} "
+            f"{legacy / current:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
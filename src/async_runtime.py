@@ -0,0 +1,598 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from . import main
+from .coalesce import CoalescingBuffer
+from .discord_client import AsyncDiscordNotifier
+from .feed_index import SeenEntryIndex
+from .guidance_state import CurrentAlerts, GuidanceController
+from .jma_client import (
+    HTTP_BACKOFF_FACTOR,
+    HTTP_RETRIES,
+    HTTP_RETRY_STATUSES,
+    HTTP_TIMEOUT_SEC,
+    USER_AGENT,
+    ValidatorStore,
+    local_file_path,
+    resolve_url,
+)
+from .jma_feed import (
+    CrawlResult,
+    FeedEntry,
+    _latest_per_id,
+    parse_atom_feed,
+    select_warning_entries,
+)
+from .jma_parser import parse_jma_xml_cached
+from .main import (
+    plan_dispatch,
+    record_active,
+    record_cancellations,
+    record_updates,
+    sent_messages,
+)
+from .models import Alert, MessageSlot, SchoolGuidance
+from .polling import AdaptiveInterval, has_active_alerts
+from .regions import DEFAULT_REGION, RegionIndex
+from .school_policy import decide_school_guidance
+from .storage import Storage, open_storage
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncJmaClient:
+    """Asyncio counterpart of :class:`~src.jma_client.JmaClient` on an ``aiohttp`` session.
+
+    Shares the validator handling (conditional GET) and the retry policy of the sync client.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        session: aiohttp.ClientSession,
+        validators_path: Optional[Path] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.session = session
+        self.validators = ValidatorStore(validators_path) if validators_path else None
+
+    def commit_validators(self) -> None:
+        if self.validators is not None:
+            self.validators.commit()
+
+    def discard_validators(self) -> None:
+        if self.validators is not None:
+            self.validators.discard()
+
+    async def fetch(self, path: str = "", *, conditional: bool = True) -> Optional[bytes]:
+        """Fetch ``path``; returns ``None`` on ``304 Not Modified``. See ``JmaClient.fetch``."""
+        url = resolve_url(self.base_url, path)
+        file_path = local_file_path(url)
+        if file_path is not None:
+            logger.info(f"Reading JMA XML from local file: {file_path}")
+            return await asyncio.to_thread(file_path.read_bytes)
+
+        headers = self.validators.headers(url) if conditional and self.validators else {}
+        timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SEC)
+        logger.info(f"Fetching JMA feed from: {url}")
+        for attempt in range(HTTP_RETRIES + 1):
+            retry_after: Optional[float] = None
+            try:
+                async with self.session.get(url, headers=headers, timeout=timeout) as resp:
+                    if resp.status == 304:
+                        logger.info(f"JMA feed not modified since last fetch: {url}")
+                        return None
+                    if resp.status in HTTP_RETRY_STATUSES and attempt < HTTP_RETRIES:
+                        value = resp.headers.get("Retry-After", "")
+                        retry_after = float(value) if value.isdigit() else None
+                        raise aiohttp.ClientResponseError(
+                            resp.request_info, resp.history, status=resp.status
+                        )
+                    resp.raise_for_status()
+                    content = await resp.read()
+                    if conditional and self.validators is not None:
+                        self.validators.update(
+                            url,
+                            etag=resp.headers.get("ETag"),
+                            last_modified=resp.headers.get("Last-Modified"),
+                        )
+                    logger.info(f"Successfully fetched data from {url} (status: {resp.status})")
+                    return content
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or (
+                    e.status in HTTP_RETRY_STATUSES
+                )
+                if not retryable or attempt >= HTTP_RETRIES:
+                    logger.exception(f"Failed to fetch data from {url}: {e}")
+                    raise
+                delay = retry_after or HTTP_BACKOFF_FACTOR * (2**attempt)
+                logger.warning(f"Retrying {url} in {delay:.1f}s after error: {e}")
+                await asyncio.sleep(delay)
+        raise RuntimeError(f"Failed to fetch data from {url}")
+
+
+async def crawl_entries_async(
+    client: AsyncJmaClient, entries: List[FeedEntry], *, max_workers: int = 4
+) -> CrawlResult:
+    """Fetch linked documents concurrently (at most ``max_workers`` at a time) and parse them
+    off-loop. Same semantics as :func:`~src.jma_feed.crawl_entries`."""
+    targets = [e for e in entries if e.link]
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def _fetch_and_parse(entry: FeedEntry) -> Optional[List[Alert]]:
+        async with semaphore:
+            try:
+                xml = await client.fetch(entry.link or "", conditional=False)
+            except Exception as e:  # pylint: disable=broad-except-clause
+                logger.warning(f"Failed to fetch feed entry {entry.link}: {e}")
+                return None
+        return await asyncio.to_thread(parse_jma_xml_cached, xml) if xml else []
+
+    results = await asyncio.gather(*(_fetch_and_parse(e) for e in targets))
+    fetched = [e for e, batch in zip(targets, results) if batch is not None]
+    failed = [e for e, batch in zip(targets, results) if batch is None]
+    alerts = _latest_per_id(a for batch in results if batch for a in batch)
+    logger.info(f"Collected {len(alerts)} alerts from {len(fetched)} feed entries.")
+    return CrawlResult(alerts=alerts, fetched=fetched, failed=failed)
+
+
+@dataclass(slots=True)
+class _SendJob:
+    kind: str  # "active" | "updated" | "cancelled" | "guidance" | "flush" | "deferred"
+    alerts: List[Alert]
+    done: asyncio.Future
+    guidance: Optional[SchoolGuidance] = None
+    # Previous Discord messages of updated/cancelled alerts, for edits in place
+    messages: Dict[str, MessageSlot] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class _Target:
+    """Per-region sent-ID storage, notifier, coalescing buffer and send queue."""
+
+    storage: Storage
+    notifier: AsyncDiscordNotifier
+    buffer: CoalescingBuffer
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Alert id -> (fingerprint, done future) of the queued job that sends it
+    in_flight: Dict[str, tuple[str, asyncio.Future]] = field(default_factory=dict)
+    task: Optional[asyncio.Task] = None
+
+
+class AsyncPipeline:
+    """Asyncio runtime: polling and Discord sends run concurrently.
+
+    :meth:`poll_once` fetches and parses (parsing and storage I/O run in worker threads),
+    decides what to send and hands it to a per-region sender task, so a slow Discord response
+    never delays the next JMA poll. Alerts queued but not yet sent are not queued again; a
+    different version of an alert still in flight (e.g. its cancellation) is planned once
+    that send has been recorded. With ``ALERT_COALESCE_SEC`` set, planned alerts are held
+    per region like in :class:`~src.main.Pipeline`; :meth:`release_due` queues them once
+    their window has elapsed.
+    Seen entries and HTTP validators are committed only after every send queued since the
+    last commit has succeeded; otherwise the validators are discarded and the feed is
+    fetched in full on the next poll.
+    """
+
+    def __init__(
+        self,
+        jma_url: str,
+        *,
+        session: aiohttp.ClientSession,
+        dry_run: bool = False,
+        force_send: bool = False,
+        no_store: bool = False,
+        region_index: RegionIndex | None = None,
+    ) -> None:
+        self.session = session
+        self.dry_run = dry_run
+        self.force_send = force_send
+        self.no_store = no_store
+        self.region_index = region_index or main.REGION_INDEX
+        self.data_dir = main.DATA_DIR
+        self.sent_ids_file = self.data_dir / main.SENT_IDS_FILENAME
+        self.fetch_workers = main.FETCH_WORKERS
+        self.coalesce_window = main.ALERT_COALESCE_WINDOW
+        self.client = AsyncJmaClient(
+            jma_url, session=session, validators_path=self.data_dir / main.HTTP_VALIDATORS_FILENAME
+        )
+        self.seen_index = SeenEntryIndex(
+            self.data_dir / main.SEEN_ENTRIES_FILENAME, retention=main.SEEN_ENTRIES_RETENTION
+        )
+        self.guidance_controller = GuidanceController(
+            self.data_dir / main.GUIDANCE_STATE_FILENAME
+        )
+        self.current_alerts = CurrentAlerts(self.data_dir / main.CURRENT_ALERTS_FILENAME)
+        self._targets: Dict[str, _Target] = {}
+        self._outstanding_ticks = 0
+        self._failed_since_commit = False
+        self._commit_tasks: set[asyncio.Task] = set()
+        # Outcome of the last poll, for the adaptive polling interval
+        self.feed_changed = False
+        self.has_active_alerts = False
+
+    def _target(self, region_name: str) -> _Target:
+        target = self._targets.get(region_name)
+        if target is None:
+            if region_name == DEFAULT_REGION:
+                storage_path, webhook_url = self.sent_ids_file, None
+            else:
+                storage_path = self.sent_ids_file.with_name(f"sent_ids.{region_name}.json")
+                webhook_url = self.region_index.regions[region_name].webhook_url
+            target = _Target(
+                storage=open_storage(storage_path),
+                notifier=AsyncDiscordNotifier(
+                    http_session=self.session, webhook_url=webhook_url, dry_run=self.dry_run
+                ),
+                buffer=CoalescingBuffer(self.coalesce_window),
+            )
+            target.task = asyncio.create_task(self._sender(target), name=f"send-{region_name}")
+            self._targets[region_name] = target
+        return target
+
+    async def _fetch_alerts(
+        self,
+    ) -> tuple[List[Alert], Optional[List[FeedEntry]], List[FeedEntry]] | None:
+        xml = await self.client.fetch()
+        if xml is None:
+            logger.info("JMA feed not modified; skipping parse and storage.")
+            return None
+
+        entries = await asyncio.to_thread(parse_atom_feed, xml)
+        if entries is None:
+            return await asyncio.to_thread(parse_jma_xml_cached, xml), None, []
+
+        targets = select_warning_entries(entries, self.region_index.office_codes)
+        new_targets = self.seen_index.filter_new(targets)
+        logger.info(
+            f"Selected {len(new_targets)} new warning entries "
+            f"({len(targets)} warning / {len(entries)} total feed entries)."
+        )
+        if not new_targets:
+            logger.info("No new or updated warning entries; skipping parse and storage.")
+            self._commit_if_idle()
+            return None
+        crawl = await crawl_entries_async(self.client, new_targets, max_workers=self.fetch_workers)
+        return crawl.alerts, crawl.fetched, crawl.failed
+
+    async def _enqueue_deferred(
+        self, target: _Target, alerts: List[Alert], pending: List[asyncio.Future]
+    ) -> bool:
+        """Plan and send ``alerts`` once the in-flight sends they conflict with are done."""
+        try:
+            await asyncio.gather(*pending)
+            jobs = await self._enqueue(target, alerts)
+            return all(await asyncio.gather(*(job.done for job in jobs)))
+        except Exception as e:  # pylint: disable=broad-except-clause
+            logger.exception(f"Failed to queue deferred alerts: {e}")
+            return False
+
+    async def _offer(self, target: _Target, alerts: List[Alert]) -> List[_SendJob]:
+        """Queue ``alerts`` now, or hold what they call for in the coalescing buffer."""
+        if not target.buffer.enabled:
+            return await self._enqueue(target, alerts)
+        async with target.lock:
+            to_send_active, to_send_update, to_send_cancel = await asyncio.to_thread(
+                plan_dispatch, alerts, storage=target.storage, force_send=self.force_send
+            )
+            if not self.no_store:
+                await asyncio.to_thread(target.storage.touch_many, [a.id for a in alerts])
+        now = datetime.now(timezone.utc)
+        target.buffer.offer(to_send_active + to_send_update + to_send_cancel, now)
+        # Released alerts are planned again: the held state may have been sent meanwhile
+        return await self._enqueue(target, target.buffer.release(now))
+
+    async def release_due(self, *, drain: bool = False) -> int:
+        """Queue coalesced alerts whose window has elapsed. Returns the number queued."""
+        now = datetime.now(timezone.utc)
+        total = 0
+        for target in list(self._targets.values()):
+            ready = target.buffer.drain() if drain else target.buffer.release(now)
+            if ready:
+                total += sum(len(job.alerts) for job in await self._enqueue(target, ready))
+        return total
+
+    async def _enqueue(self, target: _Target, alerts: List[Alert]) -> List[_SendJob]:
+        """Queue the sends ``alerts`` call for; the returned jobs carry their done futures.
+
+        An alert identical to one still in flight is skipped. Any other version of an alert
+        in flight is deferred to a job planned after that send, so it is classified against
+        the recorded state (a cancellation then edits the message just posted).
+        """
+        jobs = []
+        loop = asyncio.get_running_loop()
+        async with target.lock:
+            fresh: List[Alert] = []
+            deferred: List[Alert] = []
+            pending: Dict[int, asyncio.Future] = {}
+            for a in alerts:
+                queued = target.in_flight.get(a.id)
+                if queued is None:
+                    fresh.append(a)
+                elif queued[0] != a.fingerprint:
+                    deferred.append(a)
+                    pending[id(queued[1])] = queued[1]
+            if deferred:
+                logger.info(f"Deferring {len(deferred)} alerts until their queued sends finish.")
+                task = asyncio.create_task(
+                    self._enqueue_deferred(target, deferred, list(pending.values()))
+                )
+                # Awaited with this tick's sends, but not counted as queued alerts
+                jobs.append(_SendJob(kind="deferred", alerts=[], done=task))
+            if not fresh:
+                return jobs
+
+            to_send_active, to_send_update, to_send_cancel = await asyncio.to_thread(
+                plan_dispatch, fresh, storage=target.storage, force_send=self.force_send
+            )
+            if not self.no_store:
+                await asyncio.to_thread(target.storage.touch_many, [a.id for a in fresh])
+            messages = await asyncio.to_thread(
+                sent_messages, target.storage, to_send_update + to_send_cancel
+            )
+            batches = (
+                ("active", to_send_active),
+                ("updated", to_send_update),
+                ("cancelled", to_send_cancel),
+            )
+            for kind, batch in batches:
+                if not batch:
+                    continue
+                logger.info(f"Queueing {len(batch)} {kind} alerts to send.")
+                job = _SendJob(
+                    kind=kind,
+                    alerts=batch,
+                    done=loop.create_future(),
+                    messages={a.id: messages[a.id] for a in batch if a.id in messages},
+                )
+                target.in_flight.update((a.id, (a.fingerprint, job.done)) for a in batch)
+                target.queue.put_nowait(job)
+                jobs.append(job)
+        return jobs
+
+    async def _sender(self, target: _Target) -> None:
+        while True:
+            job: _SendJob = await target.queue.get()
+            ok = False
+            try:
+                sent = None
+                if job.kind == "flush":
+                    await target.notifier.flush_async()
+                elif job.kind == "guidance" and job.guidance is not None:
+                    await target.notifier.send_school_guidance_async(job.guidance)
+                elif job.kind == "cancelled":
+                    sent = await target.notifier.send_cancellations_async(
+                        job.alerts, job.messages
+                    )
+                elif job.kind == "updated":
+                    sent = await target.notifier.send_updates_async(job.alerts, job.messages)
+                else:
+                    sent = await target.notifier.send_alerts_async(job.alerts)
+                if not self.no_store and job.alerts:
+                    record = {"cancelled": record_cancellations, "updated": record_updates}.get(
+                        job.kind, record_active
+                    )
+                    async with target.lock:
+                        await asyncio.to_thread(record, target.storage, job.alerts, sent)
+                ok = True
+            except Exception as e:  # pylint: disable=broad-except-clause
+                logger.exception(f"Failed to send queued {job.kind} alerts: {e}")
+            finally:
+                try:
+                    async with target.lock:
+                        await asyncio.to_thread(target.storage.flush)
+                except Exception as e:  # pylint: disable=broad-except-clause
+                    logger.exception(f"Failed to flush storage: {e}")
+                    ok = False
+                for a in job.alerts:
+                    target.in_flight.pop(a.id, None)
+                job.done.set_result(ok)
+                target.queue.task_done()
+
+    async def _queue_guidance(self) -> List[asyncio.Future]:
+        """Queue guidance decided from the Tokyo alerts of the last processed bulletin."""
+        tokyo_alerts = self.current_alerts.alerts
+        self.has_active_alerts = has_active_alerts(tokyo_alerts)
+        try:
+            guidance = decide_school_guidance(tokyo_alerts)
+            has_target = any(getattr(a, "status", "active") != "cancelled" for a in tokyo_alerts)
+            should = await asyncio.to_thread(
+                self.guidance_controller.should_send,
+                guidance=guidance,
+                has_target=has_target,
+                now=datetime.now(timezone.utc),
+            )
+        except Exception as e:  # pylint: disable=broad-except-clause
+            logger.exception("Failed to process/send school guidance: %s", e)
+            return []
+        if not (should or self.force_send):
+            return []
+        job = _SendJob(
+            kind="guidance",
+            alerts=[],
+            done=asyncio.get_running_loop().create_future(),
+            guidance=guidance,
+        )
+        self._target(DEFAULT_REGION).queue.put_nowait(job)
+        return [job.done]
+
+    def _queue_flushes(self) -> None:
+        """Retry webhook messages left queued by rate limits on senders with nothing to do.
+
+        A sender with jobs pending drains the leftovers with its next send anyway.
+        """
+        loop = asyncio.get_running_loop()
+        for target in self._targets.values():
+            if target.notifier.queue_depth and target.queue.empty():
+                target.queue.put_nowait(
+                    _SendJob(kind="flush", alerts=[], done=loop.create_future())
+                )
+
+    def _commit_if_idle(self) -> None:
+        if self._outstanding_ticks:
+            return
+        if self._failed_since_commit:
+            self.client.discard_validators()
+            self._failed_since_commit = False
+        else:
+            self.client.commit_validators()
+
+    async def _commit_after(
+        self,
+        futures: List[asyncio.Future],
+        processed: Optional[List[FeedEntry]],
+        failed: List[FeedEntry],
+    ) -> None:
+        results = await asyncio.gather(*futures)
+        self._outstanding_ticks -= 1
+        if all(results):
+            if processed is not None:
+                self.seen_index.mark(processed)
+                await asyncio.to_thread(self.seen_index.flush)
+        else:
+            self._failed_since_commit = True
+        if failed:
+            # Entries that could not be fetched must be listed again, not hidden by a 304
+            logger.warning(f"{len(failed)} feed entries could not be fetched; retrying next poll.")
+            self._failed_since_commit = True
+        self._commit_if_idle()
+
+    async def poll_once(self) -> int:
+        """Fetch, parse and queue new alerts.
+
+        Returns:
+            The number of alerts queued for sending.
+        """
+        logger.info("Starting pipeline poll...")
+        self._queue_flushes()
+        # Coalesced alerts are due even when the feed has nothing new
+        await self.release_due()
+        fetched = await self._fetch_alerts()
+        self.feed_changed = fetched is not None
+        if fetched is None:
+            # Decision-point guidance is due even when no new bulletin arrived
+            await self._queue_guidance()
+            return 0
+        alerts, processed, failed = fetched
+
+        partitions = self.region_index.partition(alerts)
+        tokyo_alerts = partitions.pop(DEFAULT_REGION, [])
+        logger.info(f"Filtered down to {len(tokyo_alerts)} alerts for Tokyo's 23 wards.")
+        if tokyo_alerts:
+            # The latest bulletin lists every warning in effect; keep the state otherwise
+            await asyncio.to_thread(self.current_alerts.replace, tokyo_alerts)
+
+        jobs = await self._offer(self._target(DEFAULT_REGION), tokyo_alerts)
+        for region_name, region_alerts in partitions.items():
+            jobs += await self._offer(self._target(region_name), region_alerts)
+        futures = [job.done for job in jobs] + await self._queue_guidance()
+
+        self._outstanding_ticks += 1
+        task = asyncio.create_task(self._commit_after(futures, processed, failed))
+        self._commit_tasks.add(task)
+        task.add_done_callback(self._commit_tasks.discard)
+        return sum(len(job.alerts) for job in jobs)
+
+    async def drain(self) -> None:
+        """Wait until every queued send (and the following commit) has finished."""
+        for target in list(self._targets.values()):
+            await target.queue.join()
+        if self._commit_tasks:
+            await asyncio.gather(*self._commit_tasks)
+
+    async def aclose(self) -> None:
+        try:
+            await self.release_due(drain=True)
+        except Exception as e:  # pylint: disable=broad-except-clause
+            logger.exception(f"Failed to queue held alerts on shutdown: {e}")
+        await self.drain()
+        for target in self._targets.values():
+            try:
+                await target.notifier.flush_async()
+            except Exception as e:  # pylint: disable=broad-except-clause
+                logger.exception(f"Failed to send queued webhook messages on close: {e}")
+            if target.notifier.queue_depth:
+                logger.error(
+                    f"Dropping {target.notifier.queue_depth} webhook messages still queued."
+                )
+            if target.task is not None:
+                target.task.cancel()
+            close = getattr(target.storage, "close", None)
+            if close is not None:
+                close()
+        await asyncio.gather(
+            *(t.task for t in self._targets.values() if t.task is not None),
+            return_exceptions=True,
+        )
+        self._targets.clear()
+
+
+async def _release_periodically(pipeline: AsyncPipeline, seconds: float) -> None:
+    while True:
+        await asyncio.sleep(seconds)
+        try:
+            await pipeline.release_due()
+        except Exception as exc:  # pylint: disable=broad-except-clause
+            logger.exception(f"Failed to queue coalesced alerts: {exc}")
+
+
+async def run_async(
+    jma_url: str,
+    interval_minutes: float = 5,
+    *,
+    once: bool = False,
+    dry_run: bool = False,
+    force_send: bool = False,
+    no_store: bool = False,
+) -> None:
+    """Run the asyncio runtime: poll (or poll once) until cancelled.
+
+    Polls are spaced by :class:`AdaptiveInterval` around ``interval_minutes``.
+    """
+    connector = aiohttp.TCPConnector(limit=main.FETCH_WORKERS + 4)
+    async with aiohttp.ClientSession(
+        connector=connector, headers={"User-Agent": USER_AGENT}
+    ) as session:
+        pipeline = AsyncPipeline(
+            jma_url, session=session, dry_run=dry_run, force_send=force_send, no_store=no_store
+        )
+        poller = AdaptiveInterval.from_env(interval_minutes)
+        loop = asyncio.get_running_loop()
+        releaser: Optional[asyncio.Task] = None
+        if pipeline.coalesce_window > timedelta(0) and not once:
+            # Queue coalesced alerts when their window elapses rather than on the next poll
+            seconds = max(5.0, pipeline.coalesce_window.total_seconds() / 2)
+            releaser = asyncio.create_task(_release_periodically(pipeline, seconds))
+        try:
+            while True:
+                started = loop.time()
+                failed = False
+                try:
+                    count = await pipeline.poll_once()
+                    if count > 0:
+                        logger.info(f"Queued {count} new alerts for sending.")
+                except Exception as exc:  # pylint: disable=broad-except-clause
+                    failed = True
+                    logger.exception(f"An error occurred in the pipeline: {exc}")
+                if once:
+                    break
+                interval = poller.next(
+                    active=pipeline.has_active_alerts,
+                    changed=pipeline.feed_changed,
+                    failed=failed,
+                )
+                await asyncio.sleep(max(0.0, interval.total_seconds() - (loop.time() - started)))
+        finally:
+            if releaser is not None:
+                releaser.cancel()
+            await pipeline.aclose()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import tarfile
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import groupby, islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from .discord_client import DiscordNotifier
+from .filter import pick_23_wards
+from .jma_parser import parse_jma_xml
+from .main import dispatch_alerts
+from .models import Alert
+from .storage import open_storage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64
+# Chunks submitted per worker process ahead of the one being merged
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+@dataclass(frozen=True, slots=True)
+class BackfillResult:
+    """Outcome of :func:`backfill`.
+
+    Attributes:
+        documents: Number of XML documents read
+        alerts: Alerts for Tokyo's 23 wards, in issue-time order
+        sent: Number of alerts (and cancellations) the dry-run notifier would have sent
+    """
+
+    documents: int
+    alerts: List[Alert]
+    sent: int
+
+
+def iter_documents(source: Path) -> Iterator[tuple[str, bytes]]:
+    """Yield ``(name, xml bytes)`` for every ``*.xml`` file in a directory or tarball.
+
+    Directories are walked recursively; names are yielded in sorted order.
+    """
+    if source.is_dir():
+        for path in sorted(source.rglob("*.xml")):
+            yield str(path.relative_to(source)), path.read_bytes()
+        return
+
+    with tarfile.open(source, mode="r:*") as tar:
+        members = sorted(
+            (m for m in tar.getmembers() if m.isfile() and m.name.endswith(".xml")),
+            key=lambda m: m.name,
+        )
+        for member in members:
+            f = tar.extractfile(member)
+            if f is not None:
+                yield member.name, f.read()
+
+
+def _chunks(docs: Iterable[tuple[int, str, bytes]], size: int) -> Iterator[list]:
+    it = iter(docs)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _parse_chunk(chunk: list[tuple[int, str, bytes]]) -> list[tuple[int, Alert]]:
+    """Worker: parse a chunk of documents and keep only the 23-ward alerts."""
+    out: list[tuple[int, Alert]] = []
+    for seq, name, data in chunk:
+        try:
+            alerts = parse_jma_xml(data)
+        except Exception as e:  # pylint: disable=broad-except-clause
+            logger.warning(f"Failed to parse archived document {name}: {e}")
+            continue
+        out.extend((seq, a) for a in pick_23_wards(alerts))
+    return out
+
+
+def parse_documents(
+    docs: Iterable[tuple[str, bytes]],
+    *,
+    max_workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> tuple[int, List[Alert]]:
+    """Parse documents in a process pool and merge the 23-ward alerts in issue-time order.
+
+    Alerts with the same issue time keep the order of their source documents. Only a few
+    chunks per worker are read ahead, so an archive is never loaded into memory at once.
+
+    Returns:
+        ``(number of documents, alerts)``
+    """
+    count = 0
+
+    def _numbered() -> Iterator[tuple[int, str, bytes]]:
+        nonlocal count
+        for seq, (name, data) in enumerate(docs):
+            count += 1
+            yield seq, name, data
+
+    window = CHUNKS_IN_FLIGHT_PER_WORKER * (max_workers or os.cpu_count() or 1)
+    results: list[tuple[int, Alert]] = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending: deque[Future] = deque()
+        for chunk in _chunks(_numbered(), max(1, chunk_size)):
+            if len(pending) >= window:
+                results.extend(pending.popleft().result())
+            pending.append(pool.submit(_parse_chunk, chunk))
+        while pending:
+            results.extend(pending.popleft().result())
+    results.sort(key=lambda item: (item[1].issued_at, item[0]))
+    return count, [a for _, a in results]
+
+
+def _close_storage(storage) -> None:
+    close = getattr(storage, "close", None)
+    if close is not None:
+        close()
+    else:
+        storage.flush()
+
+
+def replay(alerts: Iterable[Alert], *, storage) -> int:
+    """Run ``alerts`` through the pipeline's dedup/cancellation logic with a dry-run notifier.
+
+    Alerts sharing an issue time are dispatched together, as one bulletin per tick.
+    """
+    notifier = DiscordNotifier(dry_run=True)
+    total = 0
+    for _, batch in groupby(alerts, key=lambda a: a.issued_at):
+        total += dispatch_alerts(list(batch), storage=storage, notifier=notifier)
+    return total
+
+
+def backfill(
+    source: Path,
+    *,
+    max_workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    storage_path: Optional[Path] = None,
+) -> BackfillResult:
+    """Replay archived JMA XML from a directory or tarball in dry-run mode.
+
+    Sent-ID state goes to ``storage_path`` (any ``STORAGE_BACKEND``) or, by default, to a
+    temporary file that is discarded afterwards so the live ``data/`` state is never touched.
+    """
+    documents, alerts = parse_documents(
+        iter_documents(source), max_workers=max_workers, chunk_size=chunk_size
+    )
+    logger.info(f"Parsed {len(alerts)} 23-ward alerts from {documents} archived documents.")
+
+    if storage_path is not None:
+        storage = open_storage(storage_path)
+        try:
+            sent = replay(alerts, storage=storage)
+        finally:
+            _close_storage(storage)
+    else:
+        with tempfile.TemporaryDirectory(prefix="keihou-backfill-") as tmpdir:
+            storage = open_storage(Path(tmpdir) / "sent_ids.json")
+            try:
+                sent = replay(alerts, storage=storage)
+            finally:
+                _close_storage(storage)
+    logger.info(f"Backfill finished. Alerts that would have been sent: {sent}")
+    return BackfillResult(documents=documents, alerts=alerts, sent=sent)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    parser = argparse.ArgumentParser(description="Replay archived JMA XML (dry run)")
+    parser.add_argument("source", type=Path, help="Directory or tarball of JMA XML files")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Parser processes (default: CPU count = {os.cpu_count()})",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--storage",
+        type=Path,
+        default=None,
+        help="Sent-ID storage file to use instead of a temporary one",
+    )
+    args = parser.parse_args()
+
+    backfill(
+        args.source,
+        max_workers=args.workers,
+        chunk_size=args.chunk_size,
+        storage_path=args.storage,
+    )
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from .models import Alert
+
+logger = logging.getLogger(__name__)
+
+# Level suffixes of JMA warning kinds; longest first so 特別警報 is not read as 警報
+_LEVEL_SUFFIXES = ("特別警報", "警報", "注意報")
+
+
+def coalesce_key(alert: Alert) -> tuple[str, str]:
+    """``(area, hazard)`` of an alert, e.g. 大雨注意報 and 大雨警報 share the hazard 大雨."""
+    category = alert.category.strip()
+    for suffix in _LEVEL_SUFFIXES:
+        if category.endswith(suffix) and len(category) > len(suffix):
+            category = category[: -len(suffix)]
+            break
+    return alert.area, category
+
+
+class CoalescingBuffer:
+    """Hold alerts that are about to be sent for a short window and keep only the latest state.
+
+    Alerts are keyed by :func:`coalesce_key`, so several JMA updates for the same area and
+    hazard within ``window`` of the first one — e.g. an advisory upgraded to a warning and
+    then amended — leave the buffer as a single alert. A zero
+    window disables buffering: :meth:`release` hands every offered alert straight back.
+
+    The buffer is in-memory only; callers should :meth:`drain` it on shutdown.
+    """
+
+    def __init__(self, window: timedelta) -> None:
+        self.window = window
+        # coalesce key -> (first offered at, latest alert)
+        self._held: Dict[tuple[str, str], tuple[datetime, Alert]] = {}
+
+    def __len__(self) -> int:
+        return len(self._held)
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > timedelta(0)
+
+    def offer(self, alerts: Iterable[Alert], now: Optional[datetime] = None) -> None:
+        """Add alerts; a held alert is replaced if the new state is not older."""
+        now = now or datetime.now(timezone.utc)
+        for a in alerts:
+            key = coalesce_key(a)
+            held = self._held.get(key)
+            if held is None:
+                self._held[key] = (now, a)
+            elif a.issued_at >= held[1].issued_at:
+                self._held[key] = (held[0], a)
+
+    def release(self, now: Optional[datetime] = None) -> List[Alert]:
+        """Remove and return the alerts whose window has elapsed (oldest first)."""
+        now = now or datetime.now(timezone.utc)
+        ready = [
+            (first, a) for first, a in self._held.values() if now - first >= self.window
+        ]
+        for _, a in ready:
+            del self._held[coalesce_key(a)]
+        if ready and self._held:
+            logger.info(f"Released {len(ready)} coalesced alerts; {len(self._held)} still held.")
+        return [a for _, a in sorted(ready, key=lambda item: item[0])]
+
+    def drain(self) -> List[Alert]:
+        """Remove and return every held alert regardless of the window."""
+        held = sorted(self._held.values(), key=lambda item: item[0])
+        self._held.clear()
+        return [a for _, a in held]
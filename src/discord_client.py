@@ -1,20 +1,365 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import logging
 import os
 import sys
-from typing import Iterable, Optional
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional
 
 import discord
+import requests
 # Expose alias for tests that patch src.discord_client.SyncWebhook, and keep original for comparison
 SyncWebhook = getattr(discord, "SyncWebhook", None)  # type: ignore[assignment]
 _ORIGINAL_DISCORD_SYNC_WEBHOOK = SyncWebhook
 from discord.errors import HTTPException
 
-from .models import Alert, SchoolGuidance, RoleMentionSetting
+from .models import Alert, MessageSlot, SchoolGuidance, RoleMentionSetting
 
 logger = logging.getLogger(__name__)
 
+# Discord limits per message: at most 10 embeds, 6000 characters across all embeds
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+def batch_embeds(embeds: Iterable[discord.Embed]) -> list[list[discord.Embed]]:
+    """Pack embeds, in order, into messages within Discord's per-message limits."""
+    batches: list[list[discord.Embed]] = []
+    current: list[discord.Embed] = []
+    chars = 0
+    for embed in embeds:
+        size = len(embed)
+        if current and (
+            len(current) >= MAX_EMBEDS_PER_MESSAGE or chars + size > MAX_EMBED_CHARS_PER_MESSAGE
+        ):
+            batches.append(current)
+            current, chars = [], 0
+        current.append(embed)
+        chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _header(exc: HTTPException, name: str) -> Optional[str]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    try:
+        return headers.get(name) if headers is not None else None
+    except Exception:  # pragma: no cover - exotic response objects
+        return None
+
+
+def _float_or_none(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class _QueuedMessage:
+    kwargs: Dict[str, Any]
+    via: Optional[Callable[..., Any]] = None
+    on_sent: Optional[Callable[[Any], None]] = None
+    attempts: int = 0
+    seq: int = 0
+
+
+@dataclass
+class WebhookSendQueue:
+    """FIFO of webhook messages that survives Discord rate limits.
+
+    discord.py already paces requests within a bucket (``X-RateLimit-Remaining: 0``) and
+    retries some 429s itself; this queue handles the 429s that still reach us. It records the
+    bucket's ``X-RateLimit-Reset-After`` / ``Retry-After`` (``X-RateLimit-Bucket``, or the
+    global limit), waits until that bucket is open again and retries the message instead of
+    dropping it. Messages that keep hitting the limit after ``max_attempts`` stay queued,
+    in order, and go out first on the next drain. Other HTTP errors drop the message; any
+    other exception (connection reset, timeout) propagates with the message still queued,
+    so callers drop what they put since :meth:`mark` (see :meth:`drop_since`).
+
+    A message can name its own webhook call (``via``, e.g. ``edit_message``) instead of the
+    drain's ``send``; ``on_sent`` receives the call's result once it succeeded.
+    """
+
+    max_attempts: int = 5
+    sleep: Callable[[float], None] = time.sleep
+    async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    clock: Callable[[], float] = time.monotonic
+    _pending: Deque[_QueuedMessage] = field(default_factory=deque)
+    _resume_at: Dict[str, float] = field(default_factory=dict)
+    _bucket: str = "webhook"
+    _seq: int = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting to be sent."""
+        return len(self._pending)
+
+    def put(
+        self,
+        *,
+        via: Optional[Callable[..., Any]] = None,
+        on_sent: Optional[Callable[[Any], None]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._seq += 1
+        self._pending.append(_QueuedMessage(kwargs, via=via, on_sent=on_sent, seq=self._seq))
+
+    def mark(self) -> int:
+        """Position before the messages put from now on (for :meth:`drop_since`)."""
+        return self._seq
+
+    def drop_since(self, mark: int) -> int:
+        """Drop unsent messages put after ``mark``. Returns the number dropped."""
+        kept = deque(msg for msg in self._pending if msg.seq <= mark)
+        dropped = len(self._pending) - len(kept)
+        self._pending = kept
+        return dropped
+
+    def _delay(self) -> float:
+        now = self.clock()
+        resume = max(self._resume_at.get(self._bucket, 0.0), self._resume_at.get("global", 0.0))
+        return max(0.0, resume - now)
+
+    def _failed(self, msg: _QueuedMessage, exc: HTTPException) -> bool:
+        """Book a failed send of the head message. Returns True if draining should stop."""
+        if exc.status != 429:
+            logger.exception(f"Failed to send message via webhook: {exc}")
+            self._pending.popleft()
+            return False
+        msg.attempts += 1
+        retry_after = (
+            _float_or_none(_header(exc, "X-RateLimit-Reset-After"))
+            or _float_or_none(_header(exc, "Retry-After"))
+            or 1.0
+        )
+        self._bucket = _header(exc, "X-RateLimit-Bucket") or self._bucket
+        is_global = (_header(exc, "X-RateLimit-Global") or "").lower() == "true"
+        self._resume_at["global" if is_global else self._bucket] = self.clock() + retry_after
+        logger.warning(
+            f"Webhook rate limited (bucket={'global' if is_global else self._bucket}, "
+            f"retry_after={retry_after:.2f}s, attempt {msg.attempts}/{self.max_attempts}, "
+            f"queued={self.depth})."
+        )
+        if msg.attempts < self.max_attempts:
+            return False
+        logger.error(f"Still rate limited; keeping {self.depth} messages queued.")
+        msg.attempts = 0
+        return True
+
+    def drain(self, send: Callable[..., Any]) -> int:
+        """Send queued messages in order with ``send(**kwargs)``. Returns the number sent."""
+        sent = 0
+        while self._pending:
+            delay = self._delay()
+            if delay > 0:
+                self.sleep(delay)
+            msg = self._pending[0]
+            try:
+                result = (msg.via or send)(**msg.kwargs)
+            except HTTPException as e:
+                if self._failed(msg, e):
+                    break
+                continue
+            self._pending.popleft()
+            sent += 1
+            if msg.on_sent is not None:
+                msg.on_sent(result)
+        return sent
+
+    async def drain_async(self, send: Callable[..., Awaitable[Any]]) -> int:
+        """Async variant of :meth:`drain`."""
+        sent = 0
+        while self._pending:
+            delay = self._delay()
+            if delay > 0:
+                await self.async_sleep(delay)
+            msg = self._pending[0]
+            try:
+                result = await (msg.via or send)(**msg.kwargs)
+            except HTTPException as e:
+                if self._failed(msg, e):
+                    break
+                continue
+            self._pending.popleft()
+            sent += 1
+            if msg.on_sent is not None:
+                msg.on_sent(result)
+        return sent
+
+
+# Rendered alert/cancellation embeds kept per notifier for re-sends
+EMBED_CACHE_SIZE = 512
+
+# severity (normalized: stripped, lower-case) -> embed colour
+_SEVERITY_COLOURS: Dict[str, discord.Colour] = {
+    # English mapping (contract)
+    "emergency": discord.Colour.dark_red(),
+    "warning": discord.Colour.orange(),
+    "advisory": discord.Colour.gold(),
+    # Common Japanese severities
+    "特別警報": discord.Colour.dark_red(),
+    "tokubetsu-keihou": discord.Colour.dark_red(),
+    "警報": discord.Colour.orange(),
+    "keihou": discord.Colour.orange(),
+    "注意報": discord.Colour.gold(),
+    "chuuihou": discord.Colour.gold(),
+}
+_DEFAULT_SEVERITY_COLOUR = discord.Colour.light_grey()
+
+CANCELLATION_TITLE = "【解除】気象警報・注意報"
+CANCELLATION_DESCRIPTION = "以下の地域の警報・注意報は解除されました。"
+CANCELLATION_COLOUR = discord.Colour.green()
+JMA_FOOTER = "気象庁 | JMA"
+
+GUIDANCE_TITLE = "登校ガイダンス"
+GUIDANCE_COLOUR = discord.Colour.blue()
+_DECISION_POINT_LABELS = {"pre6": "6時判定前", "06": "6時判定", "08": "8時判定", "10": "10時判定"}
+
+
+def severity_colour(severity: str) -> discord.Colour:
+    return _SEVERITY_COLOURS.get((severity or "").strip().lower(), _DEFAULT_SEVERITY_COLOUR)
+
+
+def _format_result_line(g: SchoolGuidance) -> str:
+    """表示専用の結果行を整形（例: 8時判定で自宅学習 → 「少なくとも10時までは自宅学習」）"""
+    # 6時判定時は8時までに再判定があるため、待機系は「少なくとも8時まで」を明示
+    if g.decision_point == "06" and g.status == "自宅待機":
+        return "結果: 少なくとも8時までは自宅待機"
+    # 8時判定の段階で自宅学習が確定しているのは月・土のみ（ポリシー）。
+    # この場合、10時の最終判定までは継続のため、「少なくとも10時までは自宅学習」と表現する。
+    if g.status == "自宅学習" and g.decision_point == "08":
+        return "結果: 少なくとも10時までは自宅学習"
+    # それ以外は従来通りのステータスをそのまま表示
+    return f"結果: {g.status}"
+
+
+MAX_FIELD_VALUE_CHARS = 1024
+MAX_FIELDS_PER_EMBED = 25
+# Discord rejects an embed whose title, description, fields and footer total over 6000 chars
+MAX_EMBED_CHARS = 6000
+AREA_SEPARATOR = "、"
+
+
+def _copy_embed(embed: discord.Embed) -> discord.Embed:
+    """Copy of a cached embed; ``Embed.copy`` shares its field list with the original."""
+    return discord.Embed.from_dict(copy.deepcopy(embed.to_dict()))
+
+
+def group_alerts(alerts: Iterable[Alert]) -> list[list[Alert]]:
+    """Group alerts sharing category, severity and issue time (in order of first appearance)."""
+    groups: Dict[tuple, list[Alert]] = {}
+    for a in alerts:
+        groups.setdefault((a.category, a.severity, a.issued_at), []).append(a)
+    return list(groups.values())
+
+
+def _area_chunks(alerts: Iterable[Alert]) -> list[str]:
+    """Distinct area names joined into field values of at most 1024 characters."""
+    names = list(dict.fromkeys(a.ward or a.area for a in alerts))
+    chunks: list[str] = []
+    current = ""
+    for name in names:
+        candidate = f"{current}{AREA_SEPARATOR}{name}" if current else name
+        if current and len(candidate) > MAX_FIELD_VALUE_CHARS:
+            chunks.append(current)
+            candidate = name
+        current = candidate[:MAX_FIELD_VALUE_CHARS]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# Alerts of one group and the embeds rendered for them
+_Rendered = tuple[list[Alert], list[discord.Embed]]
+# (slot, alerts, new embeds) per message id to edit in place
+_Edits = Dict[int, list[tuple[MessageSlot, list[Alert], list[discord.Embed]]]]
+
+
+def layout_messages(
+    rendered: Iterable[_Rendered],
+) -> list[tuple[list[discord.Embed], list[tuple[list[Alert], int, int]]]]:
+    """Pack rendered groups into messages (see :func:`batch_embeds`) and locate each group.
+
+    Returns ``(embeds, slots)`` per message, where ``slots`` lists ``(alerts, index, span)``
+    for every group whose embeds all landed in that message. A group split across two
+    messages has no slot, so it cannot be edited in place later.
+    """
+    groups: list[list[Alert]] = []
+    owners: list[int] = []
+    embeds: list[discord.Embed] = []
+    for n, (alerts, group_embeds) in enumerate(rendered):
+        groups.append(alerts)
+        owners.extend([n] * len(group_embeds))
+        embeds.extend(group_embeds)
+    totals = Counter(owners)
+
+    messages = []
+    pos = 0
+    for batch in batch_embeds(embeds):
+        batch_owners = owners[pos : pos + len(batch)]
+        spans = Counter(batch_owners)
+        slots = [
+            (groups[n], batch_owners.index(n), span)
+            for n, span in spans.items()
+            if span == totals[n] and groups[n]
+        ]
+        messages.append((batch, slots))
+        pos += len(batch)
+    return messages
+
+
+def plan_edits(
+    alerts: Iterable[Alert],
+    messages: Dict[str, MessageSlot],
+    render: Callable[[list[Alert]], list[discord.Embed]],
+) -> tuple[_Edits, list[Alert]]:
+    """Split alerts into in-place edits of their previous messages and alerts to post anew.
+
+    A slot is edited only when every alert rendered into it is in ``alerts`` and they still
+    render as one group with the same number of embeds. Anything else would drop other
+    alerts from the message or shift the slots after it, so those alerts are posted instead.
+    """
+    by_slot: Dict[MessageSlot, list[Alert]] = {}
+    posts: list[Alert] = []
+    for a in alerts:
+        slot = messages.get(a.id)
+        if slot is None:
+            posts.append(a)
+        else:
+            by_slot.setdefault(slot, []).append(a)
+
+    edits: _Edits = {}
+    for slot, members in by_slot.items():
+        groups = group_alerts(members)
+        embeds = render(groups[0]) if len(groups) == 1 else []
+        if len(members) != slot.members or len(embeds) != slot.span:
+            posts.extend(members)
+            continue
+        edits.setdefault(slot.message_id, []).append((slot, members, embeds))
+    return edits, posts
+
+
+def _record_slots(
+    refs: Dict[str, MessageSlot], slots: list[tuple[list[Alert], int, int]]
+) -> Callable[[Any], None]:
+    """``on_sent`` callback storing the slot of each alert of a sent/edited message."""
+
+    def on_sent(message: Any) -> None:
+        message_id = getattr(message, "id", None)
+        if not isinstance(message_id, int):
+            return
+        for alerts, index, span in slots:
+            slot = MessageSlot(message_id=message_id, index=index, span=span, members=len(alerts))
+            refs.update((a.id, slot) for a in alerts)
+
+    return on_sent
+
 
 class DiscordNotifier:
     """Send alert messages to Discord.
@@ -22,6 +367,10 @@ class DiscordNotifier:
     Supports two modes:
       1) Webhook (recommended): set DISCORD_WEBHOOK_URL
       2) Bot token + channel ID: set DISCORD_BOT_TOKEN and DISCORD_CHANNEL_ID
+
+    Alert messages are sent with ``wait=True``; the send methods return the
+    :class:`MessageSlot` of each alert so a later update or cancellation can edit that
+    message in place (see :meth:`send_updates`).
     """
 
     def __init__(
@@ -37,6 +386,11 @@ class DiscordNotifier:
         # Allow dry-run via parameter or env var
         env_dry = os.getenv("DRY_RUN", "").lower() in {"1", "true", "yes", "on"}
         self.dry_run = env_dry if dry_run is None else dry_run
+        # Webhook object and HTTP session are created on first send and reused afterwards
+        self.session: Optional[requests.Session] = None
+        self._webhook = None
+        self.send_queue = WebhookSendQueue()
+        self._embed_cache: OrderedDict[tuple, discord.Embed] = OrderedDict()
 
         if not self.webhook_url and not (self.token and self.channel_id) and not self.dry_run:
             logger.warning("Discord notifier is not configured. Set DISCORD_WEBHOOK_URL.")
@@ -57,27 +411,24 @@ class DiscordNotifier:
         - timestamp -> alert.issued_at
         - color -> mapped from alert.severity
         - description -> "**Category**: {category}\n**Area**: {ward or area}\n\n" (+ optional body)
+
+        Rendered embeds are memoized per alert id/status and displayed fields, so re-sends
+        reuse them; treat the returned embed as read-only (copy it before modifying).
         """
 
-        def _severity_to_color(severity: str) -> discord.Color:
-            s = (severity or "").strip().lower()
-            # English mapping (contract)
-            if s == "emergency":
-                return discord.Color.dark_red()
-            if s == "warning":
-                return discord.Color.orange()
-            if s == "advisory":
-                return discord.Color.gold()
-
-            # Common Japanese severities
-            if s in {"特別警報".lower(), "tokubetsu-keihou"}:
-                return discord.Color.dark_red()
-            if s in {"警報".lower(), "keihou", "warning"}:
-                return discord.Color.orange()
-            if s in {"注意報".lower(), "chuuihou", "advisory"}:
-                return discord.Color.gold()
-
-            return discord.Color.light_grey()
+        key = (
+            alert.id,
+            alert.status,
+            alert.category,
+            alert.severity,
+            alert.ward or alert.area,
+            alert.issued_at,
+            alert.link,
+        )
+        cached = self._embed_cache.get(key)
+        if cached is not None:
+            self._embed_cache.move_to_end(key)
+            return cached
 
         # Build description core (category omitted as it's now the title)
         area_text = alert.ward or alert.area
@@ -96,10 +447,69 @@ class DiscordNotifier:
             description=description,
             url=alert.link or None,
             timestamp=alert.issued_at,
-            colour=_severity_to_color(alert.severity),
+            colour=severity_colour(alert.severity),
         )
+        self._remember_embed(key, embed)
         return embed
 
+    def _remember_embed(self, key: tuple, embed: discord.Embed) -> None:
+        self._embed_cache[key] = embed
+        if len(self._embed_cache) > EMBED_CACHE_SIZE:
+            self._embed_cache.popitem(last=False)
+
+    def _add_area_fields(
+        self, embed: discord.Embed, chunks: list[str], limit: int, reserve: int = 0
+    ) -> int:
+        """Add area fields until ``limit`` fields or the embed character cap is reached.
+
+        ``reserve`` characters are kept free for fields added afterwards. At least one
+        chunk is always added so the caller makes progress; returns the number added.
+        """
+        added = 0
+        for chunk in chunks[:limit]:
+            name = "地域" if added == 0 else "地域（続き）"
+            if added and len(embed) + len(name) + len(chunk) + reserve > MAX_EMBED_CHARS:
+                break
+            embed.add_field(name=name, value=chunk, inline=False)
+            added += 1
+        return added
+
+    def _create_digest_embeds(self, group: list[Alert]) -> list[discord.Embed]:
+        """One embed for a group of alerts (see :func:`group_alerts`) listing every area.
+
+        Single-alert groups use the regular alert embed. Area lists longer than the field
+        or character limits are continued in further embeds.
+        """
+        if len(group) == 1:
+            return [self._create_embed_from_alert(group[0])]
+        chunks = _area_chunks(group)
+        embeds = []
+        start = 0
+        while start < len(chunks):
+            embed = _copy_embed(self._create_embed_from_alert(group[0]))
+            embed.description = f"**Area**: {len(group)}地域\n"
+            start += self._add_area_fields(embed, chunks[start:], MAX_FIELDS_PER_EMBED)
+            embeds.append(embed)
+        return embeds
+
+    def _create_cancellation_digest_embeds(self, group: list[Alert]) -> list[discord.Embed]:
+        if len(group) == 1:
+            return [self._create_cancellation_embed(group[0])]
+        chunks = _area_chunks(group)
+        category_name = "解除された警報・注意報"
+        reserve = len(category_name) + len(group[0].category)
+        embeds = []
+        start = 0
+        while start < len(chunks):
+            embed = _copy_embed(self._create_cancellation_embed(group[0]))
+            embed.clear_fields()
+            start += self._add_area_fields(
+                embed, chunks[start:], MAX_FIELDS_PER_EMBED - 1, reserve
+            )
+            embed.add_field(name=category_name, value=group[0].category, inline=False)
+            embeds.append(embed)
+        return embeds
+
     def _create_cancellation_embed(self, alert: Alert) -> discord.Embed:
         """Create a Discord Embed for cancellation per the contract specs/003-/contracts/discord_cancellation_embed.md.
 
@@ -110,16 +520,29 @@ class DiscordNotifier:
         - fields: 地域, 解除された警報・注意報
         - footer: 気象庁 | JMA
         """
+        key = (
+            "cancelled",
+            alert.id,
+            alert.category,
+            alert.ward or alert.area,
+            alert.issued_at,
+            alert.link,
+        )
+        cached = self._embed_cache.get(key)
+        if cached is not None:
+            self._embed_cache.move_to_end(key)
+            return cached
         embed = discord.Embed(
-            title="【解除】気象警報・注意報",
-            description="以下の地域の警報・注意報は解除されました。",
-            colour=discord.Color.green(),
+            title=CANCELLATION_TITLE,
+            description=CANCELLATION_DESCRIPTION,
+            colour=CANCELLATION_COLOUR,
             url=alert.link or None,
             timestamp=alert.issued_at,
         )
         embed.add_field(name="地域", value=alert.ward or alert.area, inline=False)
         embed.add_field(name="解除された警報・注意報", value=alert.category, inline=False)
-        embed.set_footer(text="気象庁 | JMA")
+        embed.set_footer(text=JMA_FOOTER)
+        self._remember_embed(key, embed)
         return embed
 
     def _get_sync_webhook_cls(self):  # type: ignore[no-untyped-def]
@@ -135,81 +558,203 @@ class DiscordNotifier:
         # Otherwise use current discord.SyncWebhook (unit tests patch this)
         return disc_attr
 
-    def _send_via_webhook(self, embeds: list[discord.Embed]) -> None:
+    def _get_webhook(self):  # type: ignore[no-untyped-def]
+        """Return the cached webhook for ``webhook_url`` (pooled connections across sends)."""
+        if self._webhook is None:
+            if self.session is None:
+                self.session = requests.Session()
+            wh_cls = self._get_sync_webhook_cls()
+            self._webhook = wh_cls.from_url(self.webhook_url, session=self.session)
+        return self._webhook
+
+    def flush(self) -> int:
+        """Send messages left queued by earlier rate-limited sends. Returns the number sent."""
+        if not self.send_queue.depth or self.dry_run or not self.webhook_url:
+            return 0
+        sent = self.send_queue.drain(self._get_webhook().send)
+        logger.info(f"Sent {sent} queued webhook messages ({self.send_queue.depth} queued).")
+        return sent
+
+    def _drain(self, send: Callable[..., Any], mark: int) -> int:
+        """Drain the send queue; on a non-HTTP error drop this dispatch's unsent messages.
+
+        The caller records nothing for a failed dispatch, so a message left queued would be
+        sent by the next drain and then again by the retried dispatch.
+        """
+        try:
+            return self.send_queue.drain(send)
+        except Exception:
+            dropped = self.send_queue.drop_since(mark)
+            logger.error(f"Webhook send failed; dropped {dropped} unsent messages.")
+            raise
+
+    def close(self) -> None:
+        """Send what is still queued, then release the HTTP session."""
+        try:
+            self.flush()
+        except Exception as e:  # pylint: disable=broad-except-clause
+            logger.exception(f"Failed to send queued webhook messages on close: {e}")
+        if self.send_queue.depth:
+            logger.error(f"Dropping {self.send_queue.depth} webhook messages still queued.")
+        if self.session is not None:
+            self.session.close()
+        self.session = None
+        self._webhook = None
+
+    def _queue_posts(self, rendered: list[_Rendered], refs: Dict[str, MessageSlot]) -> None:
+        messages = layout_messages(rendered)
+        count = sum(len(embeds) for embeds, _ in messages)
+        logger.info(f"Sending {count} alerts via webhook in {len(messages)} messages.")
+        for embeds, slots in messages:
+            self.send_queue.put(embeds=embeds, wait=True, on_sent=_record_slots(refs, slots))
+
+    def _queue_edit(
+        self,
+        edit: Callable[..., Any],
+        message: Any,
+        parts: list[tuple[MessageSlot, list[Alert], list[discord.Embed]]],
+        refs: Dict[str, MessageSlot],
+    ) -> list[_Rendered]:
+        """Queue an edit replacing the slots of ``message``; returns what must be posted instead."""
+        if message is None:
+            return [(members, new) for _, members, new in parts]
+        embeds = list(message.embeds)
+        if any(slot.index + slot.span > len(embeds) for slot, _, _ in parts):
+            return [(members, new) for _, members, new in parts]
+        # Edits keep each slot's embed count, so the other slots' indexes stay valid
+        for slot, _, new in parts:
+            embeds[slot.index : slot.index + slot.span] = new
+        logger.info(f"Editing {len(parts)} alert groups in message {message.id}.")
+        slots = [(members, slot.index, slot.span) for slot, members, _ in parts]
+        record = _record_slots(refs, slots)
+        self.send_queue.put(
+            via=edit, message_id=message.id, embeds=embeds, on_sent=lambda _: record(message)
+        )
+        return []
+
+    def _send_via_webhook(
+        self, rendered: list[_Rendered], edits: Optional[_Edits] = None
+    ) -> Dict[str, MessageSlot]:
+        """Post rendered groups and apply ``edits`` through the send queue.
+
+        Returns the message slot of each alert whose message went out. An edit whose
+        message can no longer be fetched is posted as a new message instead.
+        """
         if not self.webhook_url:
             logger.error("Webhook URL is not set, cannot send alerts.")
             raise RuntimeError("DISCORD_WEBHOOK_URL is not set")
 
-        wh_cls = self._get_sync_webhook_cls()
-        webhook = wh_cls.from_url(self.webhook_url)
-        logger.info(f"Sending {len(embeds)} alerts via webhook.")
-        for i, embed in enumerate(embeds):
+        webhook = self._get_webhook()
+        refs: Dict[str, MessageSlot] = {}
+        rendered = list(rendered)
+        mark = self.send_queue.mark()
+        for message_id, parts in (edits or {}).items():
             try:
-                webhook.send(embed=embed)
-                logger.debug(f"Sent embed {i+1}/{len(embeds)} successfully.")
+                message = webhook.fetch_message(message_id)
             except HTTPException as e:
-                logger.exception(f"Failed to send embed {i+1} via webhook: {e}")
-        logger.info("Finished sending alerts via webhook.")
-
-    def send_alerts(self, alerts: Iterable[Alert]) -> None:
-        embeds = [self._create_embed_from_alert(a) for a in alerts]
+                logger.warning(f"Cannot edit message {message_id} ({e}); posting a new one.")
+                message = None
+            rendered += self._queue_edit(webhook.edit_message, message, parts, refs)
+        if rendered:
+            self._queue_posts(rendered, refs)
+        sent = self._drain(webhook.send, mark)
+        logger.info(
+            f"Finished sending alerts via webhook ({sent} messages sent, "
+            f"{self.send_queue.depth} queued)."
+        )
+        return refs
+
+    @property
+    def queue_depth(self) -> int:
+        """Messages waiting in the webhook send queue (e.g. after repeated rate limits)."""
+        return self.send_queue.depth
+
+    def send_alerts(self, alerts: Iterable[Alert]) -> Dict[str, MessageSlot]:
+        """Post new alerts. Returns the message slot of each posted alert (empty in dry-run)."""
+        # Alerts of one category/severity/issue time share a digest embed
+        rendered = [(g, self._create_digest_embeds(g)) for g in group_alerts(alerts)]
+        embeds = [e for _, group_embeds in rendered for e in group_embeds]
         if not embeds:
             logger.info("No alert embeds to send.")
-            return
+            return {}
 
         if self.dry_run:
             logger.info("[DRY-RUN] Would send the following alerts:")
             for i, e in enumerate(embeds, 1):
                 logger.info("[DRY-RUN %d/%d] title=%s", i, len(embeds), e.title)
-            return
+            return {}
 
         # Prefer webhook
         if self.webhook_url:
-            self._send_via_webhook(embeds)
-            return
+            return self._send_via_webhook(rendered)
 
         logger.error("Discord not configured for sending alerts.")
         raise RuntimeError("Discord not configured. Set DISCORD_WEBHOOK_URL for sending.")
 
-    def send_cancellations(self, alerts: Iterable[Alert]) -> None:
-        """Send cancellation embeds. Alerts should have status='cancelled'."""
+    def send_updates(
+        self, alerts: Iterable[Alert], messages: Dict[str, MessageSlot]
+    ) -> Dict[str, MessageSlot]:
+        """Edit the previous messages of changed alerts (see ``Alert.fingerprint``) in place.
+
+        ``messages`` maps alert ids to the slots returned when they were sent. Alerts
+        without an editable slot (see :func:`plan_edits`) are posted as new messages.
+        """
+        alerts = list(alerts)
+        if not alerts:
+            logger.info("No alert updates to send.")
+            return {}
+        edits, posts = plan_edits(alerts, messages, self._create_digest_embeds)
+
+        if self.dry_run:
+            logger.info(
+                "[DRY-RUN] Would edit %d messages and post %d updated alerts.",
+                len(edits),
+                len(posts),
+            )
+            return {}
+
+        if self.webhook_url:
+            rendered = [(g, self._create_digest_embeds(g)) for g in group_alerts(posts)]
+            return self._send_via_webhook(rendered, edits)
+
+        logger.error("Discord not configured for sending alert updates.")
+        raise RuntimeError("Discord not configured. Set DISCORD_WEBHOOK_URL for sending.")
+
+    def send_cancellations(
+        self, alerts: Iterable[Alert], messages: Optional[Dict[str, MessageSlot]] = None
+    ) -> Dict[str, MessageSlot]:
+        """Send cancellation embeds. Alerts should have status='cancelled'.
+
+        Alerts found in ``messages`` have their original message edited to the cancellation
+        embed where possible (see :meth:`send_updates`).
+        """
         cancels = [a for a in alerts if getattr(a, "status", "active") == "cancelled"]
         if not cancels:
             logger.info("No cancellations to send.")
-            return
-        embeds = [self._create_cancellation_embed(a) for a in cancels]
+            return {}
+        edits, posts = plan_edits(cancels, messages or {}, self._create_cancellation_digest_embeds)
+        rendered = [(g, self._create_cancellation_digest_embeds(g)) for g in group_alerts(posts)]
 
         if self.dry_run:
-            logger.info("[DRY-RUN] Would send %d cancellation alerts.", len(embeds))
+            embeds = [e for _, group_embeds in rendered for e in group_embeds]
+            logger.info(
+                "[DRY-RUN] Would send %d cancellation alerts and edit %d messages.",
+                len(embeds),
+                len(edits),
+            )
             for i, e in enumerate(embeds, 1):
                 logger.info("[DRY-RUN %d/%d] cancellation title=%s", i, len(embeds), e.title)
-            return
+            return {}
 
         if self.webhook_url:
-            self._send_via_webhook(embeds)
-            return
+            return self._send_via_webhook(rendered, edits)
 
         logger.error("Discord not configured for sending cancellation alerts.")
         raise RuntimeError("Discord not configured. Set DISCORD_WEBHOOK_URL for sending.")
 
     # --- School guidance ---
     def _create_guidance_embed(self, g: SchoolGuidance) -> discord.Embed:
-        title = "登校ガイダンス"
-        dp = {"pre6": "6時判定前", "06": "6時判定", "08": "8時判定", "10": "10時判定"}.get(
-            g.decision_point, g.decision_point
-        )
-        # 表示専用の結果行を整形（例: 8時判定で自宅学習 → 「少なくとも10時までは自宅学習」）
-        def _format_result_line(g: SchoolGuidance) -> str:
-            # 6時判定時は8時までに再判定があるため、待機系は「少なくとも8時まで」を明示
-            if g.decision_point == "06" and g.status == "自宅待機":
-                return "結果: 少なくとも8時までは自宅待機"
-            # 8時判定の段階で自宅学習が確定しているのは月・土のみ（ポリシー）。
-            # この場合、10時の最終判定までは継続のため、「少なくとも10時までは自宅学習」と表現する。
-            if g.status == "自宅学習" and g.decision_point == "08":
-                return "結果: 少なくとも10時までは自宅学習"
-            # それ以外は従来通りのステータスをそのまま表示
-            return f"結果: {g.status}"
-
+        dp = _DECISION_POINT_LABELS.get(g.decision_point, g.decision_point)
         desc_lines = [
             f"日付: {g.date}",
             f"判定: {dp}",
@@ -221,16 +766,14 @@ class DiscordNotifier:
             desc_lines.extend(["", *g.notes])
 
         embed = discord.Embed(
-            title=title,
+            title=GUIDANCE_TITLE,
             description="\n".join(desc_lines),
-            colour=discord.Color.blue(),
+            colour=GUIDANCE_COLOUR,
         )
         return embed
 
-    def send_school_guidance(self, guidance: SchoolGuidance) -> None:
-        embed = self._create_guidance_embed(guidance)
-        # Determine if role mention should be prefixed to content
-        content_prefix = ""
+    def _guidance_content_prefix(self, guidance: SchoolGuidance) -> str:
+        """Role mention to prefix the guidance message with (empty if not applicable)."""
         try:
             baseline = os.getenv("SCHOOL_NORMAL_TIME", "08:10")
             today_time = guidance.attend_time or ""
@@ -242,9 +785,15 @@ class DiscordNotifier:
                 and today_time != baseline
             )
             if should_mention:
-                content_prefix = f"<@&{role_setting.role_id}> "
+                return f"<@&{role_setting.role_id}> "
         except Exception as e:  # safe guard
             logger.warning("Failed to evaluate role mention condition: %s", e)
+        return ""
+
+    def send_school_guidance(self, guidance: SchoolGuidance) -> None:
+        embed = self._create_guidance_embed(guidance)
+        # Determine if role mention should be prefixed to content
+        content_prefix = self._guidance_content_prefix(guidance)
 
         if self.dry_run:
             logger.info("[DRY-RUN] Would send school guidance: %s", guidance.status)
@@ -254,16 +803,122 @@ class DiscordNotifier:
 
         if self.webhook_url:
             # Send via webhook with optional content prefix
-            wh_cls = self._get_sync_webhook_cls()
-            webhook = wh_cls.from_url(self.webhook_url)
-            try:
-                if content_prefix:
-                    webhook.send(content=content_prefix, embed=embed)
-                else:
-                    webhook.send(embed=embed)
-            except HTTPException as e:
-                logger.exception("Failed to send school guidance via webhook: %s", e)
+            webhook = self._get_webhook()
+            mark = self.send_queue.mark()
+            if content_prefix:
+                self.send_queue.put(content=content_prefix, embed=embed)
+            else:
+                self.send_queue.put(embed=embed)
+            self._drain(webhook.send, mark)
             return
 
         logger.error("Discord not configured for sending school guidance.")
         raise RuntimeError("Discord not configured. Set DISCORD_WEBHOOK_URL for sending.")
+
+
+class AsyncDiscordNotifier(DiscordNotifier):
+    """Asyncio variant of :class:`DiscordNotifier` for the async runtime.
+
+    Sends through discord.py's async ``Webhook`` bound to a shared ``aiohttp`` session.
+    Embed construction and dry-run behaviour are inherited from the sync notifier.
+    """
+
+    def __init__(self, *, http_session, **kwargs) -> None:  # type: ignore[no-untyped-def]
+        super().__init__(**kwargs)
+        self.http_session = http_session
+        self._async_webhook: Optional[discord.Webhook] = None
+
+    def _get_async_webhook(self) -> discord.Webhook:
+        if not self.webhook_url:
+            logger.error("Webhook URL is not set, cannot send alerts.")
+            raise RuntimeError("DISCORD_WEBHOOK_URL is not set")
+        if self._async_webhook is None:
+            self._async_webhook = discord.Webhook.from_url(
+                self.webhook_url, session=self.http_session
+            )
+        return self._async_webhook
+
+    async def flush_async(self) -> int:
+        """Async variant of :meth:`flush`."""
+        if not self.send_queue.depth or self.dry_run or not self.webhook_url:
+            return 0
+        sent = await self.send_queue.drain_async(self._get_async_webhook().send)
+        logger.info(f"Sent {sent} queued webhook messages ({self.send_queue.depth} queued).")
+        return sent
+
+    async def _drain_async(self, send: Callable[..., Awaitable[Any]], mark: int) -> int:
+        """Async variant of :meth:`_drain`."""
+        try:
+            return await self.send_queue.drain_async(send)
+        except Exception:
+            dropped = self.send_queue.drop_since(mark)
+            logger.error(f"Webhook send failed; dropped {dropped} unsent messages.")
+            raise
+
+    async def _send_via_webhook_async(
+        self, rendered: list[_Rendered], edits: Optional[_Edits] = None
+    ) -> Dict[str, MessageSlot]:
+        webhook = self._get_async_webhook()
+        refs: Dict[str, MessageSlot] = {}
+        rendered = list(rendered)
+        mark = self.send_queue.mark()
+        for message_id, parts in (edits or {}).items():
+            try:
+                message = await webhook.fetch_message(message_id)
+            except HTTPException as e:
+                logger.warning(f"Cannot edit message {message_id} ({e}); posting a new one.")
+                message = None
+            rendered += self._queue_edit(webhook.edit_message, message, parts, refs)
+        if rendered:
+            self._queue_posts(rendered, refs)
+        sent = await self._drain_async(webhook.send, mark)
+        logger.info(
+            f"Finished sending alerts via webhook ({sent} messages sent, "
+            f"{self.send_queue.depth} queued)."
+        )
+        return refs
+
+    async def send_alerts_async(self, alerts: Iterable[Alert]) -> Dict[str, MessageSlot]:
+        alerts = list(alerts)
+        if self.dry_run or not alerts:
+            return self.send_alerts(alerts)
+        return await self._send_via_webhook_async(
+            [(g, self._create_digest_embeds(g)) for g in group_alerts(alerts)]
+        )
+
+    async def send_updates_async(
+        self, alerts: Iterable[Alert], messages: Dict[str, MessageSlot]
+    ) -> Dict[str, MessageSlot]:
+        alerts = list(alerts)
+        if self.dry_run or not alerts:
+            return self.send_updates(alerts, messages)
+        edits, posts = plan_edits(alerts, messages, self._create_digest_embeds)
+        return await self._send_via_webhook_async(
+            [(g, self._create_digest_embeds(g)) for g in group_alerts(posts)], edits
+        )
+
+    async def send_cancellations_async(
+        self, alerts: Iterable[Alert], messages: Optional[Dict[str, MessageSlot]] = None
+    ) -> Dict[str, MessageSlot]:
+        cancels = [a for a in alerts if getattr(a, "status", "active") == "cancelled"]
+        if self.dry_run or not cancels:
+            return self.send_cancellations(cancels, messages)
+        render = self._create_cancellation_digest_embeds
+        edits, posts = plan_edits(cancels, messages or {}, render)
+        return await self._send_via_webhook_async(
+            [(g, render(g)) for g in group_alerts(posts)], edits
+        )
+
+    async def send_school_guidance_async(self, guidance: SchoolGuidance) -> None:
+        if self.dry_run:
+            self.send_school_guidance(guidance)
+            return
+        webhook = self._get_async_webhook()
+        embed = self._create_guidance_embed(guidance)
+        content_prefix = self._guidance_content_prefix(guidance)
+        mark = self.send_queue.mark()
+        if content_prefix:
+            self.send_queue.put(content=content_prefix, embed=embed)
+        else:
+            self.send_queue.put(embed=embed)
+        await self._drain_async(webhook.send, mark)
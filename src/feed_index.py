@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .jma_feed import FeedEntry
+
+logger = logging.getLogger(__name__)
+
+
+class SeenEntryIndex:
+    """Remember processed Atom feed entries so unchanged ones are not fetched again.
+
+    File format:
+        { "<entry id>": {"updated": "<iso8601>", "seen_at": "<iso8601>"}, ... }
+
+    An entry counts as new when its id is unknown or its ``<updated>`` differs from the
+    recorded one. Records older than ``retention`` (by ``seen_at``) are evicted on flush.
+    """
+
+    def __init__(self, path: Path, retention: timedelta = timedelta(days=7)) -> None:
+        self.path = path
+        self.retention = retention
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._items: Dict[str, Dict[str, str]] = self._read()
+        self._dirty = False
+
+    def _read(self) -> Dict[str, Dict[str, str]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                return {str(k): dict(v) for k, v in data.items() if isinstance(v, dict)}
+            logger.warning("Unexpected seen-entry index format; starting empty.")
+            return {}
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, TypeError, ValueError):
+            logger.exception(f"Failed to decode seen-entry index {self.path}, starting empty.")
+            return {}
+
+    def _write(self) -> None:
+        try:
+            self.path.write_text(
+                json.dumps(self._items, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            logger.debug(f"Wrote {len(self._items)} seen entries to {self.path}")
+        except OSError as e:
+            logger.exception(f"Failed to write seen-entry index {self.path}: {e}")
+
+    @staticmethod
+    def _updated_key(entry: FeedEntry) -> str:
+        return entry.updated.isoformat() if entry.updated else ""
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def is_new(self, entry: FeedEntry) -> bool:
+        rec = self._items.get(entry.id)
+        return rec is None or rec.get("updated") != self._updated_key(entry)
+
+    def filter_new(self, entries: Iterable[FeedEntry]) -> List[FeedEntry]:
+        return [e for e in entries if self.is_new(e)]
+
+    def mark(self, entries: Iterable[FeedEntry], now: Optional[datetime] = None) -> None:
+        seen_at = (now or datetime.now(timezone.utc)).isoformat()
+        for e in entries:
+            self._items[e.id] = {"updated": self._updated_key(e), "seen_at": seen_at}
+            self._dirty = True
+
+    def evict(self, now: Optional[datetime] = None) -> int:
+        cutoff = (now or datetime.now(timezone.utc)) - self.retention
+        expired = []
+        for entry_id, rec in self._items.items():
+            try:
+                seen_at = datetime.fromisoformat(rec.get("seen_at", ""))
+            except ValueError:
+                expired.append(entry_id)
+                continue
+            if seen_at < cutoff:
+                expired.append(entry_id)
+        for entry_id in expired:
+            del self._items[entry_id]
+        if expired:
+            self._dirty = True
+            logger.info(f"Evicted {len(expired)} seen feed entries older than {self.retention}.")
+        return len(expired)
+
+    def flush(self, now: Optional[datetime] = None) -> None:
+        self.evict(now)
+        if self._dirty:
+            self._write()
+            self._dirty = False
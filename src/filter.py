@@ -1,64 +1,149 @@
 from __future__ import annotations
 
 import logging
-from typing import Iterable
+from collections import deque
+from dataclasses import replace
+from typing import Iterable, Iterator
 
 from .models import Alert
 
 logger = logging.getLogger(__name__)
 
-TOKYO_23_WARDS = {
-    "千代田区",
-    "中央区",
-    "港区",
-    "新宿区",
-    "文京区",
-    "台東区",
-    "墨田区",
-    "江東区",
-    "品川区",
-    "目黒区",
-    "大田区",
-    "世田谷区",
-    "渋谷区",
-    "中野区",
-    "杉並区",
-    "豊島区",
-    "北区",
-    "荒川区",
-    "板橋区",
-    "練馬区",
-    "足立区",
-    "葛飾区",
-    "江戸川区",
+# JMA area codes (Area/Code) of the 23 wards: 5-digit JIS municipality code + "00"
+TOKYO_23_WARD_CODES = {
+    "1310100": "千代田区",
+    "1310200": "中央区",
+    "1310300": "港区",
+    "1310400": "新宿区",
+    "1310500": "文京区",
+    "1310600": "台東区",
+    "1310700": "墨田区",
+    "1310800": "江東区",
+    "1310900": "品川区",
+    "1311000": "目黒区",
+    "1311100": "大田区",
+    "1311200": "世田谷区",
+    "1311300": "渋谷区",
+    "1311400": "中野区",
+    "1311500": "杉並区",
+    "1311600": "豊島区",
+    "1311700": "北区",
+    "1311800": "荒川区",
+    "1311900": "板橋区",
+    "1312000": "練馬区",
+    "1312100": "足立区",
+    "1312200": "葛飾区",
+    "1312300": "江戸川区",
 }
 
+TOKYO_23_WARDS = set(TOKYO_23_WARD_CODES.values())
+
+# Lookup by the 5-digit JIS prefix so that code variants of the same municipality match
+_WARD_BY_JIS = {code[:5]: ward for code, ward in TOKYO_23_WARD_CODES.items()}
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher (Aho–Corasick automaton).
+
+    Built once from a fixed pattern set; each scan is a single pass over the text,
+    independent of the number of patterns.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[str, ...]] = [()]
+        for p in patterns:
+            if p:
+                self._insert(p)
+        self._build()
+
+    def _insert(self, pattern: str) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] = self._out[node] + (pattern,)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[str]:
+        """Yield every pattern occurring in ``text``, ordered by end position."""
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                yield from out[node]
+
+
+_WARD_MATCHER = AhoCorasick(TOKYO_23_WARDS)
+
+
+def find_wards(text: str | None) -> list[str]:
+    """Return all distinct 23-ward names contained in ``text`` in order of appearance."""
+    if not text:
+        return []
+    return list(dict.fromkeys(_WARD_MATCHER.iter_matches(text)))
+
+
+def ward_for_code(area_code: str | None) -> str | None:
+    """Return the ward for a JMA area code, or None if it is not one of the 23 wards."""
+    if not area_code:
+        return None
+    return _WARD_BY_JIS.get(area_code.strip()[:5])
+
+
+def match_ward(alert: Alert) -> str | None:
+    """Return the alert's ward.
+
+    Alerts carrying a JMA area code are resolved by a hash lookup on the code only, so that
+    e.g. 名古屋市北区 never matches 北区. Alerts without a code fall back to the first ward
+    named in the area (or ward) text.
+    """
+    if alert.area_code:
+        return ward_for_code(alert.area_code)
+    for text in (alert.area, alert.ward):
+        if text:
+            for ward in _WARD_MATCHER.iter_matches(text):
+                return ward
+    return None
+
 
 def pick_23_wards(alerts: Iterable[Alert]) -> list[Alert]:
-    """Return only alerts that match one of Tokyo's 23 wards by name in area."""
-    logger.debug(f"Filtering {len(list(alerts))} alerts for Tokyo's 23 wards.")
+    """Return only alerts that match one of Tokyo's 23 wards by name in area.
+
+    Accepts any iterable (including generators) and consumes it exactly once.
+    """
     result: list[Alert] = []
+    total = 0
     for a in alerts:
-        ward = next((w for w in TOKYO_23_WARDS if w in a.area or (a.ward and w in a.ward)), None)
+        total += 1
+        ward = match_ward(a)
         if ward:
             logger.debug(f"Found match for ward '{ward}' in alert area '{a.area}'.")
-            result.append(
-                Alert(
-                    id=a.id,
-                    title=a.title,
-                    area=a.area,
-                    ward=ward,
-                    category=a.category,
-                    severity=a.severity,
-                    issued_at=a.issued_at,
-                    expires_at=a.expires_at,
-                    link=a.link,
-                        status=a.status,
-                    raw=a.raw,
-                )
-            )
+            result.append(replace(a, ward=ward))
         else:
             logger.debug(f"No match for 23 wards in alert area '{a.area}'. Skipping.")
 
-    logger.info(f"Filtered {len(list(alerts))} alerts down to {len(result)} for Tokyo's 23 wards.")
+    logger.info(f"Filtered {total} alerts down to {len(result)} for Tokyo's 23 wards.")
     return result
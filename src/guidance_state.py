@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
-from .models import SchoolGuidance
+from .models import Alert, SchoolGuidance
+
+logger = logging.getLogger(__name__)
 
 
 def _to_jst(dt: datetime) -> datetime:
@@ -28,13 +31,25 @@ class GuidanceController:
       - Always send once when entering decision points 06/08/10 on that date.
       - Between 06:00 and 10:00 JST, if target-warning presence flips (add/remove), send update.
       - Persist minimal state per date to avoid duplicates.
+
+    The state file is read once; afterwards the controller keeps the state in memory and
+    writes it through on every change.
     """
 
     def __init__(self, path: Path) -> None:
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._state: Optional[DailyState] = None
+        self._loaded = False
 
     def _read(self) -> Optional[DailyState]:
+        if not self._loaded:
+            self._state = self._load()
+            self._loaded = True
+        # Callers mutate the returned state before writing it back
+        return replace(self._state) if self._state is not None else None
+
+    def _load(self) -> Optional[DailyState]:
         try:
             data = json.loads(self.path.read_text(encoding="utf-8"))
             return DailyState(
@@ -56,6 +71,8 @@ class GuidanceController:
             "any_seen_target_today": st.any_seen_target_today,
         }
         self.path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        self._state = replace(st)
+        self._loaded = True
 
     def should_send(self, *, guidance: SchoolGuidance, has_target: bool, now: datetime) -> bool:
         jst = _to_jst(now)
@@ -99,3 +116,47 @@ class GuidanceController:
             st.any_seen_target_today = st.any_seen_target_today or has_target
             self._write(st)
         return False
+
+
+class CurrentAlerts:
+    """Persist the Tokyo alerts of the last processed bulletin.
+
+    A VPWW53 bulletin lists every warning in effect for its office, so the alerts of the
+    latest one describe the current state. Guidance and the polling interval use this state
+    on every tick, including ticks where the feed was not modified or only other regions
+    had new entries.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._alerts: Optional[List[Alert]] = None
+
+    @property
+    def alerts(self) -> List[Alert]:
+        if self._alerts is None:
+            self._alerts = self._load()
+        return list(self._alerts)
+
+    def _load(self) -> List[Alert]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return [Alert.from_dict(item) for item in data]
+        except FileNotFoundError:
+            return []
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            logger.exception(f"Failed to read current alerts from {self.path}; starting empty.")
+            return []
+
+    def replace(self, alerts: List[Alert]) -> None:
+        """Make ``alerts`` the current state and write it through."""
+        self._alerts = list(alerts)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            tmp_path.write_text(
+                json.dumps([a.to_dict() for a in self._alerts], ensure_ascii=False),
+                encoding="utf-8",
+            )
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.exception(f"Failed to write current alerts to {self.path}: {e}")
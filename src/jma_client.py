@@ -1,30 +1,198 @@
 from __future__ import annotations
 
+import json
 import logging
 import os
 from pathlib import Path
+from typing import Dict, Optional
 
 import requests
 from requests import exceptions as req_exc
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+HTTP_TIMEOUT_SEC = 15
+# Transient failures (connection errors, 429/5xx) are retried with exponential backoff
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+USER_AGENT = "keihou-bot (+https://github.com/tsukuba-denden/keihou-bot)"
+
+
+def build_session(pool_maxsize: int = 4) -> requests.Session:
+    """Create a keep-alive session tuned for polling the JMA server.
+
+    ``pool_maxsize`` should be at least the number of concurrent fetches (crawler workers)
+    so that every worker can keep its own connection open.
+    """
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=HTTP_RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        # Hand the last response back so raise_for_status() reports the real status
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, pool_maxsize), max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+    )
+    return session
+
+
+class ValidatorStore:
+    """Persist HTTP cache validators (ETag / Last-Modified) per URL.
+
+    File format:
+        { "<url>": {"etag": "...", "last_modified": "..."}, ... }
+
+    New validators are staged by :meth:`update` and only persisted by :meth:`commit`, so a
+    response whose processing failed is fetched again in full on the next run.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._items: Dict[str, Dict[str, str]] = self._read()
+        self._pending: Dict[str, Dict[str, str]] = {}
+
+    def _read(self) -> Dict[str, Dict[str, str]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                return {str(k): dict(v) for k, v in data.items() if isinstance(v, dict)}
+            logger.warning("Unexpected validator cache format; starting empty.")
+            return {}
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, TypeError, ValueError):
+            logger.exception(f"Failed to decode validator cache {self.path}, starting empty.")
+            return {}
+
+    def _write(self) -> None:
+        try:
+            self.path.write_text(
+                json.dumps(self._items, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+        except OSError as e:
+            logger.exception(f"Failed to write validator cache {self.path}: {e}")
+
+    def get(self, url: str) -> Dict[str, str]:
+        return dict(self._items.get(url, {}))
+
+    def update(self, url: str, *, etag: Optional[str], last_modified: Optional[str]) -> None:
+        entry = {k: v for k, v in (("etag", etag), ("last_modified", last_modified)) if v}
+        self._pending[url] = entry
+
+    def headers(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for ``url`` from its stored validators."""
+        cached = self._items.get(url, {})
+        headers: Dict[str, str] = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def discard(self) -> None:
+        """Drop staged validators so their URLs are fetched in full again."""
+        self._pending.clear()
+
+    def commit(self) -> None:
+        changed = False
+        for url, entry in self._pending.items():
+            if self._items.get(url, {}) == entry:
+                continue
+            if entry:
+                self._items[url] = entry
+            else:
+                self._items.pop(url, None)
+            changed = True
+        self._pending.clear()
+        if changed:
+            self._write()
+
+
+def resolve_url(base_url: str, path: str = "") -> str:
+    """``path`` relative to ``base_url``, or ``path`` itself if it is an absolute URL."""
+    if "://" in path:
+        return path
+    return f"{base_url}/{path.lstrip('/')}" if path else base_url
+
+
+def local_file_path(url: str) -> Optional[Path]:
+    """Filesystem path for ``file://`` URLs and existing local paths (for debugging)."""
+    if url.startswith("file://"):
+        return Path(url.replace("file://", "", 1))
+    if os.path.exists(url):
+        return Path(url)
+    return None
+
 
 class JmaClient:
     """Fetch JMA XML feeds.
 
     Note: URL endpoints may vary; use the appropriate JMA feed URL for warnings.
+
+    When ``validators_path`` is given, the last ``ETag``/``Last-Modified`` of each URL is
+    persisted there and sent back as ``If-None-Match``/``If-Modified-Since``. A ``304 Not
+    Modified`` response makes :meth:`fetch` return ``None``. Call :meth:`commit_validators`
+    once the fetched content has been fully processed.
+
+    Requests go through one ``requests.Session`` (see :func:`build_session`) so connections
+    to the JMA server are kept alive across fetches, crawler workers and scheduler ticks.
     """
 
-    def __init__(self, base_url: str) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        validators_path: Optional[Path] = None,
+        session: Optional[requests.Session] = None,
+        pool_maxsize: int = 4,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
+        self.validators = ValidatorStore(validators_path) if validators_path else None
+        self.session = session or build_session(pool_maxsize)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        if self.validators is None:
+            return {}
+        return self.validators.headers(url)
 
-    def fetch(self, path: str = "") -> bytes:
-        url = f"{self.base_url}/{path.lstrip('/')}" if path else self.base_url
+    def commit_validators(self) -> None:
+        """Persist validators of responses fetched since the last commit."""
+        if self.validators is not None:
+            self.validators.commit()
+
+    def discard_validators(self) -> None:
+        """Drop validators staged since the last commit so the next fetch is a full one."""
+        if self.validators is not None:
+            self.validators.discard()
+
+    def fetch(self, path: str = "", *, conditional: bool = True) -> Optional[bytes]:
+        """Fetch ``path`` relative to ``base_url`` (or an absolute URL given as ``path``).
+
+        ``conditional=False`` skips validator handling, e.g. for immutable bulletin documents.
+        """
+        url = resolve_url(self.base_url, path)
 
         # Support local file debugging: file://... or direct filesystem path
-        if url.startswith("file://"):
-            file_path = Path(url.replace("file://", "", 1))
+        file_path = local_file_path(url)
+        if file_path is not None:
             logger.info(f"Reading JMA XML from local file: {file_path}")
             try:
                 return file_path.read_bytes()
@@ -32,20 +200,21 @@ class JmaClient:
                 logger.exception(f"Failed to read local file {file_path}: {e}")
                 raise
 
-        if os.path.exists(url):
-            file_path = Path(url)
-            logger.info(f"Reading JMA XML from local path: {file_path}")
-            try:
-                return file_path.read_bytes()
-            except OSError as e:
-                logger.exception(f"Failed to read local file {file_path}: {e}")
-                raise
-
         logger.info(f"Fetching JMA feed from: {url}")
         try:
-            resp = requests.get(url, timeout=15)
+            headers = self._conditional_headers(url) if conditional else {}
+            resp = self.session.get(url, headers=headers, timeout=HTTP_TIMEOUT_SEC)
+            if resp.status_code == 304:
+                logger.info(f"JMA feed not modified since last fetch: {url}")
+                return None
             resp.raise_for_status()
             logger.info(f"Successfully fetched data from {url} (status: {resp.status_code})")
+            if conditional and self.validators is not None:
+                self.validators.update(
+                    url,
+                    etag=resp.headers.get("ETag"),
+                    last_modified=resp.headers.get("Last-Modified"),
+                )
             return resp.content
         except req_exc.RequestException as e:
             logger.exception(f"Failed to fetch data from {url}: {e}")
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+import lxml.etree as ET  # type: ignore[reportMissingImports]
+
+from .jma_client import JmaClient
+from .jma_parser import parse_jma_xml_cached
+from .models import Alert
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+_NS = {"atom": ATOM_NS}
+
+# 気象警報・注意報の電文タイトル（VPWW53/VPWW54）
+WARNING_ENTRY_TITLES = frozenset({"気象特別警報・警報・注意報", "気象警報・注意報"})
+# 東京地方（東京都）の発表官署コード
+TOKYO_OFFICE_CODES = frozenset({"130000"})
+
+# e.g. .../data/20240101030000_0_VPWW53_130000.xml
+_WARNING_LINK_RE = re.compile(r"_VPWW5\d_(\d{6})\.xml$")
+
+
+@dataclass(frozen=True, slots=True)
+class FeedEntry:
+    """One ``<entry>`` of a JMA Atom feed.
+
+    Attributes:
+        id: Entry ``<id>`` (JMA uses the document URL)
+        title: Entry title (e.g., 気象特別警報・警報・注意報)
+        updated: Entry ``<updated>`` time (UTC)
+        link: URL of the linked bulletin document
+        author: Issuing office name
+        content: Short summary text
+    """
+
+    id: str
+    title: str
+    updated: Optional[datetime]
+    link: Optional[str]
+    author: Optional[str] = None
+    content: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class CrawlResult:
+    """Outcome of :func:`crawl_entries`.
+
+    Attributes:
+        alerts: Alerts parsed from the fetched documents (latest per alert id)
+        fetched: Entries whose documents were downloaded and parsed
+        failed: Entries whose documents could not be downloaded
+    """
+
+    alerts: List[Alert]
+    fetched: List[FeedEntry]
+    failed: List[FeedEntry]
+
+
+def _parse_updated(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00")).astimezone(timezone.utc)
+    except ValueError:
+        logger.warning(f"Could not parse feed entry updated time '{value}'.")
+        return None
+
+
+def parse_atom_feed(xml_bytes: bytes) -> Optional[List[FeedEntry]]:
+    """Parse a JMA Atom feed. Returns ``None`` if the document is not an Atom feed."""
+    if not xml_bytes:
+        return None
+    try:
+        root = ET.fromstring(xml_bytes)
+    except ET.XMLSyntaxError:
+        return None
+    if root.tag != f"{{{ATOM_NS}}}feed":
+        return None
+
+    entries: list[FeedEntry] = []
+    for node in root.iterfind("atom:entry", _NS):
+        link = node.find("atom:link", _NS)
+        entries.append(
+            FeedEntry(
+                id=(node.findtext("atom:id", default="", namespaces=_NS) or "").strip(),
+                title=(node.findtext("atom:title", default="", namespaces=_NS) or "").strip(),
+                updated=_parse_updated(node.findtext("atom:updated", namespaces=_NS)),
+                link=link.get("href") if link is not None else None,
+                author=node.findtext("atom:author/atom:name", namespaces=_NS),
+                content=node.findtext("atom:content", namespaces=_NS),
+            )
+        )
+    logger.info(f"Parsed {len(entries)} entries from JMA Atom feed.")
+    return entries
+
+
+def is_warning_entry(entry: FeedEntry, offices: Iterable[str] = TOKYO_OFFICE_CODES) -> bool:
+    """Return True if the entry links to a warning/advisory bulletin for one of ``offices``."""
+    if not entry.link:
+        return False
+    m = _WARNING_LINK_RE.search(entry.link)
+    if m:
+        return m.group(1) in set(offices)
+    # Fallback for links that do not follow the data file naming scheme
+    return entry.title in WARNING_ENTRY_TITLES and "東京都" in (entry.content or "")
+
+
+def select_warning_entries(
+    entries: Iterable[FeedEntry], offices: Iterable[str] = TOKYO_OFFICE_CODES
+) -> List[FeedEntry]:
+    office_set = frozenset(offices)
+    return [e for e in entries if is_warning_entry(e, office_set)]
+
+
+def _latest_per_id(alerts: Iterable[Alert]) -> List[Alert]:
+    """Keep the most recently issued alert for each stable alert id."""
+    latest: dict[str, Alert] = {}
+    for a in alerts:
+        cur = latest.get(a.id)
+        if cur is None or a.issued_at >= cur.issued_at:
+            latest[a.id] = a
+    return list(latest.values())
+
+
+def crawl_entries(
+    client: JmaClient, entries: Iterable[FeedEntry], *, max_workers: int = 4
+) -> CrawlResult:
+    """Fetch and parse the linked documents of ``entries`` through a bounded thread pool.
+
+    Entries that fail to download are logged and skipped. When several documents report the
+    same area/category, the most recently issued one wins.
+    """
+    targets = [e for e in entries if e.link]
+    if not targets:
+        return CrawlResult(alerts=[], fetched=[], failed=[])
+
+    def _fetch_and_parse(entry: FeedEntry) -> Optional[List[Alert]]:
+        try:
+            xml = client.fetch(entry.link or "", conditional=False)
+        except Exception as e:  # pylint: disable=broad-except-clause
+            logger.warning(f"Failed to fetch feed entry {entry.link}: {e}")
+            return None
+        return parse_jma_xml_cached(xml) if xml else []
+
+    workers = max(1, min(max_workers, len(targets)))
+    logger.info(f"Fetching {len(targets)} feed entries with {workers} workers.")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jma-fetch") as pool:
+        results = list(pool.map(_fetch_and_parse, targets))
+
+    fetched = [e for e, batch in zip(targets, results) if batch is not None]
+    failed = [e for e, batch in zip(targets, results) if batch is None]
+    alerts = _latest_per_id(a for batch in results if batch for a in batch)
+    logger.info(f"Collected {len(alerts)} alerts from {len(fetched)} feed entries.")
+    return CrawlResult(alerts=alerts, fetched=fetched, failed=failed)
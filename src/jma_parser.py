@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import io
 import logging
-from dataclasses import dataclass
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
-from hashlib import sha256
-from typing import List
+from hashlib import blake2b, sha256
+from typing import IO, Iterator, List
 
 import lxml.etree as ET  # type: ignore[reportMissingImports]
 
@@ -12,6 +16,9 @@ from .models import Alert
 
 logger = logging.getLogger(__name__)
 
+# Documents larger than this are parsed with iter_jma_xml instead of building the full tree
+STREAMING_THRESHOLD_BYTES = 1 << 20
+
 
 @dataclass(frozen=True)
 class ParsedAlert:
@@ -24,125 +31,372 @@ class ParsedAlert:
     raw: dict
 
 
-def _text(node, xpath: str) -> str | None:
-    res = node.xpath(xpath)
-    if not res:
+# Namespaces used by JMA bulletins (Report / Head / meteorological Body / element basis)
+NAMESPACES = {
+    "jmx": "http://xml.kishou.go.jp/jmaxml1/",
+    "jmx_ib": "http://xml.kishou.go.jp/jmaxml1/informationBasis1/",
+    "jmx_mete": "http://xml.kishou.go.jp/jmaxml1/body/meteorology1/",
+    "jmx_eb": "http://xml.kishou.go.jp/jmaxml1/elementBasis1/",
+}
+
+
+def _xpath(*alternatives: str) -> ET.XPath:
+    """Compile a union of the plain and namespace-qualified variants of an expression."""
+    return ET.XPath(" | ".join(alternatives), namespaces=NAMESPACES, smart_strings=False)
+
+
+# Fallbacks for documents that do not follow the fixed Report/Head|Body layout
+_HEAD_TITLE = _xpath("//Head/Title/text()", "//jmx_ib:Head/jmx_ib:Title/text()")
+_HEADLINE_TEXT = _xpath(
+    "//Report/Head/Headline/Text/text()",
+    "//jmx:Report/jmx_ib:Head/jmx_ib:Headline/jmx_ib:Text/text()",
+)
+_HEAD_INFO_TYPE = _xpath("//Head/InfoType/text()", "//jmx_ib:Head/jmx_ib:InfoType/text()")
+_HEAD_REPORT_DATETIME = _xpath(
+    "//Head/ReportDateTime/text()", "//jmx_ib:Head/jmx_ib:ReportDateTime/text()"
+)
+_ITEMS = _xpath(
+    "//Body//Warning//Item",
+    "//Body//Area//Item",
+    "//Report/Body//Item",
+    "//jmx_mete:Body//jmx_mete:Warning//jmx_mete:Item",
+    "//jmx_mete:Body//jmx_mete:Area//jmx_mete:Item",
+    "//jmx:Report/jmx_mete:Body//jmx_mete:Item",
+)
+_ITEM_TAGS = ("Item", f"{{{NAMESPACES['jmx_mete']}}}Item")
+
+
+def _first(xpath: ET.XPath, node) -> str | None:
+    res = xpath(node)
+    return res[0] if res else None
+
+
+def _local(tag) -> str | None:
+    """Local name of an element tag (None for comments/processing instructions)."""
+    if not isinstance(tag, str):
         return None
-    first = res[0]
-    # Avoid referencing private Element types; use duck typing
-    if hasattr(first, "text"):
-        return getattr(first, "text")
-    return str(first)
+    return tag.rpartition("}")[2]
+
+
+def _child(node, name: str):
+    for c in node:
+        if _local(c.tag) == name:
+            return c
+    return None
+
+
+def _child_text(node, *path: str) -> str | None:
+    for name in path:
+        node = _child(node, name)
+        if node is None:
+            return None
+    return node.text
+
+
+def _parse_issued_at(issued_str: str | None) -> datetime:
+    if issued_str:
+        try:
+            return datetime.fromisoformat(issued_str.replace("Z", "+00:00")).astimezone(
+                timezone.utc
+            )
+        except (ValueError, TypeError):
+            logger.warning(f"Could not parse datetime '{issued_str}', using current time.")
+            return datetime.now(timezone.utc)
+    logger.warning("No ReportDateTime found in XML, using current time.")
+    return datetime.now(timezone.utc)
+
+
+def _build_alert(
+    *,
+    title: str | None,
+    info_type: str | None,
+    issued_at: datetime,
+    area_name: str,
+    area_code: str | None,
+    category: str,
+    severity: str,
+) -> Alert:
+    # Determine cancellation status
+    status_value = "active"
+    sev_norm = (severity or "").strip()
+    if (info_type or "").strip() == "取消" or sev_norm == "解除":
+        status_value = "cancelled"
+
+    primitive = {
+        "title": title or f"{category} - {area_name}",
+        "area": area_name,
+        "area_code": area_code,
+        "category": category,
+        "severity": severity,
+        "issued_at": issued_at.isoformat(),
+    }
+    # Stable ID across updates/cancellations: area + category only
+    alert_id = sha256(
+        "|".join(
+            [
+                primitive["area"],
+                primitive["category"],
+            ]
+        ).encode("utf-8")
+    ).hexdigest()[:16]
+
+    return Alert(
+        id=alert_id,
+        title=primitive["title"],
+        area=area_name,
+        ward=None,
+        category=category,
+        severity=severity,
+        issued_at=issued_at,
+        expires_at=None,
+        link=None,
+        status=status_value,
+        raw=primitive,
+        area_code=area_code.strip() if area_code else None,
+    )
+
+
+def _fallback_alert(title: str, issued_at: datetime) -> Alert:
+    logger.warning(
+        f"No alert items found, creating a fallback alert for title: '{title}'"
+    )
+    alert_id = sha256((title + issued_at.isoformat()).encode("utf-8")).hexdigest()[:16]
+    return Alert(
+        id=alert_id,
+        title=title,
+        area="Unknown",
+        ward=None,
+        category="Unknown",
+        severity="Unknown",
+        issued_at=issued_at,
+        expires_at=None,
+        link=None,
+        status="active",
+        raw={"title": title},
+    )
 
 
 def parse_jma_xml(xml_bytes: bytes) -> List[Alert]:
-    """Parse a simplified subset of JMA XML and normalize to Alert objects."""
+    """Parse a simplified subset of JMA XML and normalize to Alert objects.
+
+    Documents above ``STREAMING_THRESHOLD_BYTES`` are handed to :func:`iter_jma_xml`.
+    """
     if not xml_bytes:
         logger.warning("XML content is empty, cannot parse.")
         return []
 
+    if len(xml_bytes) > STREAMING_THRESHOLD_BYTES:
+        alerts = []
+        try:
+            for alert in iter_jma_xml(xml_bytes):
+                alerts.append(alert)
+        except ET.XMLSyntaxError as e:
+            logger.exception(f"Failed to parse JMA XML: {e}")
+            return []
+        logger.info(f"Successfully parsed {len(alerts)} alerts from XML (streaming).")
+        return alerts
+
     try:
         root = ET.fromstring(xml_bytes)
     except ET.XMLSyntaxError as e:
         logger.exception(f"Failed to parse JMA XML: {e}")
         return []
 
-    title = _text(root, "//Head/Title/text()") or _text(root, "//Report/Head/Headline/Text/text()")
-    info_type = _text(root, "//Head/InfoType/text()") or _text(
-        root, "//Report/Head/InfoType/text()"
-    )
-    issued_str = _text(root, "//Head/ReportDateTime/text()") or _text(
-        root, "//Report/Head/ReportDateTime/text()"
-    )
-
-    if issued_str:
-        try:
-            issued_at = datetime.fromisoformat(issued_str.replace("Z", "+00:00")).astimezone(
-                timezone.utc
-            )
-        except (ValueError, TypeError):
-            logger.warning(f"Could not parse datetime '{issued_str}', using current time.")
-            issued_at = datetime.now(timezone.utc)
-    else:
-        logger.warning("No ReportDateTime found in XML, using current time.")
-        issued_at = datetime.now(timezone.utc)
+    # Fast path: the fixed JMA layout keeps Head and Body as direct children of Report
+    is_report = _local(root.tag) == "Report"
+    head = _child(root, "Head") if is_report else None
+    title = info_type = issued_str = None
+    if head is not None:
+        title = _child_text(head, "Title")
+        info_type = _child_text(head, "InfoType")
+        issued_str = _child_text(head, "ReportDateTime")
+        title = title or _child_text(head, "Headline", "Text")
+    title = title or _first(_HEAD_TITLE, root) or _first(_HEADLINE_TEXT, root)
+    info_type = info_type or _first(_HEAD_INFO_TYPE, root)
+    issued_str = issued_str or _first(_HEAD_REPORT_DATETIME, root)
+    issued_at = _parse_issued_at(issued_str)
 
     alerts: list[Alert] = []
-    item_nodes = root.xpath("//Body//Warning//Item | //Body//Area//Item | //Report/Body//Item")
+    body = _child(root, "Body") if is_report else None
+    if body is not None:
+        # Every Item below Report/Body matches the selection rule; the schema has one Body
+        item_nodes = list(body.iter(*_ITEM_TAGS))
+    else:
+        item_nodes = _ITEMS(root)
     logger.info(f"Found {len(item_nodes)} item nodes in JMA XML.")
 
-    for area_node in item_nodes:
-        area_name = (
-            _text(area_node, "./Area/Name/text()") or _text(area_node, "./Area/text()") or "Unknown"
-        )
-        category = (
-            _text(area_node, "./Kind/Name/text()") or _text(area_node, "./Kind/text()") or "Unknown"
-        )
-        severity = (
-            _text(area_node, "./Kind/Status/text()")
-            or _text(area_node, "./Status/text()")
-            or "Unknown"
-        )
-
-        # Determine cancellation status
-        status_value = "active"
-        sev_norm = (severity or "").strip()
-        if (info_type or "").strip() == "取消" or sev_norm == "解除":
-            status_value = "cancelled"
-
-        primitive = {
-            "title": title or f"{category} - {area_name}",
-            "area": area_name,
-            "category": category,
-            "severity": severity,
-            "issued_at": issued_at.isoformat(),
-        }
-        # Stable ID across updates/cancellations: area + category only
-        alert_id = sha256(
-            "|".join(
-                [
-                    primitive["area"],
-                    primitive["category"],
-                ]
-            ).encode("utf-8")
-        ).hexdigest()[:16]
-
-        alerts.append(
-            Alert(
-                id=alert_id,
-                title=primitive["title"],
-                area=area_name,
-                ward=None,
-                category=category,
-                severity=severity,
-                issued_at=issued_at,
-                expires_at=None,
-                link=None,
-                status=status_value,
-                raw=primitive,
-            )
-        )
+    for item in item_nodes:
+        alerts.append(_alert_from_item(item, title=title, info_type=info_type, issued_at=issued_at))
 
     if not alerts and title:
-        logger.warning(
-            f"No alert items found, creating a fallback alert for title: '{title}'"
-        )
-        alert_id = sha256((title + issued_at.isoformat()).encode("utf-8")).hexdigest()[:16]
-        alerts.append(
-            Alert(
-                id=alert_id,
-                title=title,
-                area="Unknown",
-                ward=None,
-                category="Unknown",
-                severity="Unknown",
-                issued_at=issued_at,
-                expires_at=None,
-                link=None,
-                status="active",
-                raw={"title": title},
-            )
-        )
+        alerts.append(_fallback_alert(title, issued_at))
 
     logger.info(f"Successfully parsed {len(alerts)} alerts from XML.")
     return alerts
+
+
+def _alert_from_item(
+    item, *, title: str | None, info_type: str | None, issued_at: datetime
+) -> Alert:
+    area = _child(item, "Area")
+    kind = _child(item, "Kind")
+    area_name = area_code = category = severity = None
+    if area is not None:
+        area_name = _child_text(area, "Name") or area.text
+        area_code = _child_text(area, "Code")
+    if kind is not None:
+        category = _child_text(kind, "Name") or kind.text
+        severity = _child_text(kind, "Status")
+    return _build_alert(
+        title=title,
+        info_type=info_type,
+        issued_at=issued_at,
+        area_name=area_name or "Unknown",
+        area_code=area_code,
+        category=category or "Unknown",
+        severity=severity or _child_text(item, "Status") or "Unknown",
+    )
+
+
+def _is_item_path(stack: list[str]) -> bool:
+    """Mirror the ``parse_jma_xml`` item selection for an ``Item`` at the top of ``stack``."""
+    for i, name in enumerate(stack[:-1]):
+        if name != "Body":
+            continue
+        if i > 0 and stack[i - 1] == "Report":
+            return True
+        if any(n in ("Warning", "Area") for n in stack[i + 1 : -1]):
+            return True
+    return False
+
+
+def iter_jma_xml(source: bytes | str | os.PathLike | IO[bytes]) -> Iterator[Alert]:
+    """Stream alerts from JMA XML with ``lxml.etree.iterparse``.
+
+    ``source`` may be the document bytes, a file path or a binary file object. Each
+    ``Item`` is turned into an :class:`Alert` as soon as its end tag is read and then
+    cleared (together with already processed siblings), so peak memory stays flat for large
+    documents. Head fields must precede the items, as they do in JMA bulletins. Element
+    names are matched by local name. Raises ``lxml.etree.XMLSyntaxError`` on malformed
+    input (possibly after yielding the alerts read so far).
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    title: str | None = None
+    headline: str | None = None
+    info_type: str | None = None
+    issued_str: str | None = None
+    issued_at: datetime | None = None
+    count = 0
+    stack: list[str] = []
+
+    for event, elem in ET.iterparse(source, events=("start", "end"), remove_comments=True):
+        if event == "start":
+            stack.append(_local(elem.tag) or "")
+            continue
+
+        name = stack[-1]
+        parent = stack[-2] if len(stack) > 1 else None
+        if parent == "Head":
+            if name == "Title" and title is None:
+                title = elem.text
+            elif name == "InfoType" and info_type is None:
+                info_type = elem.text
+            elif name == "ReportDateTime" and issued_str is None:
+                issued_str = elem.text
+        elif name == "Text" and headline is None and stack[-4:-1] == ["Report", "Head", "Headline"]:
+            headline = elem.text
+        elif name == "Item" and _is_item_path(stack):
+            if issued_at is None:
+                issued_at = _parse_issued_at(issued_str)
+            yield _alert_from_item(
+                elem, title=title or headline, info_type=info_type, issued_at=issued_at
+            )
+            count += 1
+            # Free the processed item and any earlier siblings
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        stack.pop()
+
+    if count == 0 and (title or headline):
+        yield _fallback_alert(title or headline or "", issued_at or _parse_issued_at(issued_str))
+
+
+class ParseCache:
+    """LRU cache of :func:`parse_jma_xml` results keyed by a hash of the document bytes.
+
+    Bounded both by the number of documents and by the total size of the cached documents.
+    Each lookup returns fresh ``Alert`` objects with their own copy of ``raw``, so callers
+    never share mutable state. Safe to use from the crawler's worker threads.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 << 20) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items: OrderedDict[bytes, tuple[int, tuple[Alert, ...]]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(xml_bytes: bytes) -> bytes:
+        return blake2b(xml_bytes, digest_size=16).digest()
+
+    @staticmethod
+    def _copy(alerts: tuple[Alert, ...]) -> List[Alert]:
+        return [replace(a, raw=dict(a.raw)) if isinstance(a.raw, dict) else a for a in alerts]
+
+    def parse(self, xml_bytes: bytes) -> List[Alert]:
+        """Return the alerts of ``xml_bytes``, parsing only on a cache miss."""
+        if not xml_bytes:
+            return parse_jma_xml(xml_bytes)
+        key = self._key(xml_bytes)
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._copy(cached[1])
+            self.misses += 1
+
+        alerts = tuple(parse_jma_xml(xml_bytes))
+        size = len(xml_bytes)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return self._copy(alerts)
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = (size, alerts)
+                self._bytes += size
+                while len(self._items) > self.max_entries or self._bytes > self.max_bytes:
+                    _, (evicted_size, _) = self._items.popitem(last=False)
+                    self._bytes -= evicted_size
+                    self.evictions += 1
+        return self._copy(alerts)
+
+    def stats(self) -> dict[str, int]:
+        """Counters for monitoring (hits, misses, evictions, entries, bytes)."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._items),
+                "bytes": self._bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+
+PARSE_CACHE = ParseCache()
+
+
+def parse_jma_xml_cached(xml_bytes: bytes) -> List[Alert]:
+    """:func:`parse_jma_xml` through the process-wide :data:`PARSE_CACHE`."""
+    return PARSE_CACHE.parse(xml_bytes)
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import logging
 import os
-from datetime import datetime, timezone
+import threading
+from datetime import datetime, timedelta, timezone
 import argparse
 try:
     from dotenv import load_dotenv  # type: ignore[reportMissingImports]
@@ -14,17 +15,457 @@ from pathlib import Path
 from apscheduler.schedulers.background import BackgroundScheduler
 
 from .discord_client import DiscordNotifier
-from .filter import pick_23_wards
 from .jma_client import JmaClient
-from .jma_parser import parse_jma_xml
-from .storage import JsonStorage
+from .feed_index import SeenEntryIndex
+from .jma_feed import FeedEntry, crawl_entries, parse_atom_feed, select_warning_entries
+from .jma_parser import PARSE_CACHE, parse_jma_xml_cached
+from .regions import DEFAULT_REGION, RegionIndex, load_regions
+from .models import Alert, MessageSlot
+from .storage import Storage, open_storage
+from .coalesce import CoalescingBuffer
+from .polling import AdaptiveInterval, has_active_alerts
 from .school_policy import decide_school_guidance
-from .guidance_state import GuidanceController
+from .guidance_state import CurrentAlerts, GuidanceController
 
 logger = logging.getLogger(__name__)
 
+# Every per-process state file lives in this directory
 DATA_DIR = Path(os.getenv("DATA_DIR", "data"))
-SENT_IDS_FILE = DATA_DIR / "sent_ids.json"
+SENT_IDS_FILENAME = "sent_ids.json"
+HTTP_VALIDATORS_FILENAME = "http_validators.json"
+SEEN_ENTRIES_FILENAME = "seen_entries.json"
+GUIDANCE_STATE_FILENAME = "guidance_state.json"
+CURRENT_ALERTS_FILENAME = "current_alerts.json"
+FETCH_WORKERS = int(os.getenv("JMA_FETCH_WORKERS", "4"))
+SEEN_ENTRIES_RETENTION = timedelta(days=float(os.getenv("SEEN_ENTRIES_RETENTION_DAYS", "7")))
+REGION_INDEX = RegionIndex(load_regions())
+# Hold alerts about to be sent this long so bursts of updates collapse to the latest state
+ALERT_COALESCE_WINDOW = timedelta(seconds=float(os.getenv("ALERT_COALESCE_SEC", "0")))
+
+
+# Kind/Status of a bulletin that only restates the previous state
+CONTINUED_SEVERITY = "継続"
+
+# Outcomes of classify_alert
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+CANCELLED = "cancelled"
+
+
+def classify_alert(alert: Alert, known: tuple[str, str | None] | None) -> str:
+    """Compare ``alert`` with its stored ``(status, fingerprint)`` (None if never sent).
+
+    Returns one of NEW, CHANGED, UNCHANGED or CANCELLED (a cancellation not yet sent).
+    Continuation bulletins and records stored before fingerprints existed count as unchanged,
+    and an alert that was already cancelled is not sent again. A warning issued again after
+    its cancellation is new.
+    """
+    if getattr(alert, "status", "active") == "cancelled":
+        return UNCHANGED if known is not None and known[0] == "cancelled" else CANCELLED
+    if known is None or known[0] == "cancelled":
+        return NEW
+    status, fingerprint = known
+    if status != "active" or fingerprint is None or alert.severity == CONTINUED_SEVERITY:
+        return UNCHANGED
+    return UNCHANGED if fingerprint == alert.fingerprint else CHANGED
+
+
+def plan_dispatch(
+    alerts: list[Alert], *, storage, force_send: bool = False
+) -> tuple[list[Alert], list[Alert], list[Alert]]:
+    """Decide which new alerts, updates and cancellations of ``alerts`` still have to be sent.
+
+    Updates are active alerts already sent whose content fingerprint has changed since.
+    """
+    if force_send:
+        # Partition by cancellation status
+        cancellations = [a for a in alerts if getattr(a, "status", "active") == "cancelled"]
+        actives = [a for a in alerts if getattr(a, "status", "active") != "cancelled"]
+        return actives, [], cancellations
+
+    # Records past their retention are stale state, not a sign the alert was sent
+    storage.evict_expired()
+    # One storage lookup for the whole batch, then a dict comparison per alert
+    known = storage.fingerprints(a.id for a in alerts)
+    plan: dict[str, list[Alert]] = {NEW: [], CHANGED: [], UNCHANGED: [], CANCELLED: []}
+    for a in alerts:
+        plan[classify_alert(a, known.get(a.id))].append(a)
+    if plan[UNCHANGED]:
+        logger.debug(f"{len(plan[UNCHANGED])} alerts unchanged since they were sent.")
+    return plan[NEW], plan[CHANGED], plan[CANCELLED]
+
+
+def sent_messages(storage, alerts: list[Alert]) -> dict[str, MessageSlot]:
+    """Discord message slots stored for ``alerts`` (alerts sent before have none)."""
+    slots = {}
+    for a in alerts:
+        rec = storage.get_record(a.id) or {}
+        slot = MessageSlot.from_value(rec.get("message"))
+        if slot is not None:
+            slots[a.id] = slot
+    return slots
+
+
+def _record_details(storage, alerts: list[Alert], messages) -> None:
+    # Notifier doubles in tests may not return slots
+    messages = messages if isinstance(messages, dict) else {}
+    for a in alerts:
+        slot = messages.get(a.id)
+        storage.update_details(
+            a.id, fingerprint=a.fingerprint, message=slot.to_list() if slot is not None else None
+        )
+
+
+def record_active(storage, alerts: list[Alert], messages=None) -> None:
+    known = storage.fingerprints(a.id for a in alerts)
+    # Warnings re-issued after their cancellation become active again
+    for alert_id, (status, _) in known.items():
+        if status == "cancelled":
+            storage.update_status(alert_id, "active")
+    storage.add_many((a.id for a in alerts if a.id not in known), status="active")
+    _record_details(storage, alerts, messages)
+
+
+def record_updates(storage, alerts: list[Alert], messages=None) -> None:
+    _record_details(storage, alerts, messages)
+
+
+def record_cancellations(storage, alerts: list[Alert], messages=None) -> None:
+    # Update existing entries to cancelled if present; otherwise add as cancelled
+    for a in alerts:
+        if storage.has(a.id):
+            storage.update_status(a.id, "cancelled")
+        else:
+            storage.add(a.id, status="cancelled")
+    _record_details(storage, alerts, messages)
+
+
+def dispatch_alerts(
+    alerts: list[Alert],
+    *,
+    storage,
+    notifier: DiscordNotifier,
+    force_send: bool = False,
+    no_store: bool = False,
+) -> int:
+    """Send alerts not yet recorded in ``storage`` (and cancellations) and record them.
+
+    Returns:
+        The number of alerts sent.
+    """
+    to_send_active, to_send_update, to_send_cancel = plan_dispatch(
+        alerts, storage=storage, force_send=force_send
+    )
+
+    if not no_store:
+        # Keep records of alerts still present in the feed from being evicted
+        storage.touch_many(a.id for a in alerts)
+
+    total = 0
+    try:
+        if to_send_active:
+            logger.info("Found %d new active alerts to send.", len(to_send_active))
+            messages = notifier.send_alerts(to_send_active)
+            total += len(to_send_active)
+            if not no_store:
+                record_active(storage, to_send_active, messages)
+
+        if to_send_update:
+            logger.info("Found %d changed alerts to update.", len(to_send_update))
+            messages = notifier.send_updates(
+                to_send_update, sent_messages(storage, to_send_update)
+            )
+            total += len(to_send_update)
+            if not no_store:
+                record_updates(storage, to_send_update, messages)
+
+        if to_send_cancel:
+            logger.info("Found %d cancellations to send.", len(to_send_cancel))
+            messages = notifier.send_cancellations(
+                to_send_cancel, sent_messages(storage, to_send_cancel)
+            )
+            total += len(to_send_cancel)
+            if not no_store:
+                record_cancellations(storage, to_send_cancel, messages)
+    finally:
+        # Persist all storage changes of this tick in one atomic write
+        storage.flush()
+    return total
+
+
+class Pipeline:
+    """Long-lived pipeline context shared by scheduler ticks.
+
+    Owns the JMA client (pooled HTTP session and validators), the seen-entry index, the
+    sent-ID storage, the guidance controller and the Discord notifiers (cached webhooks), so
+    each :meth:`run_once` only does the per-tick work. Per-region storage and notifiers are
+    created on first use.
+
+    With ``ALERT_COALESCE_SEC`` > 0, alerts that passed the duplicate check are held per region
+    in a :class:`CoalescingBuffer` and sent once their window has elapsed (on a later tick or
+    :meth:`release_due`), so only the latest state of each area/category is posted.
+    """
+
+    def __init__(
+        self,
+        jma_url: str,
+        *,
+        dry_run: bool = False,
+        force_send: bool = False,
+        no_store: bool = False,
+        region_index: RegionIndex | None = None,
+    ) -> None:
+        self.jma_url = jma_url
+        self.dry_run = dry_run
+        self.force_send = force_send
+        self.no_store = no_store
+        self.region_index = region_index or REGION_INDEX
+        self.data_dir = DATA_DIR
+        self.sent_ids_file = self.data_dir / SENT_IDS_FILENAME
+        self.fetch_workers = FETCH_WORKERS
+        self.client = JmaClient(
+            jma_url,
+            validators_path=self.data_dir / HTTP_VALIDATORS_FILENAME,
+            pool_maxsize=self.fetch_workers,
+        )
+        self.seen_index = SeenEntryIndex(
+            self.data_dir / SEEN_ENTRIES_FILENAME, retention=SEEN_ENTRIES_RETENTION
+        )
+        self.guidance_controller = GuidanceController(self.data_dir / GUIDANCE_STATE_FILENAME)
+        # Tokyo alerts of the last processed bulletin; guidance is decided on every tick
+        self.current_alerts = CurrentAlerts(self.data_dir / CURRENT_ALERTS_FILENAME)
+        self._storage: Storage | None = None
+        self._notifier: DiscordNotifier | None = None
+        self._regions: dict[str, tuple[Storage, DiscordNotifier]] = {}
+        self.coalesce_window = ALERT_COALESCE_WINDOW
+        self._buffers: dict[str, CoalescingBuffer] = {}
+        # Outcome of the last run, for the adaptive polling interval
+        self.feed_changed = False
+        self.has_active_alerts = False
+        # run_once and release_due may be called from different scheduler threads
+        self._lock = threading.Lock()
+
+    @property
+    def storage(self) -> Storage:
+        if self._storage is None:
+            self._storage = open_storage(self.sent_ids_file)
+        return self._storage
+
+    @property
+    def notifier(self) -> DiscordNotifier:
+        if self._notifier is None:
+            self._notifier = DiscordNotifier(dry_run=self.dry_run)
+        return self._notifier
+
+    def _region_target(self, region_name: str) -> tuple[Storage, DiscordNotifier]:
+        if region_name == DEFAULT_REGION:
+            return self.storage, self.notifier
+        target = self._regions.get(region_name)
+        if target is None:
+            region = self.region_index.regions[region_name]
+            target = (
+                open_storage(self.sent_ids_file.with_name(f"sent_ids.{region_name}.json")),
+                DiscordNotifier(webhook_url=region.webhook_url, dry_run=self.dry_run),
+            )
+            self._regions[region_name] = target
+        return target
+
+    def _fetch_alerts(
+        self,
+    ) -> tuple[list[Alert], list[FeedEntry] | None, list[FeedEntry]] | None:
+        """Fetch and parse this tick's alerts.
+
+        Returns:
+            ``(alerts, processed feed entries, failed feed entries)`` (processed entries are
+            ``None`` for a single bulletin document), or ``None`` when there is nothing new.
+        """
+        xml = self.client.fetch()
+        if xml is None:
+            # 304 Not Modified: nothing new since the last successful run
+            logger.info("JMA feed not modified; skipping parse and storage.")
+            return None
+
+        entries = parse_atom_feed(xml)
+        processed: list[FeedEntry] | None = None
+        failed: list[FeedEntry] = []
+        if entries is None:
+            # A single bulletin document (e.g. --simulate with a sample file)
+            alerts = parse_jma_xml_cached(xml)
+        else:
+            targets = select_warning_entries(entries, self.region_index.office_codes)
+            new_targets = self.seen_index.filter_new(targets)
+            logger.info(
+                f"Selected {len(new_targets)} new warning entries "
+                f"({len(targets)} warning / {len(entries)} total feed entries)."
+            )
+            if not new_targets:
+                logger.info("No new or updated warning entries; skipping parse and storage.")
+                self.seen_index.flush()
+                self.client.commit_validators()
+                return None
+            crawl = crawl_entries(self.client, new_targets, max_workers=self.fetch_workers)
+            alerts = crawl.alerts
+            processed = crawl.fetched
+            failed = crawl.failed
+        logger.info(
+            f"Parsed {len(alerts)} alerts from JMA feed (parse cache: {PARSE_CACHE.stats()})."
+        )
+        return alerts, processed, failed
+
+    def _dispatch(self, region_name: str, alerts: list[Alert], now: datetime) -> int:
+        storage, notifier = self._region_target(region_name)
+        if self.coalesce_window <= timedelta(0):
+            return dispatch_alerts(
+                alerts,
+                storage=storage,
+                notifier=notifier,
+                force_send=self.force_send,
+                no_store=self.no_store,
+            )
+        to_send_active, to_send_update, to_send_cancel = plan_dispatch(
+            alerts, storage=storage, force_send=self.force_send
+        )
+        if not self.no_store:
+            storage.touch_many(a.id for a in alerts)
+        buffer = self._buffers.setdefault(region_name, CoalescingBuffer(self.coalesce_window))
+        buffer.offer(to_send_active + to_send_update + to_send_cancel, now)
+        return dispatch_alerts(
+            buffer.release(now),
+            storage=storage,
+            notifier=notifier,
+            force_send=self.force_send,
+            no_store=self.no_store,
+        )
+
+    def _release_buffers(self, now: datetime | None = None, *, drain: bool = False) -> int:
+        total = 0
+        for region_name, buffer in self._buffers.items():
+            ready = buffer.drain() if drain else buffer.release(now)
+            if not ready:
+                continue
+            storage, notifier = self._region_target(region_name)
+            total += dispatch_alerts(
+                ready,
+                storage=storage,
+                notifier=notifier,
+                force_send=self.force_send,
+                no_store=self.no_store,
+            )
+        return total
+
+    def release_due(self) -> int:
+        """Send coalesced alerts whose window has elapsed. Returns the number sent."""
+        with self._lock:
+            return self._release_buffers(datetime.now(timezone.utc))
+
+    def _send_guidance(self) -> None:
+        # 学校ガイダンス送信ポリシー：
+        # - 6/8/10の各判定直後は必ず1回配信
+        # - 6:00〜9:59の間、対象警報の有無が変化したら更新配信
+        # 判定は直近に処理した東京の電文（current_alerts）に基づく
+        tokyo_alerts = self.current_alerts.alerts
+        self.has_active_alerts = has_active_alerts(tokyo_alerts)
+        try:
+            guidance = decide_school_guidance(tokyo_alerts)
+            has_target = any(getattr(a, "status", "active") != "cancelled" for a in tokyo_alerts)
+            should = self.guidance_controller.should_send(
+                guidance=guidance, has_target=has_target, now=datetime.now(timezone.utc)
+            )
+            if self.force_send:
+                should = True
+            if should:
+                self.notifier.send_school_guidance(guidance)
+        except Exception as e:  # pylint: disable=broad-except-clause
+            logger.exception("Failed to process/send school guidance: %s", e)
+
+    def run_once(self) -> int:
+        """
+        Fetches, parses, filters, and sends new JMA alerts.
+
+        Returns:
+            The number of new alerts sent.
+        """
+        with self._lock:
+            return self._run_once()
+
+    def _flush_notifiers(self) -> None:
+        """Retry webhook messages left queued by rate limits, even on ticks with nothing new."""
+        notifiers = [self._notifier, *(notifier for _, notifier in self._regions.values())]
+        for notifier in notifiers:
+            if notifier is None:
+                continue
+            try:
+                notifier.flush()
+            except Exception as e:  # pylint: disable=broad-except-clause
+                logger.exception(f"Failed to send queued webhook messages: {e}")
+
+    def _run_once(self) -> int:
+        logger.info("Starting pipeline run...")
+        now = datetime.now(timezone.utc)
+        self._flush_notifiers()
+        # Coalesced alerts are due even when the feed has nothing new
+        released = self._release_buffers(now)
+        fetched = self._fetch_alerts()
+        self.feed_changed = fetched is not None
+        if fetched is None:
+            # Decision-point guidance is due even when no new bulletin arrived
+            self._send_guidance()
+            return released
+        alerts, processed_entries, failed_entries = fetched
+
+        partitions = self.region_index.partition(alerts)
+        tokyo_alerts = partitions.pop(DEFAULT_REGION, [])
+        logger.info(f"Filtered down to {len(tokyo_alerts)} alerts for Tokyo's 23 wards.")
+        if tokyo_alerts:
+            # The latest bulletin lists every warning in effect; keep the state otherwise
+            self.current_alerts.replace(tokyo_alerts)
+
+        total = released + self._dispatch(DEFAULT_REGION, tokyo_alerts, now)
+
+        # Additional regions share this tick's fetch and parse but keep their own sent-ID state
+        for region_name, region_alerts in partitions.items():
+            total += self._dispatch(region_name, region_alerts, now)
+
+        self._send_guidance()
+
+        if processed_entries is not None:
+            self.seen_index.mark(processed_entries)
+            self.seen_index.flush()
+        if failed_entries:
+            # Keep the feed's validators unsaved so the failed entries are listed (and
+            # fetched) again next tick instead of hiding behind a 304
+            logger.warning(
+                f"{len(failed_entries)} feed entries could not be fetched; retrying next tick."
+            )
+            self.client.discard_validators()
+        else:
+            self.client.commit_validators()
+
+        if total == 0:
+            logger.info("No new alerts to send.")
+            return 0
+
+        logger.info("Finished sending and recording alerts. Total sent: %d", total)
+        return total
+
+    def close(self) -> None:
+        """Send any coalesced alerts still held, then release HTTP sessions and storage."""
+        with self._lock:
+            try:
+                self._release_buffers(drain=True)
+            except Exception as e:  # pylint: disable=broad-except-clause
+                logger.exception(f"Failed to send held alerts on shutdown: {e}")
+        self.client.close()
+        storages = [self._storage, *(storage for storage, _ in self._regions.values())]
+        notifiers = [self._notifier, *(notifier for _, notifier in self._regions.values())]
+        for storage in storages:
+            close = getattr(storage, "close", None)
+            if close is not None:
+                close()
+        for notifier in notifiers:
+            if notifier is not None:
+                notifier.close()
 
 
 def pipeline_once(
@@ -35,101 +476,73 @@ def pipeline_once(
     no_store: bool = False,
 ) -> int:
     """
-    Fetches, parses, filters, and sends new JMA alerts.
+    Runs a single :class:`Pipeline` tick with a fresh context.
 
     Returns:
         The number of new alerts sent.
     """
-    logger.info("Starting pipeline run...")
-    client = JmaClient(jma_url)
-    xml = client.fetch()
-    alerts = parse_jma_xml(xml)
-    logger.info(f"Parsed {len(alerts)} alerts from JMA feed.")
-
-    tokyo_alerts = pick_23_wards(alerts)
-    logger.info(f"Filtered down to {len(tokyo_alerts)} alerts for Tokyo's 23 wards.")
-
-    # Partition by cancellation status
-    cancellations = [a for a in tokyo_alerts if getattr(a, "status", "active") == "cancelled"]
-    actives = [a for a in tokyo_alerts if getattr(a, "status", "active") != "cancelled"]
-
-    storage = JsonStorage(SENT_IDS_FILE)
-    guidance_controller = GuidanceController(DATA_DIR / "guidance_state.json")
+    pipeline = Pipeline(jma_url, dry_run=dry_run, force_send=force_send, no_store=no_store)
+    try:
+        return pipeline.run_once()
+    finally:
+        pipeline.close()
 
-    # Determine which to send
-    if force_send:
-        to_send_active = list(actives)
-        to_send_cancel = list(cancellations)
-    else:
-        to_send_active = [a for a in actives if not storage.has(a.id)]
-        # For cancellations, send if unseen or not yet marked cancelled
-        to_send_cancel = [
-            a for a in cancellations if (not storage.has(a.id)) or (storage.get_status(a.id) != "cancelled")
-        ]
 
-    total = 0
-    notifier = DiscordNotifier(dry_run=dry_run)
-
-    if to_send_active:
-        logger.info("Found %d new active alerts to send.", len(to_send_active))
-        notifier.send_alerts(to_send_active)
-        total += len(to_send_active)
-        if not no_store:
-            storage.add_many((a.id for a in to_send_active), status="active")
-
-    if to_send_cancel:
-        logger.info("Found %d cancellations to send.", len(to_send_cancel))
-        notifier.send_cancellations(to_send_cancel)
-        total += len(to_send_cancel)
-        if not no_store:
-            # Update existing entries to cancelled if present; otherwise add as cancelled
-            for a in to_send_cancel:
-                if storage.has(a.id):
-                    storage.update_status(a.id, "cancelled")
-                else:
-                    storage.add(a.id, status="cancelled")
-
-    # 学校ガイダンス送信ポリシー：
-    # - 6/8/10の各判定直後は必ず1回配信
-    # - 6:00〜9:59の間、対象警報の有無が変化したら更新配信
-    try:
-        guidance = decide_school_guidance(tokyo_alerts)
-        has_target = any(getattr(a, "status", "active") != "cancelled" for a in tokyo_alerts)
-        should = guidance_controller.should_send(
-            guidance=guidance, has_target=has_target, now=datetime.now(timezone.utc)
-        )
-        if force_send:
-            should = True
-        if should:
-            notifier.send_school_guidance(guidance)
-    except Exception as e:  # pylint: disable=broad-except-clause
-        logger.exception("Failed to process/send school guidance: %s", e)
-
-    if total == 0:
-        logger.info("No new alerts to send.")
-        return 0
-
-    logger.info("Finished sending and recording alerts. Total sent: %d", total)
-    return total
+POLL_JOB_ID = "poll"
 
 
-def run_scheduler(jma_url: str, interval_minutes: int = 5) -> None:
+def run_scheduler(jma_url: str, interval_minutes: float = 5) -> None:
     """
     Sets up and runs the alert fetching job on a schedule.
+
+    The interval adapts to weather activity (see :class:`AdaptiveInterval`): the poll job is
+    rescheduled after each run whenever the chosen interval changes.
     """
     scheduler = BackgroundScheduler(timezone=timezone.utc)
+    pipeline = Pipeline(jma_url)
+    poller = AdaptiveInterval.from_env(interval_minutes)
 
     def job():
+        failed = False
         try:
-            count = pipeline_once(jma_url)
+            count = pipeline.run_once()
             if count > 0:
                 logger.info(f"Successfully sent {count} new alerts.")
         except Exception as exc:  # pylint: disable=broad-except-clause
+            failed = True
             logger.exception(f"An error occurred in the pipeline: {exc}")
+        previous = poller.current
+        interval = poller.next(
+            active=pipeline.has_active_alerts, changed=pipeline.feed_changed, failed=failed
+        )
+        if interval != previous:
+            scheduler.reschedule_job(
+                POLL_JOB_ID, trigger="interval", seconds=interval.total_seconds()
+            )
+
+    scheduler.add_job(
+        job,
+        "interval",
+        seconds=poller.current.total_seconds(),
+        id=POLL_JOB_ID,
+        next_run_time=datetime.now(timezone.utc),
+    )
+    if pipeline.coalesce_window > timedelta(0):
+        # Send coalesced alerts when their window elapses rather than on the next poll
+        seconds = max(5.0, pipeline.coalesce_window.total_seconds() / 2)
+
+        def release_job():
+            try:
+                pipeline.release_due()
+            except Exception as exc:  # pylint: disable=broad-except-clause
+                logger.exception(f"Failed to send coalesced alerts: {exc}")
 
-    scheduler.add_job(job, "interval", minutes=interval_minutes, next_run_time=datetime.now(timezone.utc))
+        scheduler.add_job(release_job, "interval", seconds=seconds)
     scheduler.start()
-    logger.info(f"Scheduler started. Checking for new alerts every {interval_minutes} minutes.")
+    logger.info(
+        f"Scheduler started. Checking for new alerts every {interval_minutes} minutes "
+        f"(adaptive: {poller.fast.total_seconds():.0f}s to {poller.maximum.total_seconds():.0f}s)."
+    )
 
     try:
         import time
@@ -139,6 +552,7 @@ def run_scheduler(jma_url: str, interval_minutes: int = 5) -> None:
     except KeyboardInterrupt:
         logger.info("Scheduler shutting down...")
         scheduler.shutdown()
+        pipeline.close()
         logger.info("Scheduler shut down successfully.")
 
 
@@ -174,6 +588,12 @@ if __name__ == "__main__":
         action="store_true",
         help="Do not record sent alert IDs to storage",
     )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Use the asyncio runtime (aiohttp fetches, async webhook sends)",
+    )
 
     args = parser.parse_args()
 
@@ -184,13 +604,32 @@ if __name__ == "__main__":
             "JMA_FEED_URL", "https://www.data.jma.go.jp/developer/xml/feed/extra.xml"
         )
 
-    if args.once:
+    dry_run = args.dry_run or (os.getenv("DRY_RUN", "").lower() in {"1","true","yes","on"})
+    if args.use_async or os.getenv("RUNTIME", "").lower() == "asyncio":
+        import asyncio
+
+        from .async_runtime import run_async
+
+        try:
+            asyncio.run(
+                run_async(
+                    url,
+                    interval_minutes=float(os.getenv("FETCH_INTERVAL_MIN", "5")),
+                    once=args.once,
+                    dry_run=dry_run,
+                    force_send=args.force_send,
+                    no_store=args.no_store,
+                )
+            )
+        except KeyboardInterrupt:
+            logger.info("Async runtime shut down.")
+    elif args.once:
         count = pipeline_once(
             url,
-            dry_run=args.dry_run or (os.getenv("DRY_RUN", "").lower() in {"1","true","yes","on"}),
+            dry_run=dry_run,
             force_send=args.force_send,
             no_store=args.no_store,
         )
         logger.info("Run once finished. New alerts sent: %d", count)
     else:
-        run_scheduler(url, interval_minutes=int(os.getenv("FETCH_INTERVAL_MIN", "5")))
+        run_scheduler(url, interval_minutes=float(os.getenv("FETCH_INTERVAL_MIN", "5")))
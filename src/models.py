@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from hashlib import blake2b
 from typing import Optional, Any
 
 
@@ -21,6 +22,10 @@ class Alert:
         link: Source link if any
         status: Alert lifecycle status ("active" or "cancelled")
         raw: Optional raw payload for debugging
+        area_code: JMA area code from ``Area/Code`` (e.g., "1310100" for 千代田区) if present
+        fingerprint: Hash of the notified content (status, category, severity, title, expiry);
+            derived on construction. ``id`` says which alert this is, ``fingerprint`` whether
+            its content changed since it was sent.
     """
 
     id: str
@@ -34,6 +39,22 @@ class Alert:
     link: Optional[str]
     status: str = "active"
     raw: Optional[Any] = None
+    area_code: Optional[str] = None
+    fingerprint: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        content = "|".join(
+            (
+                self.status,
+                self.category,
+                self.severity,
+                self.title,
+                self.expires_at.isoformat() if self.expires_at else "",
+            )
+        )
+        object.__setattr__(
+            self, "fingerprint", blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+        )
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -47,8 +68,57 @@ class Alert:
             "expires_at": self.expires_at.isoformat() if self.expires_at else None,
             "link": self.link,
             "status": self.status,
+            "area_code": self.area_code,
+            "fingerprint": self.fingerprint,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Alert":
+        """Inverse of :meth:`to_dict` (``raw`` is not kept; the fingerprint is recomputed)."""
+        expires_at = data.get("expires_at")
+        return cls(
+            id=str(data["id"]),
+            title=str(data.get("title", "")),
+            area=str(data.get("area", "")),
+            ward=data.get("ward"),
+            category=str(data.get("category", "")),
+            severity=str(data.get("severity", "")),
+            issued_at=datetime.fromisoformat(data["issued_at"]),
+            expires_at=datetime.fromisoformat(expires_at) if expires_at else None,
+            link=data.get("link"),
+            status=str(data.get("status", "active")),
+            area_code=data.get("area_code"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MessageSlot:
+    """Where an alert was posted on Discord, so later bulletins can edit that message.
+
+    Attributes:
+        message_id: Discord message id returned by ``webhook.send(wait=True)``
+        index: Index of the alert group's first embed within the message
+        span: Number of embeds rendered for the group
+        members: Number of alerts rendered into those embeds
+    """
+
+    message_id: int
+    index: int
+    span: int
+    members: int
+
+    def to_list(self) -> list[int]:
+        return [self.message_id, self.index, self.span, self.members]
+
+    @classmethod
+    def from_value(cls, value: Any) -> Optional["MessageSlot"]:
+        """Parse the stored ``[message_id, index, span, members]`` form (None if invalid)."""
+        try:
+            message_id, index, span, members = (int(v) for v in value)
+        except (TypeError, ValueError):
+            return None
+        return cls(message_id=message_id, index=index, span=span, members=members)
+
 
 @dataclass(frozen=True, slots=True)
 class SchoolGuidance:
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from .models import Alert
+from .school_policy import DECISION_TIMES, _jst_now
+
+logger = logging.getLogger(__name__)
+
+# Poll fast from this long before each school decision point until shortly after it
+DECISION_LEAD = timedelta(minutes=15)
+DECISION_TAIL = timedelta(minutes=5)
+# Kind/Status meaning that nothing is in effect for the area
+NO_WARNINGS_SEVERITY = "発表警報・注意報はなし"
+
+
+def has_active_alerts(alerts: Iterable[Alert]) -> bool:
+    """True if a warning (警報/特別警報) among ``alerts`` is still in effect.
+
+    Advisories (注意報) do not count: a dry-air advisory can stay in effect for weeks.
+    """
+    return any(
+        getattr(a, "status", "active") != "cancelled"
+        and a.severity != NO_WARNINGS_SEVERITY
+        and (a.category or "").strip().endswith("警報")
+        for a in alerts
+    )
+
+
+class AdaptiveInterval:
+    """Choose the delay until the next poll from the outcome of the last one.
+
+    * ``fast`` while a Tokyo warning is in effect, right after the feed brought new warning
+      entries, and around the 06:00/08:00/10:00 JST decision points of ``school_policy``;
+      a quiet interval is also cut short so the poll lands at the start of such a window.
+    * Otherwise the interval doubles per quiet poll, from where it was up to ``maximum``.
+    * After a failed poll it grows as ``base * 2**failures`` (also capped at ``maximum``).
+
+    With ``fast == base == maximum`` this is the fixed interval of earlier releases.
+    """
+
+    def __init__(
+        self,
+        base: timedelta,
+        *,
+        fast: Optional[timedelta] = None,
+        maximum: Optional[timedelta] = None,
+    ) -> None:
+        self.base = base
+        self.fast = min(fast if fast is not None else base, base)
+        self.maximum = max(maximum if maximum is not None else base, base)
+        self.current = base
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls, base_minutes: float) -> "AdaptiveInterval":
+        """Build from ``FETCH_INTERVAL_FAST_SEC`` / ``FETCH_INTERVAL_MAX_MIN``.
+
+        ``FETCH_INTERVAL_ADAPTIVE=false`` keeps polling every ``base_minutes``.
+        """
+        base = timedelta(minutes=base_minutes)
+        if os.getenv("FETCH_INTERVAL_ADAPTIVE", "true").lower() in {"0", "false", "no", "off"}:
+            return cls(base)
+        try:
+            fast = timedelta(seconds=float(os.getenv("FETCH_INTERVAL_FAST_SEC", "30")))
+            maximum = timedelta(
+                minutes=float(os.getenv("FETCH_INTERVAL_MAX_MIN", str(base_minutes * 2)))
+            )
+        except ValueError:
+            logger.warning("Invalid FETCH_INTERVAL_FAST_SEC/MAX_MIN; polling at a fixed interval.")
+            return cls(base)
+        return cls(base, fast=fast, maximum=maximum)
+
+    def _until_decision_window(self, now: datetime) -> timedelta:
+        """Zero inside a decision window, else the time until the next one starts."""
+        jst = _jst_now(now)
+        best: Optional[timedelta] = None
+        for day in (0, 1):
+            for t in DECISION_TIMES:
+                point = datetime.combine(
+                    jst.date() + timedelta(days=day), t, tzinfo=jst.tzinfo
+                )
+                if point - DECISION_LEAD <= jst <= point + DECISION_TAIL:
+                    return timedelta(0)
+                if point - DECISION_LEAD > jst:
+                    wait = point - DECISION_LEAD - jst
+                    best = wait if best is None else min(best, wait)
+        return best if best is not None else self.maximum
+
+    def next(
+        self,
+        *,
+        active: bool = False,
+        changed: bool = False,
+        failed: bool = False,
+        now: Optional[datetime] = None,
+    ) -> timedelta:
+        """Record the last poll's outcome and return the delay until the next poll."""
+        now = now or datetime.now(timezone.utc)
+        until_window = self._until_decision_window(now)
+        if failed:
+            self.failures += 1
+            interval = min(self.maximum, self.base * 2 ** min(self.failures, 16))
+        else:
+            self.failures = 0
+            if active or changed or until_window <= timedelta(0):
+                interval = self.fast
+            else:
+                interval = min(self.maximum, self.current * 2)
+                # Do not sleep past the start of the next decision window
+                interval = max(self.fast, min(interval, until_window))
+        if interval != self.current:
+            logger.info(
+                f"Polling interval {self.current.total_seconds():.0f}s -> "
+                f"{interval.total_seconds():.0f}s (active={active}, changed={changed}, "
+                f"failures={self.failures})."
+            )
+        self.current = interval
+        return interval
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .filter import TOKYO_23_WARD_CODES, AhoCorasick
+from .models import Alert
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGION = "tokyo23"
+
+# Region names become part of file names (sent_ids.<name>.json)
+REGION_NAME_RE = re.compile(r"[A-Za-z0-9_-]+")
+
+
+@dataclass(frozen=True, slots=True)
+class Region:
+    """A named set of municipalities that receives its own alert partition.
+
+    Attributes:
+        name: Region identifier (also used for per-region storage file names)
+        areas: JMA area code -> municipality label (set as ``Alert.ward``)
+        names: Extra municipality names matched only for alerts without an area code
+        webhook_url: Discord webhook for this region (None: use DISCORD_WEBHOOK_URL)
+        offices: JMA office codes whose feed entries cover the region (default: the
+            prefecture office derived from the area codes, e.g. 130000)
+    """
+
+    name: str
+    areas: Dict[str, str]
+    names: frozenset[str] = field(default_factory=frozenset)
+    webhook_url: Optional[str] = None
+    offices: frozenset[str] = field(default_factory=frozenset)
+
+    @property
+    def office_codes(self) -> frozenset[str]:
+        if self.offices:
+            return self.offices
+        return frozenset(code.strip()[:2] + "0000" for code in self.areas)
+
+
+TOKYO_23_REGION = Region(name=DEFAULT_REGION, areas=dict(TOKYO_23_WARD_CODES))
+
+
+class RegionIndex:
+    """Shared lookup index compiled from several regions.
+
+    Area codes are resolved by their 5-digit JIS prefix with one dict lookup; code-less
+    alerts are matched by name with a single Aho–Corasick scan over all regions' names.
+    Overlapping regions each receive their own copy of a matching alert.
+    """
+
+    def __init__(self, regions: Iterable[Region]) -> None:
+        self.regions: Dict[str, Region] = {}
+        self._by_code: Dict[str, List[tuple[str, str]]] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        for region in regions:
+            if region.name in self.regions:
+                raise ValueError(f"Duplicate region name: {region.name}")
+            self.regions[region.name] = region
+            for code, label in region.areas.items():
+                self._by_code.setdefault(code.strip()[:5], []).append((region.name, label))
+                self._by_name.setdefault(label, []).append(region.name)
+            for label in region.names:
+                self._by_name.setdefault(label, []).append(region.name)
+        self._matcher = AhoCorasick(self._by_name)
+
+    @property
+    def office_codes(self) -> frozenset[str]:
+        """Union of the JMA office codes of all regions (for feed entry selection)."""
+        return frozenset(code for r in self.regions.values() for code in r.office_codes)
+
+    def match(self, alert: Alert) -> Dict[str, str]:
+        """Return ``{region name: municipality label}`` for every region the alert belongs to."""
+        if alert.area_code:
+            return dict(self._by_code.get(alert.area_code.strip()[:5], ()))
+        found: Dict[str, str] = {}
+        for text in (alert.area, alert.ward):
+            if not text:
+                continue
+            for label in self._matcher.iter_matches(text):
+                for region_name in self._by_name[label]:
+                    found.setdefault(region_name, label)
+        return found
+
+    def partition(self, alerts: Iterable[Alert]) -> Dict[str, List[Alert]]:
+        """Split ``alerts`` into per-region lists in a single pass (every region gets a key)."""
+        out: Dict[str, List[Alert]] = {name: [] for name in self.regions}
+        total = 0
+        for a in alerts:
+            total += 1
+            for region_name, label in self.match(a).items():
+                out[region_name].append(replace(a, ward=label))
+        logger.info(
+            f"Partitioned {total} alerts into regions: "
+            + ", ".join(f"{name}={len(items)}" for name, items in out.items())
+        )
+        return out
+
+
+def load_regions(path: Optional[Path] = None) -> List[Region]:
+    """Load region definitions from ``path`` or ``REGIONS_FILE``.
+
+    File format:
+        {"regions": [{"name": "...", "areas": {"<code>": "<label>"}, "names": [...],
+                      "webhook_url": "...", "offices": ["<office code>"]}, ...]}
+
+    The built-in ``tokyo23`` region is always included unless the file redefines it.
+    """
+    regions: Dict[str, Region] = {DEFAULT_REGION: TOKYO_23_REGION}
+    if path is None:
+        env_path = os.getenv("REGIONS_FILE")
+        path = Path(env_path) if env_path else None
+    if path is None:
+        return list(regions.values())
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.exception(f"Failed to load regions from {path}: {e}")
+        return list(regions.values())
+
+    for item in data.get("regions", []) if isinstance(data, dict) else []:
+        try:
+            name = str(item["name"])
+            if not REGION_NAME_RE.fullmatch(name):
+                raise ValueError(f"region name must match {REGION_NAME_RE.pattern}")
+            region = Region(
+                name=name,
+                areas={str(k): str(v) for k, v in dict(item.get("areas", {})).items()},
+                names=frozenset(str(n) for n in item.get("names", [])),
+                webhook_url=item.get("webhook_url"),
+                offices=frozenset(str(o) for o in item.get("offices", [])),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Skipping invalid region definition {item!r}: {e}")
+            continue
+        regions[region.name] = region
+    logger.info(f"Loaded {len(regions)} regions: {', '.join(regions)}")
+    return list(regions.values())
@@ -9,6 +9,8 @@ from .models import Alert, SchoolGuidance
 
 # 対象となる警報キーワード（名称に含まれる場合にカウント）
 TARGET_WARNINGS = ("暴風雪", "大雨", "洪水", "暴風", "大雪")
+# 判定時刻（JST）: 6時・8時・10時
+DECISION_TIMES = (time(6, 0), time(8, 0), time(10, 0))
 
 
 def _is_target_warning(alert: Alert) -> bool:
@@ -2,37 +2,95 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import timedelta
 from pathlib import Path
-from typing import Iterable, Dict
+from typing import Any, Iterable, Iterator, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Refreshing last_seen more often than this would rewrite the file on every tick
+TOUCH_GRANULARITY_SEC = 3600.0
+# IDs per SELECT ... IN (...) lookup (SQLite allows 999 parameters in older builds)
+SQLITE_LOOKUP_BATCH = 500
+
+
+# Optional per-record details: fingerprint of the last notified content (Alert.fingerprint)
+# and the Discord message slot ([message_id, index, span, members], see models.MessageSlot)
+DETAIL_KEYS = ("fingerprint", "message")
+
+
+def _normalize_status(value: object) -> str:
+    return "cancelled" if value == "cancelled" else "active"
+
+
+def _details(value: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: value[k] for k in DETAIL_KEYS if value.get(k) is not None}
+
+
+def _coerce_record(value: object, default_ts: float) -> Dict[str, Any]:
+    """Normalize a stored value (legacy status string or record dict) to a record."""
+    if isinstance(value, dict):
+        try:
+            last_seen = float(value.get("last_seen", default_ts))
+        except (TypeError, ValueError):
+            last_seen = default_ts
+        return {
+            "status": _normalize_status(value.get("status")),
+            "last_seen": last_seen,
+            **_details(value),
+        }
+    return {"status": _normalize_status(value), "last_seen": default_ts}
+
+
+def _expired_ids(items: Dict[str, Dict[str, Any]], cutoff: float) -> List[str]:
+    return [aid for aid, rec in items.items() if rec["last_seen"] < cutoff]
+
 
 class JsonStorage:
     """Persist a mapping of alert IDs to status to avoid duplicates and track cancellations.
 
     File format (new):
-        { "<id>": "active" | "cancelled", ... }
+        { "<id>": {"status": "active" | "cancelled", "last_seen": <unix time>,
+                   "fingerprint": "...", "message": [...]}, ... }
+
+    ``fingerprint`` and ``message`` are optional (see :meth:`update_details`).
+
+    Backward compatibility: plain ``"<id>": "<status>"`` values and a list of IDs (treated
+    as "active") are still read; their last-seen time starts at load time.
 
-    Backward compatibility: if file is a list of IDs, treat them as "active".
+    The file is read once on construction and served from memory afterwards. Changes are
+    kept in memory until :meth:`flush`, which evicts records not seen within ``retention``
+    (if set) and writes the rest in one atomic replace. Expired records are also evicted on
+    load and before :meth:`touch_many`, so they never count as sent.
     """
 
-    def __init__(self, path: Path) -> None:
+    def __init__(self, path: Path, *, retention: Optional[timedelta] = None) -> None:
         self.path = path
+        self.retention = retention
         self.path.parent.mkdir(parents=True, exist_ok=True)
         if not self.path.exists():
             logger.info(f"Storage file not found at {self.path}, creating a new one.")
-            self._write(set())
+            self._write({})
+        self._items: Dict[str, Dict[str, Any]] = self._read()
+        self._dirty = False
+        # Records that expired while the process was down must not suppress alerts
+        self.evict_expired()
 
-    def _read(self) -> Dict[str, str]:
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
         try:
             data = json.loads(self.path.read_text(encoding="utf-8"))
             if isinstance(data, list):  # backward compat
                 logger.debug("Detected legacy list format; converting to map.")
-                return {str(x): "active" for x in data}
+                return {str(x): _coerce_record("active", now) for x in data}
             if isinstance(data, dict):
                 # validate values
-                return {str(k): ("cancelled" if v == "cancelled" else "active") for k, v in data.items()}
+                return {str(k): _coerce_record(v, now) for k, v in data.items()}
             logger.warning("Unexpected storage format; returning empty map.")
             return {}
         except FileNotFoundError:
@@ -42,48 +100,621 @@ class JsonStorage:
             logger.exception(f"Failed to decode JSON from {self.path}, returning empty set.")
             return {}
 
-    def _write(self, items: Dict[str, str] | Iterable[str]) -> None:
-        # Accept either mapping (new) or iterable of ids (legacy path)
-        if isinstance(items, dict):
-            payload = items
-        else:
-            payload = {str(x): "active" for x in set(items)}
+    def _write(self, items: Dict[str, Dict[str, Any]]) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
         try:
-            self.path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-            logger.debug(f"Wrote {len(payload)} IDs to {self.path}")
+            tmp_path.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            logger.debug(f"Wrote {len(items)} IDs to {self.path}")
         except OSError as e:
             logger.exception(f"Failed to write to storage file {self.path}: {e}")
 
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop records whose last-seen time is older than ``retention``."""
+        if self.retention is None:
+            return 0
+        cutoff = (now if now is not None else time.time()) - self.retention.total_seconds()
+        expired = _expired_ids(self._items, cutoff)
+        for aid in expired:
+            del self._items[aid]
+        if expired:
+            self._dirty = True
+            logger.info(f"Evicted {len(expired)} alert IDs not seen within {self.retention}.")
+        return len(expired)
+
+    def flush(self) -> None:
+        """Evict expired records and write pending changes (no-op when nothing changed)."""
+        self.evict_expired()
+        if not self._dirty:
+            return
+        self._write(self._items)
+        self._dirty = False
+
     def has(self, alert_id: str) -> bool:
-        return alert_id in self._read()
+        return alert_id in self._items
 
     def add(self, alert_id: str, status: str = "active") -> None:
-        items = self._read()
-        if alert_id not in items:
-            items[alert_id] = status if status in {"active", "cancelled"} else "active"
-            self._write(items)
-            logger.info(f"Added alert ID {alert_id} with status={items[alert_id]} to storage.")
+        if alert_id not in self._items:
+            normalized = _normalize_status(status)
+            self._items[alert_id] = {"status": normalized, "last_seen": time.time()}
+            self._dirty = True
+            logger.info(f"Added alert ID {alert_id} with status={normalized} to storage.")
 
     def add_many(self, alert_ids: Iterable[str], status: str = "active") -> None:
-        items = self._read()
+        now = time.time()
         count = 0
         for aid in alert_ids:
-            if aid not in items:
-                items[str(aid)] = status if status in {"active", "cancelled"} else "active"
+            if aid not in self._items:
+                self._items[str(aid)] = {"status": _normalize_status(status), "last_seen": now}
                 count += 1
         if count:
-            self._write(items)
+            self._dirty = True
             logger.info(f"Added {count} new alert IDs to storage with status={status}.")
 
+    def touch_many(self, alert_ids: Iterable[str], now: Optional[float] = None) -> None:
+        """Refresh the last-seen time of known IDs that are still present in the feed."""
+        now = now if now is not None else time.time()
+        # An expired record is gone, not refreshed
+        self.evict_expired(now)
+        for aid in alert_ids:
+            rec = self._items.get(aid)
+            if rec is not None and now - rec["last_seen"] >= TOUCH_GRANULARITY_SEC:
+                rec["last_seen"] = now
+                self._dirty = True
+
     def get_status(self, alert_id: str) -> str | None:
-        return self._read().get(alert_id)
+        rec = self._items.get(alert_id)
+        return rec["status"] if rec else None
 
     def update_status(self, alert_id: str, status: str) -> None:
         if status not in {"active", "cancelled"}:
             logger.warning("Unsupported status '%s' ignored.", status)
             return
-        items = self._read()
-        if alert_id in items:
-            items[alert_id] = status
-            self._write(items)
+        rec = self._items.get(alert_id)
+        if rec is not None and rec["status"] != status:
+            rec["status"] = status
+            rec["last_seen"] = time.time()
+            self._dirty = True
             logger.info("Updated alert %s to status=%s", alert_id, status)
+
+    def fingerprints(self, alert_ids: Iterable[str]) -> Dict[str, tuple[str, Optional[str]]]:
+        """``{id: (status, fingerprint)}`` for the known IDs among ``alert_ids``."""
+        items = self._items
+        return {
+            aid: (rec["status"], rec.get("fingerprint"))
+            for aid in alert_ids
+            if (rec := items.get(aid)) is not None
+        }
+
+    def get_record(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        """Status and details of ``alert_id`` (a copy), or None if unknown."""
+        rec = self._items.get(alert_id)
+        return dict(rec) if rec else None
+
+    def update_details(
+        self, alert_id: str, *, fingerprint: Optional[str] = None, message: Optional[list] = None
+    ) -> None:
+        """Store the notified fingerprint and/or message slot of a known ID (None keeps)."""
+        rec = self._items.get(alert_id)
+        if rec is None:
+            return
+        changes = _details({"fingerprint": fingerprint, "message": message})
+        if any(rec.get(k) != v for k, v in changes.items()):
+            rec.update(changes)
+            self._dirty = True
+
+
+class JournalStorage:
+    """Append-only journal backend with the same interface as :class:`JsonStorage`.
+
+    Files (next to ``path``, e.g. ``sent_ids.json``):
+        ``sent_ids.journal``        one JSON record per line: {"id", "status", "ts"} plus
+                                    the optional details (``fingerprint``, ``message``)
+        ``sent_ids.snapshot.json``  compacted map in the :class:`JsonStorage` file format
+
+    On startup the snapshot is loaded and the journal replayed on top of it. When neither
+    exists but ``path`` does, the existing JSON map (or legacy list) is imported once.
+    :meth:`flush` appends only the records changed since the last flush, so the write cost
+    does not depend on the size of the history. Once ``compact_threshold`` records have
+    been appended, a background thread folds the journal into a new snapshot. A record's
+    ``ts`` is its last-seen time; records older than ``retention`` are evicted on flush and
+    dropped from the next snapshot.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        compact_threshold: int = 1000,
+        retention: Optional[timedelta] = None,
+    ) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.journal_path = path.with_suffix(".journal")
+        self.snapshot_path = path.with_suffix(".snapshot.json")
+        self._rotated_path = path.with_suffix(".journal.old")
+        self.compact_threshold = compact_threshold
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._pending: List[Dict[str, object]] = []
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._journal_records = 0
+        self._load()
+
+    def _load(self) -> None:
+        has_state = (
+            self.snapshot_path.exists()
+            or self.journal_path.exists()
+            or self._rotated_path.exists()
+        )
+        if not has_state and self.path.exists():
+            logger.info(f"Importing existing storage file {self.path} into journal backend.")
+            self._items = JsonStorage(self.path)._read()
+            self._write_snapshot(self._items)
+            return
+
+        if self.snapshot_path.exists():
+            now = time.time()
+            try:
+                data = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+                if isinstance(data, dict):
+                    self._items = {str(k): _coerce_record(v, now) for k, v in data.items()}
+            except json.JSONDecodeError:
+                logger.exception(f"Failed to decode snapshot {self.snapshot_path}, ignoring it.")
+        for journal in (self._rotated_path, self.journal_path):
+            self._journal_records += self._replay(journal)
+        # Records that expired while the process was down must not suppress alerts
+        self.evict_expired()
+        logger.debug(
+            f"Loaded {len(self._items)} IDs from journal storage "
+            f"({self._journal_records} journal records)."
+        )
+
+    def _replay(self, journal: Path) -> int:
+        count = 0
+        try:
+            with journal.open(encoding="utf-8") as f:
+                for lineno, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        rec = json.loads(line)
+                        self._items[str(rec["id"])] = {
+                            "status": _normalize_status(rec.get("status")),
+                            "last_seen": float(rec.get("ts", time.time())),
+                            **_details(rec),
+                        }
+                        count += 1
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                        # A torn last line after a crash is expected; skip it
+                        logger.warning(f"Skipping malformed journal record {journal}:{lineno}")
+        except FileNotFoundError:
+            pass
+        return count
+
+    def _write_snapshot(self, items: Dict[str, Dict[str, Any]]) -> None:
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _record(self, alert_id: str, status: str, ts: Optional[float] = None, **details) -> None:
+        ts = ts if ts is not None else time.time()
+        # Journal records are full records: carry the details over from the previous one
+        merged = {**_details(self._items.get(alert_id, {})), **_details(details)}
+        self._items[alert_id] = {"status": status, "last_seen": ts, **merged}
+        self._pending.append({"id": alert_id, "status": status, "ts": ts, **merged})
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop records whose last-seen time is older than ``retention`` from memory."""
+        if self.retention is None:
+            return 0
+        cutoff = (now if now is not None else time.time()) - self.retention.total_seconds()
+        with self._lock:
+            expired = _expired_ids(self._items, cutoff)
+            for aid in expired:
+                del self._items[aid]
+        if expired:
+            logger.info(f"Evicted {len(expired)} alert IDs not seen within {self.retention}.")
+        return len(expired)
+
+    def flush(self) -> None:
+        """Append pending records to the journal and compact it when it grew too long."""
+        self.evict_expired()
+        with self._lock:
+            if not self._pending:
+                return
+            lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in self._pending)
+            try:
+                with self.journal_path.open("a", encoding="utf-8") as f:
+                    f.write(lines)
+            except OSError as e:
+                logger.exception(f"Failed to append to journal {self.journal_path}: {e}")
+                return
+            logger.debug(f"Appended {len(self._pending)} records to {self.journal_path}")
+            self._journal_records += len(self._pending)
+            self._pending.clear()
+            should_compact = self._journal_records >= self.compact_threshold
+        if should_compact:
+            self.compact(blocking=False)
+
+    def compact(self, *, blocking: bool = True) -> None:
+        """Fold the journal into the snapshot (in a background thread unless ``blocking``)."""
+        if self._compactor is not None and self._compactor.is_alive():
+            if blocking:
+                self._compactor.join()
+            return
+        self._compactor = threading.Thread(
+            target=self._compact, name="journal-compactor", daemon=True
+        )
+        self._compactor.start()
+        if blocking:
+            self._compactor.join()
+
+    def _rotate_journal(self) -> None:
+        if not self._rotated_path.exists():
+            os.replace(self.journal_path, self._rotated_path)
+            return
+        # A failed compaction left records the snapshot lacks: append, never overwrite them
+        with self._rotated_path.open("a+b") as old, self.journal_path.open("rb") as new:
+            old.seek(0, os.SEEK_END)
+            if old.tell():
+                old.seek(-1, os.SEEK_END)
+                if old.read(1) != b"\n":
+                    old.write(b"\n")
+            shutil.copyfileobj(new, old)
+        self.journal_path.unlink()
+
+    def _compact(self) -> None:
+        with self._lock:
+            # Rotate the journal so new appends do not wait for the snapshot write
+            try:
+                if self.journal_path.exists():
+                    self._rotate_journal()
+            except OSError as e:
+                logger.exception(f"Failed to rotate journal {self.journal_path}: {e}")
+                return
+            items = {aid: dict(rec) for aid, rec in self._items.items()}
+            self._journal_records = 0
+        try:
+            self._write_snapshot(items)
+            self._rotated_path.unlink(missing_ok=True)
+            logger.info(f"Compacted journal into snapshot with {len(items)} IDs.")
+        except OSError as e:
+            logger.exception(f"Failed to compact journal into {self.snapshot_path}: {e}")
+
+    def has(self, alert_id: str) -> bool:
+        return alert_id in self._items
+
+    def add(self, alert_id: str, status: str = "active") -> None:
+        with self._lock:
+            if alert_id not in self._items:
+                self._record(alert_id, _normalize_status(status))
+                logger.info(
+                    f"Added alert ID {alert_id} with status={self._items[alert_id]['status']} "
+                    "to storage."
+                )
+
+    def add_many(self, alert_ids: Iterable[str], status: str = "active") -> None:
+        count = 0
+        with self._lock:
+            for aid in alert_ids:
+                if str(aid) not in self._items:
+                    self._record(str(aid), _normalize_status(status))
+                    count += 1
+        if count:
+            logger.info(f"Added {count} new alert IDs to storage with status={status}.")
+
+    def touch_many(self, alert_ids: Iterable[str], now: Optional[float] = None) -> None:
+        """Refresh the last-seen time of known IDs that are still present in the feed."""
+        now = now if now is not None else time.time()
+        # An expired record is gone, not refreshed
+        self.evict_expired(now)
+        with self._lock:
+            for aid in alert_ids:
+                rec = self._items.get(aid)
+                if rec is not None and now - rec["last_seen"] >= TOUCH_GRANULARITY_SEC:
+                    self._record(aid, rec["status"], now)
+
+    def get_status(self, alert_id: str) -> str | None:
+        rec = self._items.get(alert_id)
+        return rec["status"] if rec else None
+
+    def update_status(self, alert_id: str, status: str) -> None:
+        if status not in {"active", "cancelled"}:
+            logger.warning("Unsupported status '%s' ignored.", status)
+            return
+        with self._lock:
+            rec = self._items.get(alert_id)
+            if rec is not None and rec["status"] != status:
+                self._record(alert_id, status)
+                logger.info("Updated alert %s to status=%s", alert_id, status)
+
+    def fingerprints(self, alert_ids: Iterable[str]) -> Dict[str, tuple[str, Optional[str]]]:
+        """``{id: (status, fingerprint)}`` for the known IDs among ``alert_ids``."""
+        items = self._items
+        return {
+            aid: (rec["status"], rec.get("fingerprint"))
+            for aid in alert_ids
+            if (rec := items.get(aid)) is not None
+        }
+
+    def get_record(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        """Status and details of ``alert_id`` (a copy), or None if unknown."""
+        rec = self._items.get(alert_id)
+        return dict(rec) if rec else None
+
+    def update_details(
+        self, alert_id: str, *, fingerprint: Optional[str] = None, message: Optional[list] = None
+    ) -> None:
+        """Store the notified fingerprint and/or message slot of a known ID (None keeps)."""
+        changes = _details({"fingerprint": fingerprint, "message": message})
+        with self._lock:
+            rec = self._items.get(alert_id)
+            if rec is not None and any(rec.get(k) != v for k, v in changes.items()):
+                self._record(alert_id, rec["status"], rec["last_seen"], **changes)
+
+
+class SqliteStorage:
+    """SQLite backend with the same interface as :class:`JsonStorage`.
+
+    The database (``sent_ids.sqlite3`` next to ``path``) runs in WAL mode and keys the
+    ``alerts`` table by alert id, so lookups are primary-key index hits. Changes are
+    buffered in memory and written by :meth:`flush` with one ``executemany`` upsert inside a
+    single transaction. ``updated_at`` holds the last-seen time; rows older than
+    ``retention`` are deleted in the same transaction. ``fingerprint`` and ``message`` (JSON)
+    hold the optional record details; older databases get the columns added on open. On
+    first start an existing ``path`` (JSON map or legacy list) is imported.
+    """
+
+    def __init__(self, path: Path, *, retention: Optional[timedelta] = None) -> None:
+        self.path = path
+        self.retention = retention
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = path.with_suffix(".sqlite3")
+        fresh = not self.db_path.exists()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, str] = {}
+        self._touched: Dict[str, float] = {}
+        self._details: Dict[str, Dict[str, Any]] = {}
+        # isolation_level=None: transactions are opened explicitly in flush()
+        self._conn = sqlite3.connect(
+            str(self.db_path), isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS alerts ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " updated_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS alerts_updated_at ON alerts (updated_at)")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(alerts)")}
+        for column in DETAIL_KEYS:
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE alerts ADD COLUMN {column} TEXT")
+        if fresh and self.path.exists():
+            logger.info(f"Importing existing storage file {self.path} into {self.db_path}.")
+            for aid, rec in JsonStorage(self.path)._read().items():
+                self._pending[aid] = rec["status"]
+                if _details(rec):
+                    self._details[aid] = _details(rec)
+            self.flush()
+        # Rows that expired while the process was down must not suppress alerts
+        self.evict_expired()
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def flush(self) -> None:
+        """Upsert pending changes and evict expired rows in one transaction."""
+        with self._lock:
+            if (
+                not self._pending
+                and not self._touched
+                and not self._details
+                and self.retention is None
+            ):
+                return
+            now = time.time()
+            rows = [(aid, status, now) for aid, status in self._pending.items()]
+            touches = [(ts, aid) for aid, ts in self._touched.items() if aid not in self._pending]
+            details = [
+                (d.get("fingerprint"), json.dumps(d["message"]) if "message" in d else None, aid)
+                for aid, d in self._details.items()
+            ]
+            try:
+                self._conn.execute("BEGIN")
+                if rows:
+                    self._conn.executemany(
+                        "INSERT INTO alerts (id, status, updated_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(id) DO UPDATE SET "
+                        "status = excluded.status, updated_at = excluded.updated_at",
+                        rows,
+                    )
+                if touches:
+                    self._conn.executemany(
+                        "UPDATE alerts SET updated_at = ? WHERE id = ?", touches
+                    )
+                if details:
+                    self._conn.executemany(
+                        "UPDATE alerts SET fingerprint = COALESCE(?, fingerprint), "
+                        "message = COALESCE(?, message) WHERE id = ?",
+                        details,
+                    )
+                evicted = 0
+                if self.retention is not None:
+                    evicted = self._conn.execute(
+                        "DELETE FROM alerts WHERE updated_at < ?",
+                        (now - self.retention.total_seconds(),),
+                    ).rowcount
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                logger.exception(f"Failed to write {len(rows)} IDs to {self.db_path}: {e}")
+                return
+            self._pending.clear()
+            self._touched.clear()
+            self._details.clear()
+            if rows:
+                logger.debug(f"Upserted {len(rows)} IDs into {self.db_path}")
+            if evicted:
+                logger.info(f"Evicted {evicted} alert IDs not seen within {self.retention}.")
+
+    def _select_in(self, columns: str, ids: list[str]) -> Iterator[tuple]:
+        """Rows of ``ids`` in batched ``IN`` queries (callers hold the lock)."""
+        for start in range(0, len(ids), SQLITE_LOOKUP_BATCH):
+            batch = ids[start : start + SQLITE_LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            yield from self._conn.execute(
+                f"SELECT {columns} FROM alerts WHERE id IN ({placeholders})", batch
+            )
+
+    def get_status(self, alert_id: str) -> str | None:
+        with self._lock:
+            if alert_id in self._pending:
+                return self._pending[alert_id]
+            row = self._conn.execute(
+                "SELECT status FROM alerts WHERE id = ?", (alert_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def has(self, alert_id: str) -> bool:
+        return self.get_status(alert_id) is not None
+
+    def add(self, alert_id: str, status: str = "active") -> None:
+        if not self.has(alert_id):
+            normalized = _normalize_status(status)
+            with self._lock:
+                self._pending[alert_id] = normalized
+            logger.info(f"Added alert ID {alert_id} with status={normalized} to storage.")
+
+    def add_many(self, alert_ids: Iterable[str], status: str = "active") -> None:
+        ids = list(dict.fromkeys(str(aid) for aid in alert_ids))
+        status = _normalize_status(status)
+        with self._lock:
+            stored = {row[0] for row in self._select_in("id", ids)}
+            new = [aid for aid in ids if aid not in stored and aid not in self._pending]
+            self._pending.update((aid, status) for aid in new)
+        count = len(new)
+        if count:
+            logger.info(f"Added {count} new alert IDs to storage with status={status}.")
+
+    def touch_many(self, alert_ids: Iterable[str], now: Optional[float] = None) -> None:
+        """Refresh the last-seen time of known IDs that are still present in the feed."""
+        now = now if now is not None else time.time()
+        # An expired row is gone, not refreshed
+        self.evict_expired(now)
+        with self._lock:
+            for aid in alert_ids:
+                self._touched[aid] = now
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Delete rows whose last-seen time is older than ``retention``."""
+        if self.retention is None:
+            return 0
+        cutoff = (now if now is not None else time.time()) - self.retention.total_seconds()
+        with self._lock:
+            try:
+                evicted = self._conn.execute(
+                    "DELETE FROM alerts WHERE updated_at < ?", (cutoff,)
+                ).rowcount
+            except sqlite3.Error as e:
+                logger.exception(f"Failed to evict expired IDs from {self.db_path}: {e}")
+                return 0
+        if evicted:
+            logger.info(f"Evicted {evicted} alert IDs not seen within {self.retention}.")
+        return evicted
+
+    def update_status(self, alert_id: str, status: str) -> None:
+        if status not in {"active", "cancelled"}:
+            logger.warning("Unsupported status '%s' ignored.", status)
+            return
+        current = self.get_status(alert_id)
+        if current is not None and current != status:
+            with self._lock:
+                self._pending[alert_id] = status
+            logger.info("Updated alert %s to status=%s", alert_id, status)
+
+    def fingerprints(self, alert_ids: Iterable[str]) -> Dict[str, tuple[str, Optional[str]]]:
+        """``{id: (status, fingerprint)}`` for the known IDs among ``alert_ids``.
+
+        Looks the IDs up in batched ``IN`` queries instead of one query per ID.
+        """
+        ids = list(dict.fromkeys(alert_ids))
+        found: Dict[str, tuple[str, Optional[str]]] = {}
+        with self._lock:
+            rows = self._select_in("id, status, fingerprint", ids)
+            found.update((aid, (status, fp)) for aid, status, fp in rows)
+            for aid in ids:
+                status = self._pending.get(aid)
+                pending_fp = self._details.get(aid, {}).get("fingerprint")
+                if status is None and pending_fp is None:
+                    continue
+                old_status, old_fp = found.get(aid, ("active", None))
+                found[aid] = (status or old_status, pending_fp or old_fp)
+        return found
+
+    def get_record(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        """Status and details of ``alert_id``, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, updated_at, fingerprint, message FROM alerts WHERE id = ?",
+                (alert_id,),
+            ).fetchone()
+            status = self._pending.get(alert_id)
+            pending_details = dict(self._details.get(alert_id, {}))
+        if row is None:
+            if status is None:
+                return None
+            rec: Dict[str, Any] = {"status": status}
+        else:
+            rec = {"status": status or row[0], "last_seen": row[1]}
+            try:
+                message = json.loads(row[3]) if row[3] else None
+            except json.JSONDecodeError:
+                message = None
+            rec.update(_details({"fingerprint": row[2], "message": message}))
+        rec.update(pending_details)
+        return rec
+
+    def update_details(
+        self, alert_id: str, *, fingerprint: Optional[str] = None, message: Optional[list] = None
+    ) -> None:
+        """Store the notified fingerprint and/or message slot of a known ID (None keeps)."""
+        changes = _details({"fingerprint": fingerprint, "message": message})
+        if changes and self.has(alert_id):
+            with self._lock:
+                self._details.setdefault(alert_id, {}).update(changes)
+
+
+STORAGE_BACKENDS = {"json": JsonStorage, "journal": JournalStorage, "sqlite": SqliteStorage}
+# Any of the sent-ID storage backends (they share one interface)
+Storage = JsonStorage | JournalStorage | SqliteStorage
+
+
+def _retention_from_env() -> Optional[timedelta]:
+    try:
+        days = float(os.getenv("STORAGE_RETENTION_DAYS", "30"))
+    except ValueError:
+        logger.warning("Invalid STORAGE_RETENTION_DAYS; eviction disabled.")
+        return None
+    return timedelta(days=days) if days > 0 else None
+
+
+def open_storage(
+    path: Path, backend: Optional[str] = None, *, retention: Optional[timedelta] = None
+) -> Storage:
+    """Create the storage backend selected by ``backend`` or ``STORAGE_BACKEND`` (default json).
+
+    ``retention`` defaults to ``STORAGE_RETENTION_DAYS`` (30 days; ``0`` disables eviction).
+    """
+    name = (backend or os.getenv("STORAGE_BACKEND", "json")).strip().lower()
+    cls = STORAGE_BACKENDS.get(name)
+    if cls is None:
+        logger.warning("Unknown STORAGE_BACKEND '%s'; falling back to json.", name)
+        cls = JsonStorage
+    return cls(path, retention=retention if retention is not None else _retention_from_env())
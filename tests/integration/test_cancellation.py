@@ -60,7 +60,7 @@ def test_cancellation_pipeline_end_to_end():
 
             # 1) 初回: 発表
             mock_jma_instance.fetch.return_value = xml_warning
-            with patch("src.main.SENT_IDS_FILE", storage_path):
+            with patch("src.main.DATA_DIR", storage_path.parent):
                 sent = pipeline_once("http://dummy")
                 assert sent == 1
                 assert mock_discord_instance.send_alerts.call_count == 1
@@ -69,7 +69,7 @@ def test_cancellation_pipeline_end_to_end():
             mock_discord_instance.send_alerts.reset_mock()
             mock_discord_instance.send_cancellations.reset_mock()
             mock_jma_instance.fetch.return_value = xml_cancel
-            with patch("src.main.SENT_IDS_FILE", storage_path):
+            with patch("src.main.DATA_DIR", storage_path.parent):
                 sent_cancel = pipeline_once("http://dummy", force_send=True)
                 assert sent_cancel == 1
                 mock_discord_instance.send_alerts.assert_not_called()
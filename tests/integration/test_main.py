@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import tempfile
 import unittest
+from datetime import timedelta
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from src.main import pipeline_once
+from src.main import Pipeline, pipeline_once
 from src.models import Alert
 
 
@@ -49,7 +50,7 @@ class TestMainIntegration(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             # Setup a temporary storage file
             storage_path = Path(tmpdir) / "sent_ids.json"
-            with patch("src.main.SENT_IDS_FILE", storage_path):
+            with patch("src.main.DATA_DIR", storage_path.parent):
                 # --- First run: New alerts should be sent ---
                 sent_count = pipeline_once("http://dummy.url/test.xml")
 
@@ -75,3 +76,317 @@ class TestMainIntegration(unittest.TestCase):
                 # Assert that no new alerts were sent
                 self.assertEqual(sent_count_again, 0)
                 mock_notifier_instance.send_alerts.assert_not_called()
+
+    @patch("src.main.GuidanceController")
+    @patch("src.main.parse_jma_xml_cached")
+    @patch("src.main.DiscordNotifier")
+    @patch("src.main.JmaClient")
+    def test_pipeline_once_not_modified_short_circuits(
+        self,
+        mock_jma_client: MagicMock,
+        mock_discord_notifier: MagicMock,
+        mock_parse: MagicMock,
+        mock_guidance: MagicMock,
+    ):
+        """A 304 from the feed skips parsing, storage and notifications."""
+        mock_jma_client.return_value.fetch.return_value = None
+        mock_guidance.return_value.should_send.return_value = False
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage_path = Path(tmpdir) / "sent_ids.json"
+            with patch("src.main.DATA_DIR", storage_path.parent):
+                self.assertEqual(pipeline_once("http://dummy.url/test.xml"), 0)
+            self.assertFalse(storage_path.exists())
+
+        mock_parse.assert_not_called()
+        mock_discord_notifier.assert_not_called()
+
+    @patch("src.main.DiscordNotifier")
+    @patch("src.main.JmaClient")
+    def test_pipeline_once_crawls_feed_and_skips_seen_entries(
+        self, mock_jma_client: MagicMock, mock_discord_notifier: MagicMock
+    ):
+        """Atom feed entries are fetched once; unchanged entries are not fetched again."""
+        link = "https://www.data.jma.go.jp/developer/xml/data/20240101120000_0_VPWW53_130000.xml"
+        feed = f"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <title>気象特別警報・警報・注意報</title>
+    <id>{link}</id>
+    <updated>2024-01-01T12:00:00Z</updated>
+    <link type="application/xml" href="{link}"/>
+  </entry>
+</feed>""".encode("utf-8")
+        report = """<?xml version="1.0" encoding="UTF-8"?>
+<Report>
+    <Head><Title>気象警報・注意報</Title><ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime></Head>
+    <Body><Warning><Item>
+        <Area><Name>東京都千代田区</Name></Area>
+        <Kind><Name>大雨警報</Name><Status>警報</Status></Kind>
+    </Item></Warning></Body>
+</Report>""".encode("utf-8")
+        mock_fetch = mock_jma_client.return_value.fetch
+        mock_fetch.side_effect = lambda path="", **kwargs: report if path == link else feed
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("src.main.DATA_DIR", Path(tmpdir)):
+                self.assertEqual(pipeline_once("http://dummy.url/feed.xml"), 1)
+                self.assertEqual(mock_fetch.call_count, 2)
+
+                mock_fetch.reset_mock()
+                self.assertEqual(pipeline_once("http://dummy.url/feed.xml"), 0)
+                # Only the feed itself is fetched on the second run
+                self.assertEqual(mock_fetch.call_count, 1)
+
+    @patch("src.main.DiscordNotifier")
+    @patch("src.main.JmaClient")
+    def test_pipeline_once_discards_validators_when_an_entry_fetch_fails(
+        self, mock_jma_client: MagicMock, mock_discord_notifier: MagicMock
+    ):
+        """A failed entry download keeps the feed validators unsaved and the entry unseen."""
+        base = "https://www.data.jma.go.jp/developer/xml/data/"
+        good = f"{base}20240101120000_0_VPWW53_130000.xml"
+        bad = f"{base}20240101121000_0_VPWW53_130000.xml"
+        feed = "".join(
+            f"""<entry><title>気象特別警報・警報・注意報</title><id>{link}</id>
+<updated>2024-01-01T12:00:00Z</updated><link type="application/xml" href="{link}"/></entry>"""
+            for link in (good, bad)
+        )
+        feed = f'<feed xmlns="http://www.w3.org/2005/Atom">{feed}</feed>'.encode("utf-8")
+        report = """<Report><Head><Title>気象警報・注意報</Title>
+<ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime></Head>
+<Body><Warning><Item><Area><Name>東京都千代田区</Name></Area>
+<Kind><Name>大雨警報</Name><Status>警報</Status></Kind></Item></Warning></Body></Report>""".encode(
+            "utf-8"
+        )
+
+        def fetch(path: str = "", **kwargs: object) -> bytes:
+            if path == bad:
+                raise ConnectionError("reset by peer")
+            return report if path == good else feed
+
+        client = mock_jma_client.return_value
+        client.fetch.side_effect = fetch
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("src.main.DATA_DIR", Path(tmpdir)):
+                self.assertEqual(pipeline_once("http://dummy.url/feed.xml"), 1)
+                client.discard_validators.assert_called_once()
+                client.commit_validators.assert_not_called()
+
+                # Only the failed entry is fetched again on the next run
+                client.fetch.reset_mock()
+                client.discard_validators.reset_mock()
+                self.assertEqual(pipeline_once("http://dummy.url/feed.xml"), 0)
+                fetched = [c.args[0] for c in client.fetch.call_args_list if c.args]
+                self.assertEqual(fetched, [bad])
+                client.discard_validators.assert_called_once()
+
+    @patch("src.main.DiscordNotifier")
+    @patch("src.main.JmaClient")
+    def test_pipeline_reuses_context_across_ticks(
+        self, mock_jma_client: MagicMock, mock_discord_notifier: MagicMock
+    ):
+        """Clients, notifier and storage are built once per Pipeline, not once per tick."""
+        xml = """<Report><Head><Title>気象警報・注意報</Title>
+<ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime></Head>
+<Body><Warning><Item><Area><Name>東京都千代田区</Name></Area>
+<Kind><Name>大雨警報</Name><Status>警報</Status></Kind></Item></Warning></Body></Report>""".encode(
+            "utf-8"
+        )
+        mock_jma_client.return_value.fetch.return_value = xml
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("src.main.DATA_DIR", Path(tmpdir)), patch(
+                "src.main.decide_school_guidance", side_effect=RuntimeError("skip")
+            ):
+                pipeline = Pipeline("http://dummy.url/test.xml")
+                self.assertEqual(pipeline.run_once(), 1)
+                # Signals for the adaptive polling interval
+                self.assertTrue(pipeline.feed_changed)
+                self.assertTrue(pipeline.has_active_alerts)
+                storage = pipeline.storage
+                self.assertEqual(pipeline.run_once(), 0)
+                self.assertIs(pipeline.storage, storage)
+                pipeline.close()
+
+        mock_jma_client.assert_called_once()
+        mock_discord_notifier.assert_called_once()
+        mock_discord_notifier.return_value.send_alerts.assert_called_once()
+        mock_jma_client.return_value.close.assert_called_once()
+
+    @patch("src.main.DiscordNotifier")
+    @patch("src.main.JmaClient")
+    def test_pipeline_coalesces_updates_within_window(
+        self, mock_jma_client: MagicMock, mock_discord_notifier: MagicMock
+    ):
+        """With a coalescing window an advisory upgraded to a warning is posted once."""
+
+        def report(kind: str, level: str, issued: str) -> bytes:
+            return f"""<Report><Head><Title>気象警報・注意報</Title>
+<ReportDateTime>{issued}</ReportDateTime></Head>
+<Body><Warning><Item><Area><Name>東京都千代田区</Name></Area>
+<Kind><Name>{kind}</Name><Status>{level}</Status></Kind></Item></Warning></Body></Report>""".encode(
+                "utf-8"
+            )
+
+        mock_fetch = mock_jma_client.return_value.fetch
+        send_alerts = mock_discord_notifier.return_value.send_alerts
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("src.main.DATA_DIR", Path(tmpdir)), patch(
+                "src.main.decide_school_guidance", side_effect=RuntimeError("skip")
+            ), patch("src.main.ALERT_COALESCE_WINDOW", timedelta(hours=1)):
+                pipeline = Pipeline("http://dummy.url/test.xml")
+                mock_fetch.return_value = report("大雨注意報", "注意報", "2024-01-01T12:00:00Z")
+                self.assertEqual(pipeline.run_once(), 0)
+                mock_fetch.return_value = report("大雨警報", "警報", "2024-01-01T12:03:00Z")
+                self.assertEqual(pipeline.run_once(), 0)
+                self.assertEqual(pipeline.release_due(), 0)
+                send_alerts.assert_not_called()
+
+                # Shutdown sends what is still held
+                pipeline.close()
+
+        send_alerts.assert_called_once()
+        sent = send_alerts.call_args[0][0]
+        self.assertEqual([a.severity for a in sent], ["警報"])
+
+    @patch("src.main.DiscordNotifier")
+    @patch("src.main.JmaClient")
+    def test_changed_severity_edits_stored_message(
+        self, mock_jma_client: MagicMock, mock_discord_notifier: MagicMock
+    ):
+        """A later bulletin with another severity is sent as an update of the stored message."""
+        from src.models import MessageSlot
+
+        def report(level: str) -> bytes:
+            return f"""<Report><Head><Title>気象警報・注意報</Title>
+<ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime></Head>
+<Body><Warning><Item><Area><Name>東京都千代田区</Name></Area>
+<Kind><Name>大雨</Name><Status>{level}</Status></Kind></Item></Warning></Body></Report>""".encode(
+                "utf-8"
+            )
+
+        mock_fetch = mock_jma_client.return_value.fetch
+        notifier = mock_discord_notifier.return_value
+        slot = MessageSlot(message_id=42, index=0, span=1, members=1)
+        notifier.send_alerts.side_effect = lambda alerts: {a.id: slot for a in alerts}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("src.main.DATA_DIR", Path(tmpdir)), patch(
+                "src.main.decide_school_guidance", side_effect=RuntimeError("skip")
+            ):
+                pipeline = Pipeline("http://dummy.url/test.xml")
+                mock_fetch.return_value = report("注意報")
+                self.assertEqual(pipeline.run_once(), 1)
+                mock_fetch.return_value = report("継続")
+                self.assertEqual(pipeline.run_once(), 0)
+                mock_fetch.return_value = report("警報")
+                self.assertEqual(pipeline.run_once(), 1)
+                pipeline.close()
+
+        notifier.send_alerts.assert_called_once()
+        updates, messages = notifier.send_updates.call_args[0]
+        self.assertEqual([a.severity for a in updates], ["警報"])
+        self.assertEqual(messages, {updates[0].id: slot})
+
+    @patch("src.main.GuidanceController")
+    @patch("src.main.DiscordNotifier")
+    @patch("src.main.JmaClient")
+    def test_guidance_uses_last_tokyo_bulletin_on_not_modified_ticks(
+        self, mock_jma_client: MagicMock, mock_discord_notifier: MagicMock, mock_guidance: MagicMock
+    ):
+        """Decision-point guidance goes out on 304 ticks, based on the persisted Tokyo alerts."""
+        xml = """<Report><Head><Title>気象警報・注意報</Title>
+<ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime></Head>
+<Body><Warning><Item><Area><Name>東京都千代田区</Name></Area>
+<Kind><Name>大雨警報</Name><Status>発表</Status></Kind></Item></Warning></Body></Report>""".encode(
+            "utf-8"
+        )
+        mock_fetch = mock_jma_client.return_value.fetch
+        should_send = mock_guidance.return_value.should_send
+        should_send.return_value = False
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("src.main.DATA_DIR", Path(tmpdir)):
+                mock_fetch.return_value = xml
+                pipeline_once("http://dummy.url/test.xml")
+
+                # A later process start on a quiet morning: the feed is not modified
+                mock_fetch.return_value = None
+                should_send.reset_mock()
+                should_send.return_value = True
+                pipeline = Pipeline("http://dummy.url/test.xml")
+                self.assertEqual(pipeline.run_once(), 0)
+                self.assertTrue(pipeline.has_active_alerts)
+                pipeline.close()
+
+        self.assertTrue(should_send.call_args.kwargs["has_target"])
+        mock_discord_notifier.return_value.send_school_guidance.assert_called_once()
+
+    @patch("src.main.DiscordNotifier")
+    @patch("src.main.JmaClient")
+    def test_guidance_ignores_ticks_with_only_other_regions_alerts(
+        self, mock_jma_client: MagicMock, mock_discord_notifier: MagicMock
+    ):
+        """A bulletin for another region does not clear the Tokyo alerts guidance is based on."""
+        from src.regions import TOKYO_23_REGION, Region, RegionIndex
+
+        def bulletin(area: str) -> bytes:
+            return f"""<Report><Head><Title>気象警報・注意報</Title>
+<ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime></Head>
+<Body><Warning><Item><Area><Name>東京都{area}</Name></Area>
+<Kind><Name>大雨警報</Name><Status>発表</Status></Kind></Item></Warning></Body></Report>""".encode(
+                "utf-8"
+            )
+
+        index = RegionIndex([TOKYO_23_REGION, Region(name="west", areas={"13201": "八王子市"})])
+        mock_fetch = mock_jma_client.return_value.fetch
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("src.main.DATA_DIR", Path(tmpdir)), patch(
+                "src.main.decide_school_guidance", side_effect=RuntimeError("skip")
+            ) as mock_decide:
+                pipeline = Pipeline("http://dummy.url/test.xml", region_index=index)
+                mock_fetch.return_value = bulletin("千代田区")
+                self.assertEqual(pipeline.run_once(), 1)
+                mock_fetch.return_value = bulletin("八王子市")
+                self.assertEqual(pipeline.run_once(), 1)
+                self.assertTrue(pipeline.has_active_alerts)
+                pipeline.close()
+
+        self.assertEqual([a.ward for a in mock_decide.call_args.args[0]], ["千代田区"])
+
+    @patch("src.main.DiscordNotifier")
+    @patch("src.main.JmaClient")
+    def test_warning_reissued_after_cancellation_is_sent_once_again(
+        self, mock_jma_client: MagicMock, mock_discord_notifier: MagicMock
+    ):
+        """Issued, cancelled, then issued again: the new issue goes out once."""
+
+        def bulletin(status: str) -> bytes:
+            return f"""<Report><Head><Title>気象警報・注意報</Title>
+<ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime></Head>
+<Body><Warning><Item><Area><Name>東京都千代田区</Name></Area>
+<Kind><Name>大雨警報</Name><Status>{status}</Status></Kind></Item></Warning></Body></Report>""".encode(
+                "utf-8"
+            )
+
+        mock_fetch = mock_jma_client.return_value.fetch
+        notifier = mock_discord_notifier.return_value
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("src.main.DATA_DIR", Path(tmpdir)), patch(
+                "src.main.decide_school_guidance", side_effect=RuntimeError("skip")
+            ):
+                pipeline = Pipeline("http://dummy.url/test.xml")
+                for status in ("発表", "解除", "発表", "発表"):
+                    mock_fetch.return_value = bulletin(status)
+                    pipeline.run_once()
+                alert_id = notifier.send_alerts.call_args.args[0][0].id
+                self.assertEqual(pipeline.storage.get_status(alert_id), "active")
+                pipeline.close()
+
+        self.assertEqual(notifier.send_alerts.call_count, 2)
+        notifier.send_cancellations.assert_called_once()
@@ -2,10 +2,18 @@ from __future__ import annotations
 
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from src.main import pipeline_once
 from src.models import SchoolGuidance
 
 
+@pytest.fixture(autouse=True)
+def _tmp_data_dir(monkeypatch, tmp_path):
+    """Keep sent IDs and guidance state out of the working tree's data/ directory."""
+    monkeypatch.setattr("src.main.DATA_DIR", tmp_path)
+
+
 def test_pipeline_sends_school_guidance():
     # 最小のXML（東京23区に関係する1件）
     xml = '''<?xml version="1.0" encoding="UTF-8"?>
@@ -134,8 +142,6 @@ def test_integration_same_day_suppression(monkeypatch, tmp_path):
     from unittest.mock import patch, MagicMock
 
     monkeypatch.setenv("ROLE_ID", "123456789012345678")
-    # ensure guidance state uses temp dir
-    monkeypatch.setenv("DATA_DIR", str(tmp_path))
 
     with patch("src.main.JmaClient") as mock_jma, \
          patch("src.main.DiscordNotifier") as mock_discord, \
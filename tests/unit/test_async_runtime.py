@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+from aiohttp import web
+
+from src.async_runtime import AsyncJmaClient, AsyncPipeline
+from src.models import Alert, MessageSlot
+
+SAMPLE = Path(__file__).resolve().parents[2] / "samples" / "tokyo-warning-sample.xml"
+
+
+def test_async_jma_client_conditional_get_and_retry(tmp_path: Path):
+    calls: list[dict] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        calls.append(dict(request.headers))
+        if len(calls) == 1:
+            return web.Response(status=503)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(body=b"<feed/>", headers={"ETag": '"v1"'})
+
+    async def scenario() -> None:
+        app = web.Application()
+        app.router.add_get("/feed.xml", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        try:
+            async with aiohttp.ClientSession() as session:
+                client = AsyncJmaClient(
+                    f"http://127.0.0.1:{port}/feed.xml",
+                    session=session,
+                    validators_path=tmp_path / "validators.json",
+                )
+                with patch("src.async_runtime.HTTP_BACKOFF_FACTOR", 0):
+                    assert await client.fetch() == b"<feed/>"
+                client.commit_validators()
+                assert await client.fetch() is None
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+    assert len(calls) == 3
+    assert calls[2]["If-None-Match"] == '"v1"'
+
+
+def test_async_pipeline_polls_while_sends_are_pending(tmp_path: Path):
+    release = asyncio.Event()
+    sent: list[list[str]] = []
+
+    async def slow_send(self, alerts):  # type: ignore[no-untyped-def]
+        await release.wait()
+        sent.append([a.ward for a in alerts])
+
+    async def scenario() -> None:
+        async with aiohttp.ClientSession() as session:
+            with patch("src.main.DATA_DIR", tmp_path), patch(
+                "src.async_runtime.decide_school_guidance", side_effect=RuntimeError("skip")
+            ):
+                pipeline = AsyncPipeline(str(SAMPLE), session=session)
+            with patch(
+                "src.discord_client.AsyncDiscordNotifier.send_alerts_async", slow_send
+            ):
+                assert await pipeline.poll_once() == 2
+                # The send is still pending: polling continues without queueing duplicates
+                assert await pipeline.poll_once() == 0
+                assert sent == []
+                release.set()
+                await pipeline.drain()
+                assert sent == [["千代田区", "新宿区"]]
+                # Recorded after the send: nothing new on the next poll
+                assert await pipeline.poll_once() == 0
+                await pipeline.aclose()
+
+    asyncio.run(scenario())
+    assert (tmp_path / "sent_ids.json").exists()
+
+
+def test_async_pipeline_defers_cancellation_of_alert_in_flight(tmp_path: Path):
+    release = asyncio.Event()
+    posted = Alert(
+        id="abc",
+        title="大雨警報",
+        area="東京都千代田区",
+        ward="千代田区",
+        category="大雨警報",
+        severity="発表",
+        issued_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        expires_at=None,
+        link=None,
+    )
+    cancel = replace(posted, severity="解除", status="cancelled")
+    cancelled: list[dict] = []
+
+    async def slow_send(self, alerts):  # type: ignore[no-untyped-def]
+        await release.wait()
+        return {a.id: MessageSlot(42, index=i, span=1, members=1) for i, a in enumerate(alerts)}
+
+    async def send_cancellations(self, alerts, messages=None):  # type: ignore[no-untyped-def]
+        cancelled.append(dict(messages or {}))
+        return {}
+
+    async def scenario() -> None:
+        async with aiohttp.ClientSession() as session:
+            with patch("src.main.DATA_DIR", tmp_path):
+                pipeline = AsyncPipeline("http://dummy.url/feed.xml", session=session)
+            fetch = AsyncMock(side_effect=[([posted], None, []), ([cancel], None, [])])
+            with patch.object(pipeline, "_fetch_alerts", fetch), patch.object(
+                pipeline, "_queue_guidance", AsyncMock(return_value=[])
+            ), patch(
+                "src.discord_client.AsyncDiscordNotifier.send_alerts_async", slow_send
+            ), patch(
+                "src.discord_client.AsyncDiscordNotifier.send_cancellations_async",
+                send_cancellations,
+            ):
+                assert await pipeline.poll_once() == 1
+                # The post is still pending: the cancellation waits instead of being dropped
+                assert await pipeline.poll_once() == 0
+                assert cancelled == []
+                release.set()
+                await pipeline.drain()
+                await pipeline.aclose()
+
+    asyncio.run(scenario())
+    # Planned after the post was recorded, so it edits the message just posted
+    assert [list(m) for m in cancelled] == [["abc"]]
+    assert cancelled[0]["abc"].message_id == 42
+
+
+def test_async_pipeline_coalesces_alerts_within_window(tmp_path: Path):
+    advisory = Alert(
+        id="adv",
+        title="気象警報・注意報",
+        area="東京都千代田区",
+        ward="千代田区",
+        category="大雨注意報",
+        severity="発表",
+        issued_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        expires_at=None,
+        link=None,
+    )
+    warning = replace(
+        advisory,
+        id="warn",
+        category="大雨警報",
+        issued_at=datetime(2024, 1, 1, 0, 5, tzinfo=timezone.utc),
+    )
+    sent: list[list[str]] = []
+
+    async def send(self, alerts):  # type: ignore[no-untyped-def]
+        sent.append([a.category for a in alerts])
+        return {}
+
+    async def scenario() -> None:
+        async with aiohttp.ClientSession() as session:
+            with patch("src.main.DATA_DIR", tmp_path), patch(
+                "src.main.ALERT_COALESCE_WINDOW", timedelta(minutes=1)
+            ):
+                pipeline = AsyncPipeline("http://dummy.url/feed.xml", session=session)
+            fetch = AsyncMock(side_effect=[([advisory], None, []), ([warning], None, [])])
+            with patch.object(pipeline, "_fetch_alerts", fetch), patch.object(
+                pipeline, "_queue_guidance", AsyncMock(return_value=[])
+            ), patch("src.discord_client.AsyncDiscordNotifier.send_alerts_async", send):
+                assert await pipeline.poll_once() == 0
+                assert await pipeline.poll_once() == 0
+                # Window not elapsed yet: nothing is queued
+                assert await pipeline.release_due() == 0
+                # Shutdown sends the latest state once
+                await pipeline.aclose()
+
+    asyncio.run(scenario())
+    assert sent == [["大雨警報"]]
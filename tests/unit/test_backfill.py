@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import io
+import tarfile
+from pathlib import Path
+
+from src.backfill import backfill, iter_documents, parse_documents
+
+
+def _report(issued: str, status: str, info_type: str = "発表") -> bytes:
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<Report>
+  <Head><Title>気象警報・注意報</Title><ReportDateTime>{issued}</ReportDateTime>
+    <InfoType>{info_type}</InfoType></Head>
+  <Body><Warning>
+    <Item><Area><Name>東京都千代田区</Name></Area>
+      <Kind><Name>大雨警報</Name><Status>{status}</Status></Kind></Item>
+    <Item><Area><Name>東京都八王子市</Name></Area>
+      <Kind><Name>大雨警報</Name><Status>{status}</Status></Kind></Item>
+  </Warning></Body>
+</Report>""".encode("utf-8")
+
+
+DOCS = {
+    # File names sort in a different order than the issue times
+    "a_cancel.xml": _report("2024-01-01T06:00:00Z", "解除"),
+    "b_issue.xml": _report("2024-01-01T03:00:00Z", "発表"),
+    "c_repeat.xml": _report("2024-01-01T04:00:00Z", "継続"),
+}
+
+
+def _write_dir(root: Path) -> Path:
+    src = root / "archive"
+    (src / "sub").mkdir(parents=True)
+    for i, (name, data) in enumerate(DOCS.items()):
+        (src / ("sub" if i else "") / name).write_bytes(data)
+    (src / "notes.txt").write_text("ignored", encoding="utf-8")
+    return src
+
+
+def test_parse_documents_orders_by_issue_time(tmp_path: Path):
+    count, alerts = parse_documents(
+        iter_documents(_write_dir(tmp_path)), max_workers=2, chunk_size=1
+    )
+    assert count == 3
+    # Only the 23-ward alert of each document is kept
+    assert [a.severity for a in alerts] == ["発表", "継続", "解除"]
+    assert all(a.ward == "千代田区" for a in alerts)
+
+
+def test_backfill_replays_dedup_and_cancellation(tmp_path: Path):
+    result = backfill(_write_dir(tmp_path), max_workers=2)
+    # Issue is sent, the repeat is deduplicated, the cancellation is sent
+    assert result.documents == 3
+    assert result.sent == 2
+
+
+def test_backfill_reads_tarball(tmp_path: Path):
+    tar_path = tmp_path / "archive.tar.gz"
+    with tarfile.open(tar_path, "w:gz") as tar:
+        for name, data in DOCS.items():
+            info = tarfile.TarInfo(f"bulletins/{name}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+    storage_path = tmp_path / "replay" / "sent_ids.json"
+    result = backfill(tar_path, max_workers=1, storage_path=storage_path)
+    assert result.documents == 3
+    assert result.sent == 2
+    assert storage_path.exists()
+
+
+def test_parse_documents_reads_archive_in_bounded_window(monkeypatch):
+    from concurrent.futures import Future
+
+    import src.backfill as backfill_module
+
+    outstanding: list[int] = []
+
+    class InlinePool:
+        """Parses on submit and counts chunks submitted but not yet merged."""
+
+        def __init__(self, max_workers=None):
+            self.pending = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def submit(self, fn, chunk):
+            pool = self
+            pool.pending += 1
+            outstanding.append(pool.pending)
+
+            class Merged(Future):
+                def result(self, timeout=None):
+                    pool.pending -= 1
+                    return super().result(timeout)
+
+            future = Merged()
+            future.set_result(fn(chunk))
+            return future
+
+    monkeypatch.setattr(backfill_module, "ProcessPoolExecutor", InlinePool)
+    docs = (
+        (f"{i:02d}.xml", _report(f"2024-01-01T{i % 24:02d}:00:00Z", "発表")) for i in range(40)
+    )
+    count, alerts = parse_documents(docs, max_workers=2, chunk_size=1)
+    assert count == 40
+    assert len(alerts) == 40
+    # Never more than CHUNKS_IN_FLIGHT_PER_WORKER chunks per worker submitted ahead
+    assert max(outstanding) == backfill_module.CHUNKS_IN_FLIGHT_PER_WORKER * 2
+
+
+def test_backfill_closes_storage_backend(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    storage_path = tmp_path / "sent_ids.sqlite3"
+    result = backfill(_write_dir(tmp_path), max_workers=1, storage_path=storage_path)
+    assert result.sent == 2
+
+    from src.storage import open_storage
+
+    reopened = open_storage(storage_path)
+    try:
+        assert [reopened.get_status(a.id) for a in result.alerts[-1:]] == ["cancelled"]
+    finally:
+        reopened.close()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from src.coalesce import CoalescingBuffer, coalesce_key
+from src.models import Alert
+
+T0 = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def make_alert(**kwargs) -> Alert:
+    defaults = {
+        "id": "chiyoda-rain-advisory",
+        "title": "大雨注意報",
+        "area": "東京都千代田区",
+        "ward": "千代田区",
+        "category": "大雨注意報",
+        "severity": "注意報",
+        "issued_at": T0,
+        "expires_at": None,
+        "link": None,
+    }
+    defaults.update(kwargs)
+    return Alert(**defaults)  # type: ignore[call-arg]
+
+
+def test_release_waits_for_window():
+    buffer = CoalescingBuffer(timedelta(seconds=60))
+    buffer.offer([make_alert()], now=T0)
+
+    assert buffer.release(now=T0 + timedelta(seconds=59)) == []
+    assert len(buffer) == 1
+    assert [a.id for a in buffer.release(now=T0 + timedelta(seconds=60))] == ["chiyoda-rain-advisory"]
+    assert len(buffer) == 0
+
+
+def test_burst_collapses_to_latest_state():
+    """An advisory upgraded to a warning within the window is sent once, as the warning."""
+    buffer = CoalescingBuffer(timedelta(seconds=60))
+    buffer.offer([make_alert()], now=T0)
+    upgraded = make_alert(
+        id="chiyoda-rain-warning",
+        title="大雨警報",
+        category="大雨警報",
+        severity="警報",
+        issued_at=T0 + timedelta(seconds=30),
+    )
+    buffer.offer([upgraded], now=T0 + timedelta(seconds=30))
+    # An out-of-order older bulletin does not replace the newer state
+    buffer.offer([make_alert(issued_at=T0 - timedelta(minutes=5))], now=T0 + timedelta(seconds=40))
+
+    # The window counts from the first update, so a steady stream cannot hold an alert forever
+    assert buffer.release(now=T0 + timedelta(seconds=60)) == [upgraded]
+
+
+def test_coalesce_key_strips_warning_level():
+    assert coalesce_key(make_alert(category="大雨特別警報")) == ("東京都千代田区", "大雨")
+    assert coalesce_key(make_alert(category="洪水警報")) == ("東京都千代田区", "洪水")
+    assert coalesce_key(make_alert(category="警報")) == ("東京都千代田区", "警報")
+
+
+def test_release_is_oldest_first_and_drain_empties():
+    buffer = CoalescingBuffer(timedelta(seconds=60))
+    first = make_alert(id="a")
+    second = make_alert(id="b", area="東京都新宿区")
+    buffer.offer([second], now=T0)
+    buffer.offer([first], now=T0 + timedelta(seconds=10))
+
+    assert buffer.release(now=T0 + timedelta(seconds=120)) == [second, first]
+
+    buffer.offer([first], now=T0)
+    assert buffer.drain() == [first]
+    assert len(buffer) == 0
+
+
+def test_zero_window_is_disabled():
+    buffer = CoalescingBuffer(timedelta(0))
+    alert = make_alert()
+    buffer.offer([alert], now=T0)
+
+    assert not buffer.enabled
+    assert buffer.release(now=T0) == [alert]
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import discord
+import requests
 from datetime import datetime, timezone
 from unittest.mock import Mock, patch
 
@@ -124,12 +125,52 @@ def test_send_via_webhook_success(mock_webhook_class):
 
     e1 = discord.Embed(title="Message 1")
     e2 = discord.Embed(title="Message 2")
-    notifier._send_via_webhook([e1, e2])
+    notifier._send_via_webhook([([], [e1, e2])])
 
-    mock_webhook_class.from_url.assert_called_once_with(webhook_url)
+    mock_webhook_class.from_url.assert_called_once_with(webhook_url, session=notifier.session)
+    # Both embeds go out in a single message; wait=True returns it for later edits
+    mock_webhook.send.assert_called_once_with(embeds=[e1, e2], wait=True)
+
+
+@patch("discord.SyncWebhook")
+def test_webhook_is_created_once_per_notifier(mock_webhook_class):
+    mock_webhook = Mock()
+    mock_webhook_class.from_url.return_value = mock_webhook
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/abc")
+
+    notifier._send_via_webhook([([], [discord.Embed(title="1")])])
+    notifier._send_via_webhook([([], [discord.Embed(title="2")])])
+
+    mock_webhook_class.from_url.assert_called_once()
     assert mock_webhook.send.call_count == 2
-    mock_webhook.send.assert_any_call(embed=e1)
-    mock_webhook.send.assert_any_call(embed=e2)
+
+
+def test_batch_embeds_respects_count_and_size_limits():
+    from src.discord_client import batch_embeds
+
+    small = [discord.Embed(title=f"t{i}") for i in range(23)]
+    assert [len(b) for b in batch_embeds(small)] == [10, 10, 3]
+
+    # 2500 characters each: only two fit within the 6000-character message limit
+    big = [discord.Embed(title="x", description="y" * 2499) for _ in range(5)]
+    batches = batch_embeds(big)
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert [e for b in batches for e in b] == big
+
+
+@patch("discord.SyncWebhook")
+def test_send_cancellations_batches_embeds(mock_webhook_class):
+    mock_webhook = Mock()
+    mock_webhook_class.from_url.return_value = mock_webhook
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/abc")
+
+    alerts = [
+        make_alert(title=f"警報{i}", category=f"警報{i}", ward="千代田区", status="cancelled")
+        for i in range(12)
+    ]
+    notifier.send_cancellations(alerts)
+
+    assert [len(c.kwargs["embeds"]) for c in mock_webhook.send.call_args_list] == [10, 2]
 
 
 def test_send_via_webhook_no_url():
@@ -137,7 +178,7 @@ def test_send_via_webhook_no_url():
     notifier = DiscordNotifier()
 
     with pytest.raises(RuntimeError, match="DISCORD_WEBHOOK_URL is not set"):
-        notifier._send_via_webhook([discord.Embed(title="test")])
+        notifier._send_via_webhook([([], [discord.Embed(title="test")])])
 
 
 @patch("discord.SyncWebhook")
@@ -168,11 +209,66 @@ def test_send_alerts_with_webhook(mock_webhook_class):
 
     notifier.send_alerts(alerts)
 
-    mock_webhook_class.from_url.assert_called_once_with(webhook_url)
-    assert mock_webhook.send.call_count == 2
-    # Ensure embeds were sent
-    for call in mock_webhook.send.call_args_list:
-        assert isinstance(call.kwargs.get("embed"), discord.Embed)
+    mock_webhook_class.from_url.assert_called_once_with(webhook_url, session=notifier.session)
+    mock_webhook.send.assert_called_once()
+    # Same category/severity/issue time: one digest embed listing both wards
+    embeds = mock_webhook.send.call_args.kwargs["embeds"]
+    assert len(embeds) == 1
+    assert isinstance(embeds[0], discord.Embed)
+    assert embeds[0].fields[0].value == "千代田区、新宿区"
+
+
+def test_digest_groups_by_category_severity_and_issue_time():
+    notifier = DiscordNotifier()
+    later = datetime(2024, 1, 1, 13, 0, 0, tzinfo=timezone.utc)
+    alerts = [
+        make_alert(ward="千代田区"),
+        make_alert(ward="港区", category="洪水警報"),
+        make_alert(ward="新宿区"),
+        make_alert(ward="中央区", issued_at=later),
+    ]
+
+    from src.discord_client import group_alerts
+
+    groups = group_alerts(alerts)
+    assert [[a.ward for a in g] for g in groups] == [["千代田区", "新宿区"], ["港区"], ["中央区"]]
+
+    embeds = notifier._create_digest_embeds(groups[0])
+    assert len(embeds) == 1
+    assert embeds[0].title == "気象警報"
+    assert "2地域" in (embeds[0].description or "")
+    # Single-alert groups keep the regular embed
+    single = notifier._create_digest_embeds(groups[1])[0]
+    assert single.description == notifier._create_embed_from_alert(groups[1][0]).description
+
+
+def test_digest_splits_long_area_lists_into_fields():
+    notifier = DiscordNotifier()
+    alerts = [make_alert(ward=f"非常に長い地域名の市町村{i:03d}" * 4) for i in range(60)]
+
+    embeds = notifier._create_digest_embeds(alerts)
+
+    fields = [f for e in embeds for f in e.fields]
+    assert all(len(f.value) <= 1024 for f in fields)
+    assert all(len(e.fields) <= 25 for e in embeds)
+    listed = "、".join(f.value for f in fields).split("、")
+    assert listed == [a.ward for a in alerts]
+
+
+def test_digest_embeds_stay_under_total_character_limit():
+    notifier = DiscordNotifier()
+    alerts = [
+        make_alert(ward=f"非常に長い地域名の市町村{i:03d}" * 4) for i in range(400)
+    ]
+
+    for embeds in (
+        notifier._create_digest_embeds(alerts),
+        notifier._create_cancellation_digest_embeds(alerts),
+    ):
+        assert len(embeds) > 1
+        assert all(len(e) <= 6000 for e in embeds)
+        areas = [f.value for e in embeds for f in e.fields if f.name.startswith("地域")]
+        assert "、".join(areas).split("、") == [a.ward for a in alerts]
 
 
 def test_send_alerts_no_configuration():
@@ -200,7 +296,7 @@ def test_send_alerts_prefers_webhook(mock_webhook_class):
     notifier.send_alerts(alerts)
 
     # Should use webhook, not bot token
-    mock_webhook_class.from_url.assert_called_once_with(webhook_url)
+    mock_webhook_class.from_url.assert_called_once_with(webhook_url, session=notifier.session)
     mock_webhook.send.assert_called_once()
 
 
@@ -309,3 +405,239 @@ def test_create_guidance_embed_result_line_least_until_8_for_06_wait():
     )
     e = notifier._create_guidance_embed(g)
     assert "結果: 少なくとも8時までは自宅待機" in (e.description or "")
+
+
+def _rate_limited(retry_after: str, bucket: str = "abc") -> discord.HTTPException:
+    response = Mock(
+        status=429,
+        reason="Too Many Requests",
+        headers={"X-RateLimit-Reset-After": retry_after, "X-RateLimit-Bucket": bucket},
+    )
+    return discord.HTTPException(response, {"message": "You are being rate limited."})
+
+
+def test_send_queue_retries_429_after_retry_after():
+    from src.discord_client import WebhookSendQueue
+
+    now = [0.0]
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    send = Mock(side_effect=[None, _rate_limited("1.5"), None, None])
+    queue = WebhookSendQueue(sleep=fake_sleep, clock=lambda: now[0])
+    for i in range(3):
+        queue.put(embeds=[discord.Embed(title=str(i))])
+
+    assert queue.drain(send) == 3
+    assert sleeps == [1.5]
+    assert queue.depth == 0
+    # The rate-limited message is retried before the next one (order is kept)
+    titles = [c.kwargs["embeds"][0].title for c in send.call_args_list]
+    assert titles == ["0", "1", "1", "2"]
+
+
+def test_send_queue_keeps_messages_when_rate_limit_persists():
+    from src.discord_client import WebhookSendQueue
+
+    send = Mock(side_effect=_rate_limited("0.1"))
+    queue = WebhookSendQueue(max_attempts=2, sleep=lambda s: None)
+    queue.put(embed=discord.Embed(title="a"))
+    queue.put(embed=discord.Embed(title="b"))
+
+    assert queue.drain(send) == 0
+    assert send.call_count == 2
+    assert queue.depth == 2
+
+    # Delivered on the next drain
+    send.side_effect = None
+    assert queue.drain(send) == 2
+    assert queue.depth == 0
+
+
+@patch("discord.SyncWebhook")
+def test_flush_and_close_send_messages_left_queued(mock_webhook_class):
+    from src.discord_client import WebhookSendQueue
+
+    mock_webhook = Mock()
+    mock_webhook.send.side_effect = _rate_limited("0.1")
+    mock_webhook_class.from_url.return_value = mock_webhook
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/abc")
+    notifier.send_queue = WebhookSendQueue(max_attempts=1, sleep=lambda s: None)
+
+    notifier._send_via_webhook([([], [discord.Embed(title="a")])])
+    assert notifier.queue_depth == 1
+    # Still rate limited on the next tick: kept for later
+    assert notifier.flush() == 0
+    assert notifier.queue_depth == 1
+
+    mock_webhook.send.side_effect = None
+    notifier.close()
+    assert notifier.queue_depth == 0
+    assert mock_webhook.send.call_count == 3
+
+
+@patch("discord.SyncWebhook")
+def test_connection_error_drops_the_failed_dispatch_messages(mock_webhook_class):
+    from src.discord_client import WebhookSendQueue
+
+    mock_webhook = Mock()
+    mock_webhook.send.side_effect = _rate_limited("0.1")
+    mock_webhook_class.from_url.return_value = mock_webhook
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/abc")
+    notifier.send_queue = WebhookSendQueue(max_attempts=1, sleep=lambda s: None)
+    # An earlier dispatch whose alerts were recorded: its message stays queued
+    notifier._send_via_webhook([([], [discord.Embed(title="earlier")])])
+
+    mock_webhook.send.side_effect = [None, requests.ConnectionError("reset by peer")]
+    with pytest.raises(requests.ConnectionError):
+        notifier._send_via_webhook([([], [discord.Embed(title="failed")])])
+    # Only the failed dispatch's message is dropped; its alerts are retried next tick
+    assert notifier.queue_depth == 0
+
+    mock_webhook.send.side_effect = None
+    mock_webhook.send.reset_mock()
+    assert notifier.flush() == 0
+    notifier._send_via_webhook([([], [discord.Embed(title="failed")])])
+    titles = [c.kwargs["embeds"][0].title for c in mock_webhook.send.call_args_list]
+    assert titles == ["failed"]
+
+
+def test_send_queue_drops_other_http_errors():
+    from src.discord_client import WebhookSendQueue
+
+    bad = discord.HTTPException(Mock(status=400, reason="Bad Request"), "invalid embed")
+    send = Mock(side_effect=[bad, None])
+    queue = WebhookSendQueue(sleep=lambda s: None)
+    queue.put(embed=discord.Embed(title="a"))
+    queue.put(embed=discord.Embed(title="b"))
+
+    assert queue.drain(send) == 1
+    assert queue.depth == 0
+
+
+def test_rendered_embeds_are_reused_until_content_changes():
+    notifier = DiscordNotifier()
+    alert = make_alert(severity="注意報")
+
+    first = notifier._create_embed_from_alert(alert)
+    assert notifier._create_embed_from_alert(alert) is first
+
+    upgraded = notifier._create_embed_from_alert(make_alert(severity="警報"))
+    assert upgraded is not first
+    assert upgraded.colour == discord.Color.orange()
+    assert first.colour == discord.Color.gold()
+
+    cancel = make_alert(status="cancelled")
+    assert notifier._create_cancellation_embed(cancel) is notifier._create_cancellation_embed(cancel)
+
+
+def test_digest_does_not_modify_cached_embeds():
+    notifier = DiscordNotifier()
+    a = make_alert(ward="千代田区")
+    single = notifier._create_embed_from_alert(a)
+    description = single.description
+
+    notifier._create_digest_embeds([a, make_alert(ward="港区")])
+
+    assert notifier._create_embed_from_alert(a) is single
+    assert single.description == description
+    assert single.fields == []
+
+
+def test_severity_colour_lookup():
+    from src.discord_client import severity_colour
+
+    assert severity_colour(" Emergency ") == discord.Color.dark_red()
+    assert severity_colour("特別警報") == discord.Color.dark_red()
+    assert severity_colour("keihou") == discord.Color.orange()
+    assert severity_colour("") == discord.Color.light_grey()
+
+
+def _webhook_with_message_ids(mock_webhook_class) -> Mock:
+    mock_webhook = Mock()
+    ids = iter(range(1000, 2000))
+    mock_webhook.send.side_effect = lambda **kwargs: Mock(id=next(ids), embeds=kwargs["embeds"])
+    mock_webhook_class.from_url.return_value = mock_webhook
+    return mock_webhook
+
+
+@patch("discord.SyncWebhook")
+def test_send_alerts_returns_message_slots(mock_webhook_class):
+    from src.models import MessageSlot
+
+    _webhook_with_message_ids(mock_webhook_class)
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/abc")
+    rain = [make_alert(id=f"r{i}", ward=w) for i, w in enumerate(["千代田区", "港区"])]
+    wind = make_alert(id="w", category="強風注意報", severity="注意報")
+
+    slots = notifier.send_alerts(rain + [wind])
+
+    assert slots == {
+        "r0": MessageSlot(message_id=1000, index=0, span=1, members=2),
+        "r1": MessageSlot(message_id=1000, index=0, span=1, members=2),
+        "w": MessageSlot(message_id=1000, index=1, span=1, members=1),
+    }
+
+
+@patch("discord.SyncWebhook")
+def test_send_updates_edits_previous_message_in_place(mock_webhook_class):
+    mock_webhook = _webhook_with_message_ids(mock_webhook_class)
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/abc")
+    advisory = make_alert(id="r", severity="注意報")
+    wind = make_alert(id="w", category="強風注意報", severity="注意報")
+    slots = notifier.send_alerts([advisory, wind])
+    mock_webhook.fetch_message.return_value = Mock(
+        id=1000, embeds=list(mock_webhook.send.call_args.kwargs["embeds"])
+    )
+
+    warning = make_alert(id="r", severity="警報")
+    updated = notifier.send_updates([warning], slots)
+
+    mock_webhook.send.assert_called_once()  # no new post
+    mock_webhook.fetch_message.assert_called_once_with(1000)
+    edited = mock_webhook.edit_message.call_args.kwargs
+    assert edited["message_id"] == 1000
+    assert [e.colour for e in edited["embeds"]] == [discord.Color.orange(), discord.Color.gold()]
+    assert updated["r"] == slots["r"]
+
+
+@patch("discord.SyncWebhook")
+def test_send_updates_posts_when_slot_is_shared_or_message_is_gone(mock_webhook_class):
+    mock_webhook = _webhook_with_message_ids(mock_webhook_class)
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/abc")
+    chiyoda = make_alert(id="c", ward="千代田区", severity="注意報")
+    minato = make_alert(id="m", ward="港区", severity="注意報")
+    slots = notifier.send_alerts([chiyoda, minato])
+
+    # Only one of the two areas in the digest changed: editing would drop the other one
+    notifier.send_updates([make_alert(id="c", ward="千代田区", severity="警報")], slots)
+    mock_webhook.fetch_message.assert_not_called()
+    assert mock_webhook.send.call_count == 2
+
+    mock_webhook.fetch_message.side_effect = discord.NotFound(
+        Mock(status=404, reason="Not Found"), "Unknown Message"
+    )
+    updates = [make_alert(id=i, ward=w, severity="警報") for i, w in (("c", "千代田区"), ("m", "港区"))]
+    notifier.send_updates(updates, slots)
+    mock_webhook.edit_message.assert_not_called()
+    assert mock_webhook.send.call_count == 3
+
+
+@patch("discord.SyncWebhook")
+def test_cancellation_edits_alert_message_to_cancellation_embed(mock_webhook_class):
+    mock_webhook = _webhook_with_message_ids(mock_webhook_class)
+    notifier = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/123/abc")
+    slots = notifier.send_alerts([make_alert(id="r")])
+    mock_webhook.fetch_message.return_value = Mock(
+        id=1000, embeds=list(mock_webhook.send.call_args.kwargs["embeds"])
+    )
+
+    notifier.send_cancellations([make_alert(id="r", status="cancelled")], slots)
+
+    mock_webhook.send.assert_called_once()
+    (embed,) = mock_webhook.edit_message.call_args.kwargs["embeds"]
+    assert embed.title == "【解除】気象警報・注意報"
+    assert embed.colour == discord.Color.green()
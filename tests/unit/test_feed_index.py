@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.feed_index import SeenEntryIndex
+from src.jma_feed import FeedEntry
+
+
+def make_entry(entry_id: str, minute: int = 0) -> FeedEntry:
+    return FeedEntry(
+        id=entry_id,
+        title="気象特別警報・警報・注意報",
+        updated=datetime(2024, 1, 1, 3, minute, tzinfo=timezone.utc),
+        link=entry_id,
+    )
+
+
+def test_seen_entries_are_filtered_after_flush(tmp_path: Path):
+    path = tmp_path / "seen_entries.json"
+    a, b = make_entry("a"), make_entry("b")
+
+    index = SeenEntryIndex(path)
+    assert index.filter_new([a, b]) == [a, b]
+    index.mark([a])
+    index.flush()
+
+    reloaded = SeenEntryIndex(path)
+    assert reloaded.filter_new([a, b]) == [b]
+    # Same id with a newer <updated> is processed again
+    assert reloaded.is_new(make_entry("a", minute=5))
+
+
+def test_seen_entries_evicted_after_retention(tmp_path: Path):
+    path = tmp_path / "seen_entries.json"
+    now = datetime(2024, 1, 10, tzinfo=timezone.utc)
+    index = SeenEntryIndex(path, retention=timedelta(days=1))
+    index.mark([make_entry("old")], now=now - timedelta(days=2))
+    index.mark([make_entry("recent")], now=now)
+    index.flush(now=now)
+
+    reloaded = SeenEntryIndex(path)
+    assert len(reloaded) == 1
+    assert reloaded.is_new(make_entry("old"))
+    assert not reloaded.is_new(make_entry("recent"))
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from datetime import datetime, timezone
 
-from src.filter import pick_23_wards
+from src.filter import AhoCorasick, find_wards, pick_23_wards
 from src.models import Alert
 
 
@@ -25,3 +26,29 @@ def test_pick_23_wards_matches():
     out = pick_23_wards(alerts)
     assert len(out) == 1
     assert out[0].ward == "千代田区"
+
+
+def test_pick_23_wards_accepts_generator():
+    alerts = (make_alert(area) for area in ["東京都新宿区", "東京都八王子市", "東京都北区"])
+    out = pick_23_wards(alerts)
+    assert [a.ward for a in out] == ["新宿区", "北区"]
+
+
+def test_find_wards_returns_all_matches_in_order():
+    assert find_wards("東京都江戸川区・葛飾区・江戸川区") == ["江戸川区", "葛飾区"]
+    assert find_wards("神奈川県横浜市") == []
+
+
+def test_aho_corasick_overlapping_patterns():
+    ac = AhoCorasick(["he", "she", "his", "hers"])
+    assert list(ac.iter_matches("ushers")) == ["she", "he", "hers"]
+
+
+def test_pick_23_wards_uses_area_code():
+    alerts = [
+        replace(make_alert("北区"), area_code="2310200"),  # 名古屋市北区
+        replace(make_alert("北区"), area_code="1311700"),  # 東京都北区
+        replace(make_alert("不明"), area_code="1310100"),
+    ]
+    out = pick_23_wards(alerts)
+    assert [a.ward for a in out] == ["北区", "千代田区"]
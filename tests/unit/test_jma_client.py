@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from src.jma_client import JmaClient
+
+
+def _response(status: int, content: bytes = b"", headers: dict | None = None) -> MagicMock:
+    resp = MagicMock()
+    resp.status_code = status
+    resp.content = content
+    resp.headers = headers or {}
+    return resp
+
+
+def test_fetch_sends_conditional_headers_after_commit(tmp_path: Path):
+    path = tmp_path / "validators.json"
+    url = "https://example.com/feed.xml"
+    first = _response(200, b"<feed/>", {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024"})
+
+    with patch("src.jma_client.requests.Session.get", return_value=first) as mock_get:
+        client = JmaClient(url, validators_path=path)
+        assert client.fetch() == b"<feed/>"
+        assert mock_get.call_args.kwargs["headers"] == {}
+        client.commit_validators()
+
+    with patch("src.jma_client.requests.Session.get", return_value=_response(304)) as mock_get:
+        client = JmaClient(url, validators_path=path)
+        assert client.fetch() is None
+        headers = mock_get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"abc"'
+        assert headers["If-Modified-Since"] == "Mon, 01 Jan 2024"
+
+
+def test_fetch_without_commit_does_not_persist_validators(tmp_path: Path):
+    path = tmp_path / "validators.json"
+    url = "https://example.com/feed.xml"
+    resp = _response(200, b"<feed/>", {"ETag": '"abc"'})
+
+    with patch("src.jma_client.requests.Session.get", return_value=resp) as mock_get:
+        JmaClient(url, validators_path=path).fetch()
+        JmaClient(url, validators_path=path).fetch()
+        assert mock_get.call_args.kwargs["headers"] == {}
+
+
+def test_fetch_reuses_one_session():
+    session = MagicMock()
+    session.get.return_value = _response(200, b"<feed/>")
+    client = JmaClient("https://example.com/feed.xml", session=session)
+
+    client.fetch()
+    client.fetch("https://example.com/doc.xml", conditional=False)
+
+    assert session.get.call_count == 2
+    assert session.get.call_args.args[0] == "https://example.com/doc.xml"
+
+
+def test_build_session_pools_and_retries():
+    from src.jma_client import HTTP_RETRIES, build_session
+
+    session = build_session(pool_maxsize=8)
+    adapter = session.get_adapter("https://www.data.jma.go.jp/developer/xml/feed/extra.xml")
+    assert adapter._pool_maxsize == 8
+    assert adapter.max_retries.total == HTTP_RETRIES
+    assert 503 in adapter.max_retries.status_forcelist
+    assert "gzip" in session.headers["Accept-Encoding"]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from src.jma_feed import crawl_entries, parse_atom_feed, select_warning_entries
+
+BASE = "https://www.data.jma.go.jp/developer/xml/data"
+
+FEED = f"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" lang="ja">
+  <title>高頻度（随時）</title>
+  <updated>2024-01-01T03:05:00+09:00</updated>
+  <entry>
+    <title>気象特別警報・警報・注意報</title>
+    <id>{BASE}/20240101030000_0_VPWW53_130000.xml</id>
+    <updated>2024-01-01T03:00:00Z</updated>
+    <author><name>気象庁予報部</name></author>
+    <link type="application/xml" href="{BASE}/20240101030000_0_VPWW53_130000.xml"/>
+    <content type="text">【東京都気象警報・注意報】</content>
+  </entry>
+  <entry>
+    <title>気象特別警報・警報・注意報</title>
+    <id>{BASE}/20240101030000_0_VPWW53_140000.xml</id>
+    <updated>2024-01-01T03:00:00Z</updated>
+    <author><name>横浜地方気象台</name></author>
+    <link type="application/xml" href="{BASE}/20240101030000_0_VPWW53_140000.xml"/>
+    <content type="text">【神奈川県気象警報・注意報】</content>
+  </entry>
+  <entry>
+    <title>気象概況</title>
+    <id>{BASE}/20240101030000_0_VPCW50_130000.xml</id>
+    <updated>2024-01-01T03:00:00Z</updated>
+    <author><name>気象庁予報部</name></author>
+    <link type="application/xml" href="{BASE}/20240101030000_0_VPCW50_130000.xml"/>
+    <content type="text">概況</content>
+  </entry>
+</feed>
+""".encode("utf-8")
+
+REPORT = """<?xml version="1.0" encoding="UTF-8"?>
+<Report>
+  <Head>
+    <Title>気象警報・注意報</Title>
+    <ReportDateTime>2024-01-01T03:00:00Z</ReportDateTime>
+  </Head>
+  <Body>
+    <Warning>
+      <Item>
+        <Area><Name>東京都千代田区</Name></Area>
+        <Kind><Name>大雨警報</Name><Status>発表</Status></Kind>
+      </Item>
+    </Warning>
+  </Body>
+</Report>""".encode("utf-8")
+
+
+def test_parse_atom_feed_entries():
+    entries = parse_atom_feed(FEED)
+    assert entries is not None
+    assert len(entries) == 3
+    assert entries[0].link == f"{BASE}/20240101030000_0_VPWW53_130000.xml"
+    assert entries[0].author == "気象庁予報部"
+    assert entries[0].updated is not None and entries[0].updated.tzinfo is not None
+
+
+def test_parse_atom_feed_returns_none_for_report():
+    assert parse_atom_feed(REPORT) is None
+    assert parse_atom_feed(b"not xml") is None
+
+
+def test_select_warning_entries_only_tokyo_warnings():
+    entries = parse_atom_feed(FEED) or []
+    selected = select_warning_entries(entries)
+    assert [e.link for e in selected] == [f"{BASE}/20240101030000_0_VPWW53_130000.xml"]
+
+
+def test_crawl_entries_fetches_linked_documents():
+    entries = select_warning_entries(parse_atom_feed(FEED) or [])
+    client = MagicMock()
+    client.fetch.return_value = REPORT
+
+    result = crawl_entries(client, entries, max_workers=2)
+
+    client.fetch.assert_called_once_with(entries[0].link, conditional=False)
+    assert len(result.alerts) == 1
+    assert result.alerts[0].area == "東京都千代田区"
+    assert result.fetched == entries
+
+
+def test_crawl_entries_skips_failed_fetches():
+    entries = parse_atom_feed(FEED) or []
+    client = MagicMock()
+    client.fetch.side_effect = [RuntimeError("boom"), REPORT, REPORT]
+
+    result = crawl_entries(client, entries, max_workers=1)
+
+    # Identical area/category from several documents collapses to one alert
+    assert len(result.alerts) == 1
+    assert result.failed == entries[:1]
+    assert result.fetched == entries[1:]
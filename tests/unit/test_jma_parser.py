@@ -207,3 +207,157 @@ def test_parse_jma_xml_invalid_datetime():
     # Should use current time when parsing fails
     assert alert.issued_at.tzinfo == timezone.utc
     assert alert.title == "テスト警報"
+
+
+def test_parse_jma_xml_captures_area_code():
+    xml_content = """<?xml version="1.0" encoding="UTF-8"?>
+<Report>
+    <Head>
+        <Title>気象警報・注意報</Title>
+        <ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime>
+    </Head>
+    <Body>
+        <Warning>
+            <Item>
+                <Kind><Name>大雨警報</Name><Status>発表</Status></Kind>
+                <Area><Name>北区</Name><Code>1311700</Code></Area>
+            </Item>
+        </Warning>
+    </Body>
+</Report>""".encode("utf-8")
+
+    alerts = parse_jma_xml(xml_content)
+    assert len(alerts) == 1
+    assert alerts[0].area_code == "1311700"
+
+
+def _sample_paths():
+    from pathlib import Path
+
+    return sorted((Path(__file__).resolve().parents[2] / "samples").glob("*.xml"))
+
+
+def test_iter_jma_xml_matches_tree_parser_on_samples():
+    from src.jma_parser import iter_jma_xml
+
+    for path in _sample_paths():
+        data = path.read_bytes()
+        streamed = [a.to_dict() for a in iter_jma_xml(data)]
+        assert streamed == [a.to_dict() for a in parse_jma_xml(data)], path.name
+        # File paths are accepted as well
+        assert [a.to_dict() for a in iter_jma_xml(str(path))] == streamed
+
+
+def test_iter_jma_xml_yields_before_end_of_document():
+    import lxml.etree as ET
+    import pytest
+
+    from src.jma_parser import iter_jma_xml
+
+    # The document is cut off after the first item: that alert is still delivered
+    xml = """<?xml version="1.0" encoding="UTF-8"?>
+<Report>
+  <Head><Title>気象警報・注意報</Title><ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime></Head>
+  <Body><Warning>
+    <Item><Area><Name>東京都千代田区</Name><Code>1310100</Code></Area>
+      <Kind><Name>大雨警報</Name><Status>発表</Status></Kind></Item>
+    <Item><Area><Name>東京都港区""".encode("utf-8")
+
+    it = iter_jma_xml(xml)
+    first = next(it)
+    assert first.area == "東京都千代田区"
+    assert first.area_code == "1310100"
+    assert first.title == "気象警報・注意報"
+    with pytest.raises(ET.XMLSyntaxError):
+        next(it)
+
+
+def test_iter_jma_xml_fallback_and_large_documents_stream(monkeypatch):
+    from src import jma_parser
+
+    only_head = """<?xml version="1.0" encoding="UTF-8"?>
+<Report><Head><Title>お知らせ</Title><ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime></Head>
+<Body/></Report>""".encode("utf-8")
+    alerts = list(jma_parser.iter_jma_xml(only_head))
+    assert len(alerts) == 1 and alerts[0].area == "Unknown"
+
+    items = "".join(
+        f"<Item><Area><Name>地域{i}</Name></Area><Kind><Name>大雨警報</Name></Kind></Item>"
+        for i in range(3)
+    )
+    big = (
+        "<Report><Head><Title>t</Title></Head><Body><Warning>"
+        + items
+        + "</Warning></Body></Report>"
+    ).encode("utf-8")
+    tree = jma_parser.parse_jma_xml(big)
+    monkeypatch.setattr(jma_parser, "STREAMING_THRESHOLD_BYTES", 10)
+    streamed = jma_parser.parse_jma_xml(big)
+    assert [a.area for a in streamed] == ["地域0", "地域1", "地域2"]
+    assert [a.id for a in streamed] == [a.id for a in tree]
+
+
+def test_parse_jma_xml_namespaced_bulletin():
+    from pathlib import Path
+
+    path = Path(__file__).resolve().parents[2] / "samples" / "tokyo-warning-jmx-sample.xml"
+    alerts = parse_jma_xml(path.read_bytes())
+
+    # Control/Title belongs to the jmx namespace and must not be taken as the Head title
+    assert [a.title for a in alerts] == ["東京都気象警報・注意報"] * 3
+    assert [(a.area, a.area_code, a.category, a.severity) for a in alerts] == [
+        ("千代田区", "1310100", "大雨警報", "発表"),
+        ("新宿区", "1310400", "雷注意報", "継続"),
+        ("八王子市", "1320100", "大雨注意報", "解除"),
+    ]
+    assert alerts[0].issued_at == datetime(2024, 1, 1, 3, 0, 0, tzinfo=timezone.utc)
+    assert [a.status for a in alerts] == ["active", "active", "cancelled"]
+
+
+def test_parse_jma_xml_xpath_fallback_for_nested_body():
+    # No Report root: items are found through the precompiled XPath union
+    xml = """<Envelope><Head><Title>t</Title></Head>
+<Body><Warning><Item><Area><Name>東京都港区</Name></Area><Kind><Name>大雨警報</Name></Kind></Item>
+</Warning><Other><Item><Area><Name>無視</Name></Area></Item></Other></Body></Envelope>""".encode(
+        "utf-8"
+    )
+    alerts = parse_jma_xml(xml)
+    assert [a.area for a in alerts] == ["東京都港区"]
+    assert alerts[0].title == "t"
+
+
+def test_parse_cache_hits_and_isolates_raw():
+    from unittest.mock import patch
+
+    from src import jma_parser
+
+    xml = """<Report><Head><Title>t</Title><ReportDateTime>2024-01-01T12:00:00Z</ReportDateTime>
+</Head><Body><Warning><Item><Area><Name>東京都港区</Name></Area><Kind><Name>大雨警報</Name>
+</Kind></Item></Warning></Body></Report>""".encode("utf-8")
+    cache = jma_parser.ParseCache()
+    with patch.object(jma_parser, "parse_jma_xml", wraps=jma_parser.parse_jma_xml) as parse:
+        first = cache.parse(xml)
+        first[0].raw["area"] = "mutated"
+        second = cache.parse(xml)
+    parse.assert_called_once()
+    assert second[0].raw["area"] == "東京都港区"
+    assert [a.to_dict() for a in second] == [a.to_dict() for a in first]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_parse_cache_evicts_by_entries_and_bytes():
+    from src.jma_parser import ParseCache
+
+    docs = [f"<Report><Head><Title>{i}</Title></Head></Report>".encode() for i in range(3)]
+    cache = ParseCache(max_entries=2, max_bytes=10_000)
+    for d in docs:
+        cache.parse(d)
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+    cache.parse(docs[0])  # evicted: parsed again
+    assert cache.stats()["misses"] == 4
+
+    small = ParseCache(max_entries=10, max_bytes=len(docs[0]) * 2)
+    for d in docs:
+        small.parse(d)
+    stats = small.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= len(docs[0]) * 2
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from datetime import datetime, timezone
 
+from src.main import CANCELLED, CHANGED, NEW, UNCHANGED, classify_alert
 from src.models import Alert, RoleMentionSetting
 
 
@@ -25,6 +27,51 @@ def test_alert_to_dict_roundtrip():
     assert d["issued_at"] == now.isoformat()
 
 
+def _alert(**kwargs) -> Alert:
+    defaults = dict(
+        id="abc",
+        title="気象警報・注意報",
+        area="東京都千代田区",
+        ward="千代田区",
+        category="大雨",
+        severity="注意報",
+        issued_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        expires_at=None,
+        link=None,
+    )
+    defaults.update(kwargs)
+    return Alert(**defaults)
+
+
+def test_alert_fingerprint_tracks_notified_content_only():
+    a = _alert()
+    # Issue time and source link change with every bulletin; they are not content
+    later = _alert(issued_at=datetime(2024, 1, 2, tzinfo=timezone.utc), link="https://x")
+    assert later.fingerprint == a.fingerprint
+    assert _alert(severity="警報").fingerprint != a.fingerprint
+    assert _alert(status="cancelled").fingerprint != a.fingerprint
+    # Derived fields follow dataclasses.replace
+    assert replace(a, severity="警報").fingerprint == _alert(severity="警報").fingerprint
+    assert a == replace(a)
+
+
+def test_classify_alert():
+    a = _alert()
+    assert classify_alert(a, None) == NEW
+    assert classify_alert(a, ("active", a.fingerprint)) == UNCHANGED
+    assert classify_alert(_alert(severity="警報"), ("active", a.fingerprint)) == CHANGED
+    assert classify_alert(_alert(severity="継続"), ("active", a.fingerprint)) == UNCHANGED
+    # Records from before fingerprints were stored are not re-sent
+    assert classify_alert(_alert(severity="警報"), ("active", None)) == UNCHANGED
+    cancel = _alert(status="cancelled")
+    assert classify_alert(cancel, ("active", a.fingerprint)) == CANCELLED
+    assert classify_alert(cancel, None) == CANCELLED
+    assert classify_alert(cancel, ("cancelled", None)) == UNCHANGED
+    # Re-issued after its cancellation
+    assert classify_alert(a, ("cancelled", cancel.fingerprint)) == NEW
+    assert classify_alert(_alert(severity="継続"), ("cancelled", cancel.fingerprint)) == NEW
+
+
 def test_role_mention_setting_from_env_parses_role_id(monkeypatch):
     monkeypatch.setenv("ROLE_ID", "123456789012345678")
     s = RoleMentionSetting.from_env()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from src.models import Alert
+from src.polling import AdaptiveInterval, has_active_alerts
+
+# 13:00 JST: far from the 06/08/10 decision points
+QUIET = datetime(2024, 1, 1, 4, 0, tzinfo=timezone.utc)
+SEC = timedelta(seconds=1)
+MIN = timedelta(minutes=1)
+
+
+def make_poller() -> AdaptiveInterval:
+    return AdaptiveInterval(5 * MIN, fast=30 * SEC, maximum=20 * MIN)
+
+
+def test_quiet_polls_back_off_exponentially_to_maximum():
+    poller = make_poller()
+    assert [poller.next(now=QUIET) for _ in range(3)] == [10 * MIN, 20 * MIN, 20 * MIN]
+
+
+def test_activity_polls_fast_then_backs_off_gradually():
+    poller = make_poller()
+    poller.next(now=QUIET)
+    assert poller.next(active=True, now=QUIET) == 30 * SEC
+    assert poller.next(changed=True, now=QUIET) == 30 * SEC
+    assert [poller.next(now=QUIET) for _ in range(3)] == [60 * SEC, 120 * SEC, 240 * SEC]
+
+
+def test_failures_back_off_from_base_and_reset():
+    poller = make_poller()
+    assert [poller.next(failed=True, now=QUIET) for _ in range(4)] == [
+        10 * MIN,
+        20 * MIN,
+        20 * MIN,
+        20 * MIN,
+    ]
+    assert poller.next(active=True, now=QUIET) == 30 * SEC
+    assert poller.failures == 0
+
+
+def test_decision_points_poll_fast_and_are_not_overslept():
+    poller = make_poller()
+    # 07:50 JST: inside the window before the 08:00 decision
+    assert poller.next(now=datetime(2024, 1, 1, 22, 50, tzinfo=timezone.utc)) == 30 * SEC
+    # 05:40 JST: a 20-minute quiet interval would skip past the 05:45 window start
+    poller = make_poller()
+    poller.current = 20 * MIN
+    assert poller.next(now=datetime(2024, 1, 1, 20, 40, tzinfo=timezone.utc)) == 5 * MIN
+
+
+def test_fixed_interval_when_adaptive_is_disabled(monkeypatch):
+    monkeypatch.setenv("FETCH_INTERVAL_ADAPTIVE", "false")
+    poller = AdaptiveInterval.from_env(5)
+    assert poller.next(active=True, now=QUIET) == 5 * MIN
+    assert poller.next(failed=True, now=QUIET) == 5 * MIN
+
+
+def test_has_active_alerts():
+    def alert(**kwargs) -> Alert:
+        defaults = dict(
+            id="a",
+            title="気象警報・注意報",
+            area="東京都千代田区",
+            ward="千代田区",
+            category="大雨警報",
+            severity="発表",
+            issued_at=QUIET,
+            expires_at=None,
+            link=None,
+        )
+        defaults.update(kwargs)
+        return Alert(**defaults)
+
+    assert has_active_alerts([alert(), alert(status="cancelled")])
+    assert not has_active_alerts([alert(status="cancelled")])
+    assert not has_active_alerts([alert(severity="発表警報・注意報はなし")])
+    assert not has_active_alerts([])
+
+
+def test_advisory_alone_does_not_keep_polling_fast():
+    dry_air = Alert(
+        id="a",
+        title="気象警報・注意報",
+        area="東京都千代田区",
+        ward="千代田区",
+        category="乾燥注意報",
+        severity="継続",
+        issued_at=QUIET,
+        expires_at=None,
+        link=None,
+    )
+    assert not has_active_alerts([dry_air])
+    assert has_active_alerts([dry_air, replace(dry_air, category="大雨特別警報")])
+
+    poller = make_poller()
+    # 12:00 JST, outside the decision windows
+    noon = datetime(2024, 1, 1, 3, 0, tzinfo=timezone.utc)
+    active = has_active_alerts([dry_air])
+    assert [poller.next(active=active, now=noon) for _ in range(3)] == [
+        10 * MIN,
+        20 * MIN,
+        20 * MIN,
+    ]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.models import Alert
+from src.regions import DEFAULT_REGION, Region, RegionIndex, load_regions
+
+
+def make_alert(area: str, area_code: str | None = None) -> Alert:
+    return Alert(
+        id=area,
+        title="test",
+        area=area,
+        ward=None,
+        category="大雨警報",
+        severity="警報",
+        issued_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        expires_at=None,
+        link=None,
+        area_code=area_code,
+    )
+
+
+def test_partition_splits_alerts_per_region_in_one_pass():
+    west = Region(name="west", areas={"1320100": "八王子市", "1311300": "渋谷区"})
+    index = RegionIndex(load_regions() + [west])
+    alerts = iter(
+        [
+            make_alert("八王子市", "1320100"),
+            make_alert("渋谷区", "1311300"),
+            make_alert("東京都千代田区"),
+            make_alert("横浜市", "1410000"),
+        ]
+    )
+
+    out = index.partition(alerts)
+
+    assert [a.ward for a in out[DEFAULT_REGION]] == ["渋谷区", "千代田区"]
+    assert [a.ward for a in out["west"]] == ["八王子市", "渋谷区"]
+    assert index.office_codes == {"130000"}
+
+
+def test_load_regions_from_file(tmp_path: Path):
+    path = tmp_path / "regions.json"
+    path.write_text(
+        json.dumps(
+            {
+                "regions": [
+                    {
+                        "name": "kanagawa",
+                        "areas": {"1410000": "横浜市"},
+                        "webhook_url": "https://example.com/hook",
+                    }
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    regions = {r.name: r for r in load_regions(path)}
+    assert set(regions) == {DEFAULT_REGION, "kanagawa"}
+    assert regions["kanagawa"].webhook_url == "https://example.com/hook"
+    assert regions["kanagawa"].office_codes == {"140000"}
+
+    index = RegionIndex(regions.values())
+    alert = replace(make_alert("横浜市"), area_code="1410000")
+    assert index.match(alert) == {"kanagawa": "横浜市"}
+
+
+def test_load_regions_rejects_names_unsafe_for_file_names(tmp_path: Path):
+    path = tmp_path / "regions.json"
+    bad = ["../escape", "a/b", "", "東京"]
+    path.write_text(
+        json.dumps({"regions": [{"name": n, "areas": {}} for n in [*bad, "west_1"]]}),
+        encoding="utf-8",
+    )
+    assert {r.name for r in load_regions(path)} == {DEFAULT_REGION, "west_1"}
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import json
+import time
+from datetime import timedelta
 from pathlib import Path
 
-from src.storage import JsonStorage
+from src.storage import JournalStorage, JsonStorage, SqliteStorage, open_storage
 
 
 def test_json_storage_add_and_has(tmp_path: Path):
@@ -19,3 +22,283 @@ def test_json_storage_add_many(tmp_path: Path):
     s.add_many(["a", "b", "c"])
     for k in ["a", "b", "c"]:
         assert s.has(k)
+
+
+def test_json_storage_flush_persists_changes(tmp_path: Path):
+    path = tmp_path / "sent.json"
+    s = JsonStorage(path)
+    s.add("a")
+    s.add_many(["b"])
+    s.update_status("a", "cancelled")
+    # Nothing is written until flush
+    assert not JsonStorage(path).has("a")
+
+    s.flush()
+    reloaded = JsonStorage(path)
+    assert reloaded.get_status("a") == "cancelled"
+    assert reloaded.get_status("b") == "active"
+
+
+def test_json_storage_reads_legacy_list(tmp_path: Path):
+    path = tmp_path / "sent.json"
+    path.write_text('["x", "y"]', encoding="utf-8")
+    s = JsonStorage(path)
+    assert s.get_status("x") == "active"
+    assert s.has("y")
+
+
+def test_journal_storage_replays_after_restart(tmp_path: Path):
+    path = tmp_path / "sent_ids.json"
+    s = JournalStorage(path)
+    s.add_many(["a", "b"])
+    s.update_status("a", "cancelled")
+    s.flush()
+
+    reloaded = JournalStorage(path)
+    assert reloaded.get_status("a") == "cancelled"
+    assert reloaded.get_status("b") == "active"
+    assert not path.exists()  # only journal/snapshot files are used
+
+
+def test_journal_storage_compacts_into_snapshot(tmp_path: Path):
+    path = tmp_path / "sent_ids.json"
+    s = JournalStorage(path, compact_threshold=2)
+    s.add_many(["a", "b", "c"])
+    s.flush()
+    s.compact(blocking=True)
+
+    assert s.snapshot_path.exists()
+    assert not s.journal_path.exists()
+    s.add("d")
+    s.flush()
+
+    reloaded = JournalStorage(path)
+    for k in ["a", "b", "c", "d"]:
+        assert reloaded.has(k)
+
+
+def test_journal_rotation_keeps_records_of_a_failed_compaction(tmp_path: Path, monkeypatch):
+    path = tmp_path / "sent_ids.json"
+    s = JournalStorage(path, compact_threshold=1000)
+
+    def fail(items):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(s, "_write_snapshot", fail)
+    s.add("a")
+    s.flush()
+    s.compact(blocking=True)
+    # Torn last line from a crash while the old journal was being written
+    with s._rotated_path.open("a", encoding="utf-8") as f:
+        f.write('{"id": "torn"')
+    s.add("b")
+    s.flush()
+    s.compact(blocking=True)
+
+    assert not s.journal_path.exists()
+    reloaded = JournalStorage(path)
+    assert reloaded.has("a") and reloaded.has("b")
+    assert not reloaded.has("torn")
+
+
+def test_journal_storage_imports_existing_json(tmp_path: Path):
+    path = tmp_path / "sent_ids.json"
+    path.write_text('{"x": "cancelled", "y": "active"}', encoding="utf-8")
+    s = JournalStorage(path)
+    assert s.get_status("x") == "cancelled"
+    assert s.has("y")
+
+
+def test_open_storage_selects_backend_by_env(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "journal")
+    assert isinstance(open_storage(tmp_path / "sent_ids.json"), JournalStorage)
+    monkeypatch.delenv("STORAGE_BACKEND")
+    assert isinstance(open_storage(tmp_path / "other.json"), JsonStorage)
+
+
+def test_sqlite_storage_round_trip(tmp_path: Path):
+    path = tmp_path / "sent_ids.json"
+    s = SqliteStorage(path)
+    s.add_many(["a", "b"])
+    s.add("c", status="cancelled")
+    s.update_status("a", "cancelled")
+    assert s.get_status("a") == "cancelled"  # visible before flush
+    s.close()
+
+    reloaded = SqliteStorage(path)
+    assert reloaded.get_status("a") == "cancelled"
+    assert reloaded.get_status("b") == "active"
+    assert reloaded.get_status("c") == "cancelled"
+    assert not reloaded.has("d")
+    reloaded.close()
+
+
+def test_sqlite_storage_imports_legacy_list(tmp_path: Path):
+    path = tmp_path / "sent_ids.json"
+    path.write_text('["x", "y"]', encoding="utf-8")
+    s = SqliteStorage(path)
+    assert s.get_status("x") == "active"
+    assert s.has("y")
+    s.close()
+
+
+def test_json_storage_evicts_records_past_retention(tmp_path: Path):
+    path = tmp_path / "sent_ids.json"
+    old = time.time() - 10 * 86400
+    path.write_text(
+        json.dumps(
+            {
+                "stale": {"status": "cancelled", "last_seen": old},
+                "returned": {"status": "active", "last_seen": old},
+                "seen": {"status": "active", "last_seen": time.time() - 5 * 86400},
+                "legacy": "active",
+            }
+        ),
+        encoding="utf-8",
+    )
+    s = JsonStorage(path, retention=timedelta(days=7))
+    # Expired on load: a returning alert is not refreshed but counts as unknown
+    assert not s.has("returned")
+    s.touch_many(["seen", "returned"])
+    s.flush()
+
+    reloaded = JsonStorage(path)
+    assert not reloaded.has("stale")
+    assert not reloaded.has("returned")
+    assert reloaded.get_status("seen") == "active"
+    # Legacy values start their retention window at load time
+    assert reloaded.has("legacy")
+
+
+def test_sqlite_storage_evicts_records_past_retention(tmp_path: Path):
+    path = tmp_path / "sent_ids.json"
+    s = SqliteStorage(path, retention=timedelta(days=7))
+    s.add_many(["stale", "seen"])
+    s.flush()
+    s.touch_many(["stale"], now=time.time() - 10 * 86400)
+    s.flush()
+
+    assert not s.has("stale")
+    assert s.has("seen")
+    s.close()
+
+
+def test_storages_persist_record_details(tmp_path: Path):
+    """Severity and message slot survive a restart and a later status change."""
+    for backend in ("json", "journal", "sqlite"):
+        path = tmp_path / backend / "sent_ids.json"
+        s = open_storage(path, backend)
+        s.add_many(["a", "b"])
+        s.update_details("a", fingerprint="f1", message=[123, 0, 1, 1])
+        s.update_details("unknown", fingerprint="f1")
+        s.flush()
+        s.update_details("a", fingerprint="f2")
+        s.update_status("a", "cancelled")
+        s.flush()
+        getattr(s, "close", lambda: None)()
+
+        reloaded = open_storage(path, backend)
+        rec = reloaded.get_record("a")
+        assert (rec["status"], rec["fingerprint"], rec["message"]) == (
+            "cancelled",
+            "f2",
+            [123, 0, 1, 1],
+        ), backend
+        assert "fingerprint" not in reloaded.get_record("b")
+        assert reloaded.get_record("unknown") is None
+        assert reloaded.fingerprints(["a", "b", "unknown"]) == {
+            "a": ("cancelled", "f2"),
+            "b": ("active", None),
+        }
+        getattr(reloaded, "close", lambda: None)()
+
+
+def test_sqlite_storage_adds_detail_columns_to_old_database(tmp_path: Path):
+    import sqlite3
+
+    path = tmp_path / "sent_ids.json"
+    conn = sqlite3.connect(str(path.with_suffix(".sqlite3")))
+    conn.execute(
+        "CREATE TABLE alerts (id TEXT PRIMARY KEY, status TEXT NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO alerts VALUES ('a', 'active', ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+
+    s = SqliteStorage(path)
+    s.update_details("a", fingerprint="f1")
+    s.close()
+    assert SqliteStorage(path).get_record("a")["fingerprint"] == "f1"
+
+
+def test_sqlite_fingerprints_include_pending_changes(tmp_path: Path):
+    s = SqliteStorage(tmp_path / "sent_ids.json")
+    s.add_many([f"id{i}" for i in range(1200)])
+    s.flush()
+    s.add("new")
+    s.update_details("id7", fingerprint="f")
+    s.update_status("id8", "cancelled")
+
+    known = s.fingerprints([f"id{i}" for i in range(1200)] + ["new", "unknown"])
+    assert len(known) == 1201
+    assert known["id7"] == ("active", "f")
+    assert known["id8"] == ("cancelled", None)
+    assert known["new"] == ("active", None)
+
+
+def test_sqlite_add_many_looks_ids_up_in_batches(tmp_path: Path):
+    s = SqliteStorage(tmp_path / "sent_ids.json")
+    s.add_many([f"id{i}" for i in range(600)])
+    s.flush()
+    s.update_status("id1", "cancelled")
+    statements: list[str] = []
+    s._conn.set_trace_callback(statements.append)
+
+    s.add_many([f"id{i}" for i in range(1200)] + ["id1", "id1200"])
+    s._conn.set_trace_callback(None)
+
+    # 1201 ids in SQLITE_LOOKUP_BATCH-sized IN queries, not one SELECT per id
+    assert len(statements) == 3
+    # Known (and pending) records keep their status
+    assert s.get_status("id1") == "cancelled"
+    assert s.get_status("id1199") == "active"
+    s.flush()
+    assert len(s.fingerprints([f"id{i}" for i in range(1201)])) == 1201
+
+
+def test_expired_records_do_not_suppress_returning_alerts(tmp_path: Path):
+    """After long downtime a record past retention is treated as never sent."""
+    from datetime import datetime, timezone
+
+    from src.main import NEW, classify_alert, plan_dispatch
+    from src.models import Alert
+
+    alert = Alert(
+        id="a",
+        title="大雨警報",
+        area="東京都千代田区",
+        ward="千代田区",
+        category="大雨警報",
+        severity="発表",
+        issued_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        expires_at=None,
+        link=None,
+    )
+    forty_days_ago = time.time() - 40 * 86400
+    for backend in ("json", "journal", "sqlite"):
+        path = tmp_path / backend / "sent_ids.json"
+        s = open_storage(path, backend, retention=timedelta(days=30))
+        s.add("a")
+        s.update_details("a", fingerprint=alert.fingerprint)
+        s.flush()
+        if backend == "sqlite":
+            s._conn.execute("UPDATE alerts SET updated_at = ?", (forty_days_ago,))
+        else:
+            s._items["a"]["last_seen"] = forty_days_ago
+        assert classify_alert(alert, s.fingerprints(["a"]).get("a")) != NEW
+
+        new, _, _ = plan_dispatch([alert], storage=s)
+        assert new == [alert], backend
+        s.touch_many(["a"])
+        assert not s.has("a"), backend
+        getattr(s, "close", lambda: None)()